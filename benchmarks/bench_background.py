@@ -0,0 +1,85 @@
+"""
+Benchmark: how long the GUI thread is blocked per calculation.
+
+- inline: the old on_calculate, evaluate_sandboxed() on the Tk thread
+- background: BackgroundEvaluator.submit() plus the poll() that picks the
+  result up; the evaluation itself runs on the worker thread
+
+"blocked" is the time spent on the calling (GUI) thread, "latency" the time
+until the result is available. The last line types an expression one
+character at a time, submitting a preview per keystroke the way the
+debounced GUI would without the delay: only the final text is evaluated
+and reported.
+
+Run with: python benchmarks/bench_background.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import BackgroundEvaluator, clear_expression_cache, evaluate_sandboxed  # noqa: E402
+from calculator.sandbox import SandboxWorker  # noqa: E402
+
+EXPRESSIONS = [
+    "2+3*4",
+    "sqrt(16) + sin(30) * 2^10",
+    "2^300000 + 1",
+    "3^1000000 * 3^1000000",   # large enough to run in the sandbox process
+]
+
+
+def format_time(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.0f} us"
+
+
+def run_background(evaluator, expression, preview=False):
+    """(seconds blocked on this thread, seconds until the result)"""
+    blocked = 0.0
+    start = time.perf_counter()
+    evaluator.submit(expression, preview=preview)
+    blocked += time.perf_counter() - start
+    while True:
+        before = time.perf_counter()
+        result = evaluator.poll()
+        blocked += time.perf_counter() - before
+        if result is not None:
+            return blocked, time.perf_counter() - start
+        time.sleep(0.001)
+
+
+def main():
+    worker = SandboxWorker()
+    evaluator = BackgroundEvaluator(worker=worker)
+    worker.start()
+    try:
+        print(f"{'expression':<30}{'inline blocked':>16}{'bg blocked':>14}{'bg latency':>14}")
+        for expression in EXPRESSIONS:
+            clear_expression_cache()
+            start = time.perf_counter()
+            evaluate_sandboxed(expression, worker=worker)
+            inline = time.perf_counter() - start
+            clear_expression_cache()
+            blocked, latency = run_background(evaluator, expression)
+            print(f"{expression:<30}{format_time(inline):>16}"
+                  f"{format_time(blocked):>14}{format_time(latency):>14}")
+
+        text = "sqrt(16) + sin(30) * 2^10"
+        clear_expression_cache()
+        start = time.perf_counter()
+        for end in range(1, len(text)):
+            evaluator.submit(text[:end], preview=True)
+        blocked = time.perf_counter() - start
+        extra, _ = run_background(evaluator, text, preview=True)
+        print(f"\ntyping {len(text)} characters: {format_time(blocked + extra)} blocked, "
+              f"final preview after {format_time(time.perf_counter() - start)}")
+    finally:
+        evaluator.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark: batch mode throughput on simple arithmetic.
+
+Generates a corpus of one-line operations ('+ 2 3') and short expressions
+('12*7+3') and streams it through iter_batch_results/write_batch_results.
+
+Run with: python benchmarks/bench_batch_mode.py [lines]
+"""
+
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import iter_batch_results, write_batch_results  # noqa: E402
+
+
+def make_lines(count, seed=1):
+    rng = random.Random(seed)
+    ops = ['+', '-', '*', '/']
+    lines = []
+    for _ in range(count):
+        a, b = rng.randint(1, 999), rng.randint(0, 99)
+        if rng.random() < 0.5:
+            lines.append(f"{rng.choice(ops)} {a} {b}\n")
+        else:
+            lines.append(f"{a}{rng.choice(ops)}{b}\n")
+    return lines
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lines = make_lines(count)
+    for fmt in ('text', 'csv', 'jsonl'):
+        out = io.StringIO()
+        start = time.perf_counter()
+        total, errors = write_batch_results(iter_batch_results(lines), out, fmt)
+        elapsed = time.perf_counter() - start
+        print(f"{fmt:6} {total / elapsed:12,.0f} lines/s  ({total:,} lines, {errors:,} errors)")
+
+
+if __name__ == "__main__":
+    main()
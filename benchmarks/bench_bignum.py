@@ -0,0 +1,76 @@
+"""
+Benchmark: n! end to end (compute, store in history, display, export), as a
+plain int the way the calculator used to handle it, and as a BigNumber.
+
+The plain-int path needs the int -> str digit limit lifted and converts the
+whole number to decimal twice (display and export); for 1000000! that is
+quadratic work and takes minutes. Pass --skip-legacy to time only the new path.
+
+Run with: python benchmarks/bench_bignum.py [n] [--skip-legacy]
+"""
+
+import io
+import json
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import HistoryStore, approximate_factorial, factorial, factorial_cache  # noqa: E402
+from calculator.bignum import json_value  # noqa: E402
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<24}{elapsed:10.3f} s")
+    return value, elapsed
+
+
+def export(store, value_of):
+    out = io.StringIO()
+    json.dump([{"operation": e.operation, "result": value_of(e.result)} for e in store], out)
+    return out.tell()
+
+
+def legacy(n):
+    print("before (plain int, digit limit lifted):")
+    sys.set_int_max_str_digits(0)
+    store = HistoryStore()
+    result, compute = timed("compute", math.factorial, n)
+    _, record = timed("store in history", store.append, f"{n}!", result)
+    _, display = timed("display", lambda: f"Result: {result}")
+    _, saved = timed("export (JSON)", export, store, lambda value: value)
+    return compute + record + display + saved
+
+
+def current(n):
+    print("after (BigNumber, cached):")
+    factorial_cache.clear()
+    store = HistoryStore()
+    result, compute = timed("compute", factorial, n)
+    _, again = timed("compute again (cached)", factorial, n)
+    _, record = timed("store in history", store.append, f"{n}!", result)
+    text, display = timed("display", lambda: f"Result: {result}")
+    _, saved = timed("export (JSON)", export, store, json_value)
+    approx, _ = timed("approximation (!~)", approximate_factorial, n)
+    print(f"  {text}")
+    print(f"  approx: {approx}")
+    return compute + record + display + saved
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    n = int(args[0]) if args else 1_000_000
+    print(f"{n}! end to end\n")
+    after = current(n)
+    if "--skip-legacy" not in sys.argv:
+        before = legacy(n)
+        print(f"\ntotal: before {before:.1f} s, after {after:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: integrate() on standard integrands against per-point loops.
+
+- vectorized: integrate(), adaptive Gauss-Kronrod with one vectorized
+  evaluation per refinement level
+- per-point GK: the same refinement, but one call of the compiled
+  expression per sample point
+- adaptive Simpson: the textbook recursive rule, one call per point
+
+All three run to the same tolerance. The table shows evaluations, wall
+time and the error against the exact value. A level costs integrate()
+some 20 us of NumPy call overhead whatever its size, so it pays off on
+integrands whose levels hold many intervals (the oscillatory ones), not on
+those refined only around a single point (sqrt(x), abs(x-0.3)).
+
+Run with: python benchmarks/bench_calculus.py
+"""
+
+import math
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import compile_expression, integrate  # noqa: E402
+from calculator.calculus import DEFAULT_TOLERANCE, _gauss_kronrod_rule  # noqa: E402
+
+# (expression, a, b, exact value)
+INTEGRANDS = [
+    ("x^2", 0, 1, 1 / 3),
+    ("1/(1+x^2)", 0, 1, math.pi / 4),
+    ("sin(x)", 0, 180, 360 / math.pi),
+    ("e^(-x^2)", -3, 3, math.sqrt(math.pi) * math.erf(3)),
+    ("ln(x)", 1, 2, 2 * math.log(2) - 1),
+    ("sqrt(x)", 0, 1, 2 / 3),
+    ("abs(x-0.3)", 0, 1, 0.29),
+    ("sqrt(1-x^2)", -1, 1, math.pi / 2),
+    # Oscillatory: many intervals per refinement level
+    ("sin(50*x)^2", 0, 360, 180),
+    ("x*sin(20*x)", 0, 3600, -3600 * 9 / math.pi),
+]
+
+MAX_EVALUATIONS = 200_000
+
+
+def per_point_gauss_kronrod(function, a, b, tol=DEFAULT_TOLERANCE):
+    """integrate()'s refinement with one scalar call per node: (value, evaluations)"""
+    nodes, weights = _gauss_kronrod_rule()
+    nodes, kronrod_weights = nodes.tolist(), weights[:, 0].tolist()
+    error_weights = weights[:, 1].tolist()
+    width = (b - a) / 2
+    level = [((a + b) / 2, width)]
+    value = 0.0
+    evaluations = 0
+    while level:
+        results = []
+        for center, half in level:
+            samples = [function(center + half * node) for node in nodes]
+            kronrod = half * sum(w * f for w, f in zip(kronrod_weights, samples))
+            error = half * abs(sum(w * f for w, f in zip(error_weights, samples)))
+            results.append((center, half, kronrod, error))
+        evaluations += 15 * len(level)
+        tolerance = max(tol, tol * abs(value + sum(r[2] for r in results)))
+        level = []
+        for center, half, kronrod, error in results:
+            if error <= tolerance * half / width or evaluations >= MAX_EVALUATIONS:
+                value += kronrod
+            else:
+                level += [(center - half / 2, half / 2), (center + half / 2, half / 2)]
+    return value, evaluations
+
+
+def adaptive_simpson(function, a, b, tol=DEFAULT_TOLERANCE):
+    """Recursive adaptive Simpson rule, one scalar call per point: (value, evaluations)"""
+    fa, fm, fb = function(a), function((a + b) / 2), function(b)
+    evaluations = 3
+    whole = (b - a) / 6 * (fa + 4 * fm + fb)
+    value = 0.0
+    stack = [(a, b, fa, fm, fb, whole, tol, 0)]
+    while stack:
+        a, b, fa, fm, fb, whole, tol, depth = stack.pop()
+        m = (a + b) / 2
+        flm, frm = function((a + m) / 2), function((m + b) / 2)
+        evaluations += 2
+        left = (m - a) / 6 * (fa + 4 * flm + fm)
+        right = (b - m) / 6 * (fm + 4 * frm + fb)
+        if abs(left + right - whole) <= 15 * tol or depth >= 40 or evaluations >= MAX_EVALUATIONS:
+            value += left + right + (left + right - whole) / 15
+        else:
+            stack.append((a, m, fa, flm, fm, left, tol / 2, depth + 1))
+            stack.append((m, b, fm, frm, fb, right, tol / 2, depth + 1))
+    return value, evaluations
+
+
+def timed(run):
+    """(result, seconds) with the best of a few runs"""
+    result = run()
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    return result, min(timer.repeat(repeat=3, number=number)) / number
+
+
+def format_time(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.0f} us"
+
+
+def main():
+    header = f"{'integrand':<24}"
+    for method in ("vectorized", "per-point GK", "adaptive Simpson"):
+        header += f"{method:>30}"
+    print(header)
+    print(f"{'':<24}" + f"{'evals':>8}{'time':>11}{'error':>11}" * 3)
+    for expression, a, b, exact in INTEGRANDS:
+        function = compile_expression(expression, ["x"])
+        runs = [
+            lambda: (lambda r: (r.value, r.evaluations))(integrate(expression, "x", a, b, details=True)),
+            lambda: per_point_gauss_kronrod(function, a, b),
+            lambda: adaptive_simpson(function, a, b),
+        ]
+        line = f"{f'{expression} [{a}, {b}]':<24}"
+        for run in runs:
+            (value, evaluations), seconds = timed(run)
+            line += f"{evaluations:>8}{format_time(seconds):>11}{abs(value - exact):>11.1e}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark: quick-calculation templates as compiled expressions against the
+hand-written functions, and against rebuilding an expression string for
+every input set and passing it to evaluate_expression.
+
+Run with: python benchmarks/bench_compiled_templates.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import (  # noqa: E402
+    TEMPLATE_FORMULAS, evaluate_expression, calculate_percentage,
+    calculate_compound_interest, calculate_bmi
+)
+
+CASES = [
+    ("pct",
+     lambda: calculate_percentage(250.0, 12.5),
+     lambda: TEMPLATE_FORMULAS['pct'](250.0, 12.5),
+     lambda: evaluate_expression(f"{250.0} * {12.5} / 100")),
+    ("ci",
+     lambda: calculate_compound_interest(1000.0, 5.0, 10.0, 12)['final_amount'],
+     lambda: TEMPLATE_FORMULAS['ci'](1000.0, 5.0, 10.0, 12),
+     lambda: evaluate_expression(f"{1000.0} * (1 + {5.0} / (100 * {12}))^({12} * {10.0})")),
+    ("bmi",
+     lambda: calculate_bmi(70.0, 1.75)['bmi'],
+     lambda: TEMPLATE_FORMULAS['bmi'](70.0, 1.75),
+     lambda: evaluate_expression(f"{70.0} / {1.75}^2")),
+]
+
+
+def per_call_ns(func, number=200_000):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e9
+
+
+def main():
+    print(f"{'template':8} {'hand-written':>14} {'compiled':>14} {'string+eval':>14}   (ns/call)")
+    print("-" * 60)
+    for name, hand_written, compiled, rebuilt in CASES:
+        print(f"{name:8} {per_call_ns(hand_written):14,.0f} {per_call_ns(compiled):14,.0f} "
+              f"{per_call_ns(rebuilt, number=20_000):14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
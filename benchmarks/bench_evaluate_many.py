@@ -0,0 +1,45 @@
+"""
+Benchmark: evaluate_many on NumPy columns against calling
+evaluate_expression once per row in a Python loop.
+
+Run with: python benchmarks/bench_evaluate_many.py [rows]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from calculator import evaluate_expression, evaluate_many  # noqa: E402
+
+FORMULA = "sqrt(x^2 + y^2) * k"
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    x = rng.uniform(-100, 100, rows)
+    y = rng.uniform(-100, 100, rows)
+    k = rng.uniform(0, 10, rows)
+
+    loop_rows = min(rows, 50_000)
+    start = time.perf_counter()
+    for i in range(loop_rows):
+        evaluate_expression(f"sqrt(({x[i]})^2 + ({y[i]})^2) * {k[i]}")
+    loop_rate = loop_rows / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    result = evaluate_many(FORMULA, x=x, y=y, k=k)
+    vector_rate = rows / (time.perf_counter() - start)
+
+    print(f"Formula: {FORMULA}")
+    print(f"per-row loop   {loop_rate:14,.0f} rows/s  (measured on {loop_rows:,} rows)")
+    print(f"evaluate_many  {vector_rate:14,.0f} rows/s  ({rows:,} rows, {int(result.errors.sum())} errors)")
+    print(f"speedup        {vector_rate / loop_rate:14,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark: throughput of evaluate_expression on repeated formulas,
+with and without the compiled-expression LRU cache.
+
+Run with: python benchmarks/bench_expression_cache.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import (  # noqa: E402
+    evaluate_expression, set_expression_cache_size,
+    clear_expression_cache, expression_cache_info
+)
+
+
+def make_corpus(distinct=2000, total=200000, seed=42):
+    rng = random.Random(seed)
+    templates = [
+        "{a}+{b}*{c}",
+        "({a}+{b})/{c}",
+        "sqrt({a})+{b}^2",
+        "sin({a})*cos({b})+{c}",
+        "log({a})+ln({b})-abs(-{c})",
+        "(({a}*{b})-{c})*pi",
+    ]
+    formulas = [
+        rng.choice(templates).format(a=rng.randint(1, 999), b=rng.randint(1, 99), c=rng.randint(1, 9))
+        for _ in range(distinct)
+    ]
+    return [rng.choice(formulas) for _ in range(total)]
+
+
+def run(corpus, capacity):
+    clear_expression_cache()
+    set_expression_cache_size(capacity)
+    start = time.perf_counter()
+    for expression in corpus:
+        evaluate_expression(expression)
+    elapsed = time.perf_counter() - start
+    return len(corpus) / elapsed, expression_cache_info()
+
+
+def main():
+    corpus = make_corpus()
+    print(f"Corpus: {len(corpus)} evaluations of {len(set(corpus))} distinct expressions")
+    print("-" * 60)
+    for label, capacity in (("no cache", 0), ("LRU 512", 512), ("LRU 4096", 4096)):
+        rate, info = run(corpus, capacity)
+        print(f"{label:10} {rate:12,.0f} expr/s   hits={info['hits']} misses={info['misses']} "
+              f"evictions={info['evictions']}")
+    set_expression_cache_size(4096)
+
+
+if __name__ == "__main__":
+    main()
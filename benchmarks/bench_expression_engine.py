@@ -0,0 +1,90 @@
+"""
+Benchmark: the parser-based expression engine against the previous
+regex + eval implementation, on the expressions used in test_calculator.py.
+
+"cold" disables the compiled-expression cache, so every call tokenizes,
+parses, validates and compiles; "warm" is the normal cached path.
+
+Run with: python benchmarks/bench_expression_engine.py
+"""
+
+import math
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import (  # noqa: E402
+    evaluate_expression, set_expression_cache_size, clear_expression_cache
+)
+
+TEST_EXPRESSIONS = [
+    "2+3", "10-4", "5*6", "20/4", "2+3*4", "(2+3)*4", "10/2+3", "(10+5)/3",
+    "2^3", "2**3", "10^2", "sqrt(16)", "sqrt(16)+4", "abs(-5)", "sqrt(9)*2",
+    "pi*2", "e+1", "(5+3)*(2+2)", "((10+5)*2)/3", "10/0",
+]
+
+
+def legacy_evaluate_expression(expression):
+    """The regex + eval implementation this engine replaced"""
+    try:
+        expression = re.sub(r"\^", "**", expression)
+        safe_namespace = {
+            'sqrt': math.sqrt,
+            'sin': lambda x: math.sin(math.radians(x)),
+            'cos': lambda x: math.cos(math.radians(x)),
+            'tan': lambda x: math.tan(math.radians(x)),
+            'log': math.log10,
+            'ln': math.log,
+            'abs': abs,
+            'pi': math.pi,
+            'e': math.e,
+            '__builtins__': {}
+        }
+        allowed_pattern = r'^[\d+\-*/().,\s^*sqrtincoalgbe]+$'
+        if not re.match(allowed_pattern, expression, re.IGNORECASE):
+            return "Error: Expression contains invalid characters!"
+        result = eval(expression, safe_namespace, {})
+        if isinstance(result, (int, float)):
+            return result
+        return "Error: Invalid result type!"
+    except ZeroDivisionError:
+        return "Error: Division by zero in expression!"
+    except SyntaxError:
+        return "Error: Invalid expression syntax!"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+def measure(func, rounds=2000):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for expression in TEST_EXPRESSIONS:
+            func(expression)
+    elapsed = time.perf_counter() - start
+    return rounds * len(TEST_EXPRESSIONS) / elapsed
+
+
+def main():
+    for expression in TEST_EXPRESSIONS:
+        expected = legacy_evaluate_expression(expression)
+        # The legacy character class rejected 'p', so 'pi' never worked there
+        if not isinstance(expected, str) or "invalid characters" not in expected:
+            assert evaluate_expression(expression) == expected, expression
+
+    legacy = measure(legacy_evaluate_expression)
+    set_expression_cache_size(0)
+    cold = measure(evaluate_expression)
+    set_expression_cache_size(4096)
+    clear_expression_cache()
+    warm = measure(evaluate_expression)
+
+    print(f"{'legacy regex + eval':24} {legacy:12,.0f} expr/s")
+    print(f"{'parser engine (cold)':24} {cold:12,.0f} expr/s  ({cold / legacy:.2f}x)")
+    print(f"{'parser engine (warm)':24} {warm:12,.0f} expr/s  ({warm / legacy:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
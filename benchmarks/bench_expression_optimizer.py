@@ -0,0 +1,115 @@
+"""
+Benchmark: the expression optimizer (constant folding, identities, shared
+subexpressions) on a corpus of realistic formulas, with and without it.
+
+- evaluate_expression on cached constant formulas (unit conversions,
+  growth factors), where folding leaves a single constant
+- compile_expression functions of formulas with repeated subterms,
+  called with scalars
+- evaluate_many over 100k rows, where each shared subterm saves a pass
+  over the arrays
+- cold compilation (cache cleared), which pays for the optimizer
+
+Run with: python benchmarks/bench_expression_optimizer.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calculator.expression as engine  # noqa: E402
+from calculator import (  # noqa: E402
+    clear_expression_cache, compile_expression, evaluate_expression, evaluate_many
+)
+
+CONSTANT_FORMULAS = [
+    "sqrt(2)*pi/180",
+    "log(1000)",
+    "(1+5/100)^12",
+    "2*pi*6371/360",
+    "ln(2)/ln(1.07)",
+    "9.81*60^2/1000",
+    "100*(1+0.04/12)^(12*30)",
+    "sin(30)^2+cos(30)^2",
+]
+
+VARIABLE_FORMULAS = [
+    "(a+b)^2 + 3*(a+b)",
+    "sqrt(a^2+b^2) / (1 + sqrt(a^2+b^2))",
+    "a*(1+b/1200)^(12*30) - a*(1+b/1200)^(12*30)/(1+b/1200)",
+    "a*pi/180 * sin(45) + b*pi/180 * cos(45)",
+    "(a-b)*(a-b)/(2*(a-b)) + ln(10)*a*1",
+]
+
+
+def per_call(function, number):
+    return min(timeit.repeat(function, repeat=5, number=number)) / number
+
+
+def measure():
+    """Seconds per formula for each scenario, with the current setting"""
+    clear_expression_cache()
+    engine.vector_expression_cache.clear()
+    results = {}
+
+    for expression in CONSTANT_FORMULAS:
+        evaluate_expression(expression)
+
+    def cached():
+        for expression in CONSTANT_FORMULAS:
+            evaluate_expression(expression)
+    results["evaluate_expression (cached)"] = per_call(cached, 5000) / len(CONSTANT_FORMULAS)
+
+    functions = [compile_expression(formula, ["a", "b"]) for formula in VARIABLE_FORMULAS]
+
+    def scalar():
+        for function in functions:
+            function(1234.5, 6.5)
+    results["compile_expression call"] = per_call(scalar, 5000) / len(functions)
+
+    import numpy as np
+    a = np.random.default_rng(1).uniform(1, 1000, 100_000)
+    b = np.random.default_rng(2).uniform(1, 10, 100_000)
+
+    def vector():
+        for formula in VARIABLE_FORMULAS:
+            evaluate_many(formula, a=a, b=b)
+    results["evaluate_many 100k rows"] = per_call(vector, 5) / len(VARIABLE_FORMULAS)
+
+    def cold():
+        clear_expression_cache()
+        for expression in CONSTANT_FORMULAS:
+            evaluate_expression(expression)
+    results["cold evaluate_expression"] = per_call(cold, 200) / len(CONSTANT_FORMULAS)
+    return results
+
+
+def format_time(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    if seconds >= 1e-6:
+        return f"{seconds * 1e6:.2f} us"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+def main():
+    # The first pass over 100k-row arrays runs on a fresh heap and is faster
+    # than any later one, so it is discarded; then the settings alternate and
+    # the best of each is kept
+    measure()
+    plain, optimized = {}, {}
+    for _ in range(3):
+        for enabled, results in ((False, plain), (True, optimized)):
+            engine.OPTIMIZE_EXPRESSIONS = enabled
+            for name, seconds in measure().items():
+                results[name] = min(seconds, results.get(name, seconds))
+    print(f"{'per formula':<32}{'plain':>12}{'optimized':>12}{'speed-up':>10}")
+    for name in plain:
+        print(f"{name:<32}{format_time(plain[name]):>12}{format_time(optimized[name]):>12}"
+              f"{plain[name] / optimized[name]:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: history search with the incremental indexes against a linear
+scan, on a store of a million entries.
+
+Run with: python benchmarks/bench_history_index.py [entries]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import HistoryIndex, HistoryStore  # noqa: E402
+
+FUNCTIONS = ["sqrt", "sin", "cos", "tan", "ln", "log", "abs"]
+
+
+def fill(store, count, seed=7):
+    rng = random.Random(seed)
+    start = 1_700_000_000.0
+    for i in range(count):
+        roll = rng.random()
+        a = rng.randint(1, 10_000)
+        if roll < 0.6:
+            operation, result = f"{a} + {i % 100}", a + i % 100
+        elif roll < 0.9:
+            operation, result = f"{rng.choice(FUNCTIONS)}({a})", rng.random() * a
+        else:
+            operation, result = f"Tip: ${a} + 15%", a * 1.15
+        store.append(operation, result, timestamp=start + i * 0.5)
+    return start
+
+
+def best_ms(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, len(found)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    store = HistoryStore(capacity=count)
+    start = fill(store, count)
+
+    t = time.perf_counter()
+    index = HistoryIndex(store)
+    print(f"{count:,} entries, index built in {time.perf_counter() - t:.2f} s")
+
+    midpoint = start + count * 0.5 * 0.999
+    queries = [
+        ("find tan (limit 50)",
+         lambda: index.find("tan", limit=50),
+         lambda: [e for e in store if "tan" in e.operation][:50]),
+        ("find tip 15 (limit 50)",
+         lambda: index.find("tip 15", limit=50),
+         lambda: [e for e in store if "tip" in e.operation.lower() and "15" in e.operation][:50]),
+        ("since <last 0.1%>",
+         lambda: index.since(midpoint),
+         lambda: [e for e in store if e.timestamp >= midpoint]),
+        ("result>10000 (limit 50)",
+         lambda: index.result_range(10000, include_low=False, limit=50),
+         lambda: [e for e in store if isinstance(e.result, (int, float)) and e.result > 10000][:50]),
+        ("result>10000 (all)",
+         lambda: index.result_range(10000, include_low=False),
+         lambda: [e for e in store if isinstance(e.result, (int, float)) and e.result > 10000]),
+    ]
+    print(f"{'query':26} {'indexed':>12} {'linear scan':>14} {'matches':>9}")
+    print("-" * 66)
+    for label, indexed, linear in queries:
+        indexed_ms, found = best_ms(indexed)
+        linear_ms, _ = best_ms(linear, repeat=1)
+        print(f"{label:26} {indexed_ms:9.3f} ms {linear_ms:11.1f} ms {found:9,}")
+
+    t = time.perf_counter()
+    for i in range(100_000):
+        store.append(f"{i} * 2", i * 2, timestamp=start + count + i)
+    rate = 100_000 / (time.perf_counter() - t)
+    print(f"\nappend with index maintenance (evicting): {rate:,.0f} entries/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: persisting history through the JSON Lines journal.
+
+Measures journal append throughput for a few flush policies, streaming
+reload into a HistoryStore, and export as a journal copy compared with
+rewriting the whole history with json.dump(..., indent=2).
+
+Run with: python benchmarks/bench_history_journal.py [entries]
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import HistoryJournal, HistoryStore  # noqa: E402
+
+
+def timed(label, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:34} {elapsed * 1000:10.1f} ms  {count / elapsed:14,.0f} entries/s")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    store = HistoryStore(capacity=count)
+    for i in range(count):
+        store.append(f"{i} + {i % 97}", i + i % 97)
+    print(f"{count:,} entries")
+    print("-" * 72)
+
+    root = tempfile.mkdtemp()
+    try:
+        for flush_every, fsync in ((1, False), (100, False), (1000, True)):
+            directory = os.path.join(root, f"flush-{flush_every}-{fsync}")
+            journal = HistoryJournal(directory, flush_every=flush_every, fsync=fsync)
+
+            def append_all():
+                for entry in store:
+                    journal.append(entry)
+                journal.flush()
+
+            timed(f"append (flush_every={flush_every}, fsync={fsync})", append_all, count)
+            journal.close()
+
+        directory = os.path.join(root, "flush-100-False")
+        timed("reload into HistoryStore",
+              lambda: HistoryJournal(directory).load_into(HistoryStore(capacity=count)), count)
+
+        journal = HistoryJournal(directory)
+        timed("export: journal copy (.jsonl)", lambda: journal.export(os.path.join(root, "out.jsonl")), count)
+        journal.close()
+
+        def legacy_export():
+            with open(os.path.join(root, "out.json"), 'w') as f:
+                json.dump([entry.as_dict() for entry in store], f, indent=2)
+
+        timed("export: json.dump(indent=2)", legacy_export, count)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
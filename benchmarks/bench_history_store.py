@@ -0,0 +1,68 @@
+"""
+Benchmark: memory per entry and append throughput of the ring-buffer
+history store against the previous list of dicts with formatted timestamps.
+
+Run with: python benchmarks/bench_history_store.py [entries]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import HistoryStore  # noqa: E402
+
+OPERATIONS = ["2 + 3", "sqrt(16)", "Tip: $120.0 + 18.0%", "sin(30.0°)", "10.0 ÷ 4.0"]
+
+
+def legacy_append(history, operation, result):
+    history.append({
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "operation": operation,
+        "result": result
+    })
+
+
+def fill_legacy(count):
+    history = []
+    for i in range(count):
+        # Operation strings are built per call in the REPL, so copy them
+        legacy_append(history, "".join(OPERATIONS[i % 5]), float(i))
+    return history
+
+
+def fill_store(count):
+    store = HistoryStore(capacity=count)
+    for i in range(count):
+        store.append("".join(OPERATIONS[i % 5]), float(i))
+    return store
+
+
+def measure(fill, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = fill(count)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / count, count / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"{count:,} entries")
+    print("-" * 56)
+    for label, fill in (("list of dicts", fill_legacy), ("HistoryStore", fill_store)):
+        per_entry, _ = measure(fill, count)
+        start = time.perf_counter()
+        fill(count)
+        rate = count / (time.perf_counter() - start)
+        print(f"{label:14} {per_entry:8.1f} bytes/entry {rate:14,.0f} appends/s")
+
+
+if __name__ == "__main__":
+    main()
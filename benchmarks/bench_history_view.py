@@ -0,0 +1,81 @@
+"""
+Benchmark: the GUI history pane's model with a million entries, headless.
+
+Measures what a redraw costs: fetching one page from the store, building
+the visible rows, scrolling, and appending while the view follows the tail.
+For comparison it also times formatting every row, which is what filling a
+plain Listbox with the whole history would need.
+
+Run with: python benchmarks/bench_history_view.py [entries]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import HistoryStore, HistoryViewModel  # noqa: E402
+from calculator.history_view import format_history_row  # noqa: E402
+
+ROWS = 30
+
+
+def per_call_us(func, calls):
+    start = time.perf_counter()
+    for argument in calls:
+        func(argument)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    store = HistoryStore(capacity=count)
+    for i in range(count):
+        store.append(f"{i} + 1", i + 1, timestamp=1_700_000_000.0 + i)
+    # One more lap so the ring buffer is wrapped, as in long sessions
+    for i in range(count // 3):
+        store.append(f"sqrt({i})", i ** 0.5)
+
+    refreshes = []
+    model = HistoryViewModel(store, rows=ROWS, on_change=lambda: refreshes.append(1))
+    rng = random.Random(3)
+    positions = [rng.randrange(len(store)) for _ in range(2000)]
+
+    def page(position):
+        store.page(position, ROWS)
+
+    def render(position):
+        model.scroll_to(position)
+        model.visible_rows()
+
+    def scroll(_):
+        model.scroll_by(1)
+        model.visible_rows()
+
+    print(f"{len(store):,} entries, {ROWS} visible rows")
+    print(f"page fetch                      {per_call_us(page, positions):8.1f} us")
+    print(f"jump + render rows              {per_call_us(render, positions):8.1f} us")
+    model.scroll_to(0)
+    print(f"scroll one row + render         {per_call_us(scroll, range(2000)):8.1f} us")
+
+    model.scroll_to(len(store))
+    appends = 20_000
+    start = time.perf_counter()
+    for i in range(appends):
+        store.append(f"{i} * 2", i * 2)
+        model.visible_rows()
+    elapsed = time.perf_counter() - start
+    print(f"append + render (following)     {elapsed / appends * 1e6:8.1f} us")
+
+    sample = 100_000
+    start = time.perf_counter()
+    for number, entry in enumerate(store.page(0, sample), 1):
+        format_history_row(number, entry)
+    full = (time.perf_counter() - start) / sample * len(store)
+    print(f"\nformatting every row (full Listbox fill): {full:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark: scaling of the process-pool batch evaluator across worker counts.
+
+Generates a corpus of simple operations and expressions (2 million lines by
+default) and evaluates it serially and with 1/2/4/8 workers, in ordered and
+as-completed mode. Results are counted, not written, so the numbers reflect
+evaluation and inter-process transfer only.
+
+Run with: python benchmarks/bench_parallel_batch.py [lines]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_batch_mode import make_lines  # noqa: E402
+from calculator import iter_batch_results, iter_parallel_results  # noqa: E402
+
+
+def consume(results):
+    count = 0
+    for _ in results:
+        count += 1
+    return count
+
+
+def timed(label, results, baseline=None):
+    start = time.perf_counter()
+    count = consume(results)
+    rate = count / (time.perf_counter() - start)
+    speedup = f"  ({rate / baseline:.2f}x)" if baseline else ""
+    print(f"{label:22} {rate:12,.0f} lines/s{speedup}")
+    return rate
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    lines = make_lines(count)
+    print(f"Corpus: {count:,} lines, {os.cpu_count()} CPU(s)")
+    print("-" * 50)
+    serial = timed("serial", iter_batch_results(lines))
+    for workers in (1, 2, 4, 8):
+        timed(f"{workers} worker(s), ordered", iter_parallel_results(lines, workers), serial)
+        timed(f"{workers} worker(s), unordered", iter_parallel_results(lines, workers, ordered=False), serial)
+
+
+if __name__ == "__main__":
+    main()
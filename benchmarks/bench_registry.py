@@ -0,0 +1,92 @@
+"""
+Benchmark: operation dispatch with many registered operations.
+
+- an if/elif chain over N operation names (what the REPL used to do), for
+  the first, middle and last name, against a registry lookup
+- evaluate_expression of a registered function with N extra functions in the
+  expression namespace
+
+The chain's cost grows with the position of the name; the registry lookup
+is one dict access whatever N is.
+
+Run with: python benchmarks/bench_registry.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import evaluate_expression, register_operation, unregister_operation  # noqa: E402
+from calculator.registry import OperationRegistry  # noqa: E402
+
+SIZES = (10, 100, 500, 1000)
+
+
+def function(x, y):
+    return x + y
+
+
+def make_chain(names):
+    """dispatch(name, x, y) as an if/elif chain over names"""
+    lines = ["def dispatch(name, x, y):"]
+    for i, name in enumerate(names):
+        lines.append(f"    {'if' if i == 0 else 'elif'} name == {name!r}:")
+        lines.append("        return function(x, y)")
+    lines.append("    raise KeyError(name)")
+    namespace = {'function': function}
+    exec("\n".join(lines), namespace)
+    return namespace['dispatch']
+
+
+def make_registry(names):
+    registry = OperationRegistry()
+    for name in names:
+        registry.register(name, function, 2)
+
+    def dispatch(name, x, y):
+        return registry.get(name).function(x, y)
+    return dispatch
+
+
+def per_call(statement, namespace, number=50_000):
+    return min(timeit.repeat(statement, globals=namespace, repeat=5, number=number)) / number
+
+
+def dispatch_costs():
+    print(f"{'operations':>10}  {'chain first':>12}  {'chain middle':>12}  {'chain last':>12}  {'registry':>10}")
+    for size in SIZES:
+        names = [f"op{i}" for i in range(size)]
+        chain, registry = make_chain(names), make_registry(names)
+        first, middle, last = names[0], names[size // 2], names[-1]
+        costs = [per_call("dispatch(name, 2.0, 3.0)", {'dispatch': chain, 'name': name})
+                 for name in (first, middle, last)]
+        costs.append(per_call("dispatch(name, 2.0, 3.0)", {'dispatch': registry, 'name': last}))
+        print(f"{size:>10}  " + "  ".join(f"{cost * 1e9:>9.0f} ns" for cost in costs))
+
+
+def expression_costs():
+    print(f"\n{'extra functions':>15}  {'hyp(3,4)+1 (cached)':>20}")
+    for size in (0,) + SIZES:
+        names = [f"extra{i}" for i in range(size)]
+        for name in names:
+            register_operation(name, function, 2, expression=True)
+        register_operation('hyp', function, 2, expression=True)
+        try:
+            evaluate_expression("hyp(3,4)+1")
+            cost = per_call("evaluate_expression('hyp(3,4)+1')",
+                            {'evaluate_expression': evaluate_expression})
+            print(f"{size:>15}  {cost * 1e9:>17.0f} ns")
+        finally:
+            for name in names + ['hyp']:
+                unregister_operation(name)
+
+
+def main():
+    dispatch_costs()
+    expression_costs()
+
+
+if __name__ == "__main__":
+    main()
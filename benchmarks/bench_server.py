@@ -0,0 +1,154 @@
+"""
+Load generator for the evaluation server: p50/p99 latency and requests/sec.
+
+Opens CONNECTIONS keep-alive connections to a server on localhost, keeps
+DEPTH pipelined requests in flight on each, and sends a mix of expressions,
+basic operations and quick templates for DURATION seconds. Unless --connect
+is given, a server is started in a subprocess, once per batch window in
+--windows (0 flushes each loop iteration's requests together). For scale,
+the same mix is also timed the way it was done before the server existed:
+one `python -m calculator --batch -` process per request.
+
+Run with: python benchmarks/bench_server.py [--connections N] [--depth N]
+          [--duration S] [--windows 0,0.001] [--connect HOST:PORT]
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+REQUESTS = [
+    {"expr": "2+3*4"},
+    {"expr": "sqrt(16)+sin(30)*2"},
+    {"expr": "(1+2)**10 // 7"},
+    {"op": "+", "args": [12.5, 7]},
+    {"op": "!", "args": [20]},
+    {"op": "^", "args": [2, 64]},
+    {"op": "tip", "args": [84.2, 18, 3]},
+    {"op": "ci", "args": [10000, 5, 10, 12]},
+    {"op": "bmi", "args": [70, 1.75]},
+]
+
+SERVER_CODE = ("import sys; from calculator.server import run_server; "
+               "run_server('127.0.0.1', 0, batch_window=float(sys.argv[1]), max_batch=int(sys.argv[2]))")
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def client(host, port, depth, deadline, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    lines = [(json.dumps(dict(request, id=i)) + "\n").encode() for i, request in enumerate(REQUESTS)]
+    in_flight = asyncio.Semaphore(depth)
+    sent = collections.deque()
+
+    async def receive():
+        # The server answers in request order, so replies match sent times FIFO
+        while line := await reader.readline():
+            latencies.append(time.perf_counter() - sent.popleft())
+            in_flight.release()
+            if b'"error"' in line:
+                raise RuntimeError(f"server error: {line!r}")
+
+    receiver = asyncio.create_task(receive())
+    i = 0
+    while time.perf_counter() < deadline:
+        await in_flight.acquire()
+        sent.append(time.perf_counter())
+        writer.write(lines[i % len(lines)])
+        i += 1
+        await writer.drain()
+    writer.write_eof()  # the server sends the remaining replies, then closes
+    await receiver
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load(host, port, connections, depth, duration):
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(client(host, port, depth, deadline, latencies) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, percentile(latencies, 0.5), percentile(latencies, 0.99)
+
+
+def report(label, rps, p50, p99):
+    print(f"{label:<28}{rps:>12,.0f} req/s   p50 {p50 * 1e3:8.3f} ms   p99 {p99 * 1e3:8.3f} ms")
+
+
+def start_server(window, max_batch=256):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.Popen([sys.executable, "-c", SERVER_CODE, str(window), str(max_batch)],
+                               stdout=subprocess.PIPE, text=True, env=env)
+    line = process.stdout.readline()
+    host, _, port = line.rsplit(None, 1)[-1].rpartition(":")
+    return process, host, int(port)
+
+
+def shell_out(count):
+    """The old way: one calculator process per request"""
+    from calculator.server import parse_request
+
+    latencies = []
+    for i in range(count):
+        _, op, args = parse_request(REQUESTS[i % len(REQUESTS)])
+        line = args[0] if op == 'expr' else " ".join([op, *map(str, args)])
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "calculator", "--batch", "-"], input=line,
+                       capture_output=True, text=True, check=True, cwd=ROOT)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return len(latencies) / sum(latencies), percentile(latencies, 0.5), percentile(latencies, 0.99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--depth', type=int, default=4, help="pipelined requests per connection")
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--windows', default="0,0.001",
+                        help="comma-separated batch windows (seconds) to start servers with")
+    parser.add_argument('--connect', metavar='HOST:PORT', help="load an already running server")
+    parser.add_argument('--shell-requests', type=int, default=20,
+                        help="requests for the process-per-request baseline (0 to skip)")
+    args = parser.parse_args()
+
+    print(f"{args.connections} connections x {args.depth} in flight, {args.duration:g} s each\n")
+    if args.connect:
+        host, _, port = args.connect.rpartition(':')
+        report(args.connect, *asyncio.run(load(host, int(port), args.connections,
+                                                args.depth, args.duration)))
+    else:
+        runs = [(f"server, window {window * 1e3:g} ms", window, 256, args.connections, args.depth)
+                for window in map(float, args.windows.split(','))]
+        runs += [
+            # Same load, every request flushed on its own: the cost of not batching
+            ("server, max_batch 1", 0.0, 1, args.connections, args.depth),
+            # One connection, one request at a time: the latency floor
+            ("server, 1 x 1", 0.0, 256, 1, 1),
+        ]
+        for label, window, max_batch, connections, depth in runs:
+            process, host, port = start_server(window, max_batch)
+            try:
+                result = asyncio.run(load(host, port, connections, depth, args.duration))
+            finally:
+                process.terminate()
+                process.wait()
+            report(label, *result)
+    if args.shell_requests:
+        report("process per request", *shell_out(args.shell_requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: calculator sessions under threads.
+
+- cost of creating a CalculatorSession (time and memory)
+- throughput of T threads doing memory and history work, each with its own
+  session, against all threads sharing one session behind a global lock
+  (the alternative to sessions)
+
+Under the GIL, threads take turns running Python code, so "linear" here
+means the total throughput stays flat as threads are added instead of
+collapsing on lock hand-offs; true parallel speed-up needs a free-threaded
+interpreter or processes.
+
+Run with: python benchmarks/bench_sessions.py [operations per thread]
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import CalculatorSession, evaluate_expression  # noqa: E402
+
+EXPRESSIONS = ["2+3*4", "sqrt(16)+5", "(1+2)^3", "10/4", "sin(30)*2"]
+
+
+def creation():
+    count = 100_000
+    start = time.perf_counter()
+    sessions = [CalculatorSession() for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    del sessions
+    tracemalloc.start()
+    sessions = [CalculatorSession() for _ in range(10_000)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"create a session: {elapsed / count * 1e6:.2f} us, {size / len(sessions):.0f} bytes")
+
+
+def work(session, operations, lock):
+    for k in range(operations):
+        expression = EXPRESSIONS[k % len(EXPRESSIONS)]
+        result = evaluate_expression(expression)
+        with lock:
+            session.memory_add(1)
+            session.add_to_history(expression, result)
+
+
+class NoLock:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+def throughput(threads, operations, shared):
+    if shared:
+        session, lock = CalculatorSession(), threading.Lock()
+        arguments = [(session, operations, lock)] * threads
+    else:
+        arguments = [(CalculatorSession(), operations, NoLock()) for _ in range(threads)]
+    workers = [threading.Thread(target=work, args=args) for args in arguments]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * operations / (time.perf_counter() - start)
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    creation()
+    print(f"\n{'threads':>8}  {'own session ops/s':>18}  {'shared + lock ops/s':>20}")
+    for threads in (1, 2, 4, 8, 16):
+        own = throughput(threads, operations, shared=False)
+        shared = throughput(threads, operations, shared=True)
+        print(f"{threads:>8}  {own:>18,.0f}  {shared:>20,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: the degree trig kernel against math.f(math.radians(x)).
+
+- scalar: one call per angle, for angles already in [-90, 90], in
+  [-180, 180] and beyond (where the kernel has to reduce)
+- compiled: compile_expression("sin(x)") called per angle, with the default
+  plain functions and after set_exact_trig(True)
+- cached constant: evaluate_expression("sin(30)"), which the optimizer folds
+- vector: 1M angles in one call, against np.f(np.radians(x)), for random
+  angles and for whole degrees (where the special angles are common)
+
+The scalar kernel runs a few comparisons and a dict lookup in Python before
+its single libm call, so it is slower per call than the bare lambda. That
+is why it is opt-in; inside cached expressions constant calls are folded
+and cost nothing at run time either way.
+
+Run with: python benchmarks/bench_trig.py
+"""
+
+import math
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculator import compile_expression, evaluate_expression, set_exact_trig  # noqa: E402
+from calculator.trig import (  # noqa: E402
+    cos_degrees, cos_degrees_many, sin_degrees, sin_degrees_many, tan_degrees, tan_degrees_many
+)
+
+SCALAR_ANGLES = [("37.3", 37.3), ("137.3", 137.3), ("1000.3", 1000.3)]
+VECTOR_SIZE = 1_000_000
+
+FUNCTIONS = [
+    ("sin", lambda x: math.sin(math.radians(x)), sin_degrees),
+    ("cos", lambda x: math.cos(math.radians(x)), cos_degrees),
+    ("tan", lambda x: math.tan(math.radians(x)), tan_degrees),
+]
+
+
+def best_of(run, number):
+    """Best time per call of run over a few repeats"""
+    return min(timeit.repeat(run, number=number, repeat=7)) / number
+
+
+def main():
+    print(f"{'scalar (ns per call)':<24}{'radians':>10}{'kernel':>10}{'compiled':>10}{'exact':>10}")
+    for name, baseline, kernel in FUNCTIONS:
+        compiled = compile_expression(f"{name}(x)", ["x"])
+        set_exact_trig(True)
+        exact = compile_expression(f"{name}(x)", ["x"])
+        set_exact_trig(False)
+        for label, angle in SCALAR_ANGLES:
+            times = [best_of(lambda f=f: f(angle), 200_000) * 1e9
+                     for f in (baseline, kernel, compiled, exact)]
+            print(f"{f'{name}({label})':<24}" + "".join(f"{t:>10.0f}" for t in times))
+
+    evaluate_expression("sin(30)")
+    print(f"\ncached evaluate_expression('sin(30)'): "
+          f"{best_of(lambda: evaluate_expression('sin(30)'), 200_000) * 1e9:.0f} ns")
+
+    try:
+        import numpy as np
+    except ImportError:
+        print("\nNumPy not installed; skipping the vector benchmark")
+        return
+    rng = np.random.default_rng(0)
+    inputs = [
+        ("random [-720, 720]", rng.uniform(-720, 720, VECTOR_SIZE)),
+        ("whole degrees", rng.integers(0, 360, VECTOR_SIZE).astype(float)),
+    ]
+    kernels = [
+        ("sin", np.sin, sin_degrees_many),
+        ("cos", np.cos, cos_degrees_many),
+        ("tan", np.tan, tan_degrees_many),
+    ]
+    print(f"\n{f'vector, {VECTOR_SIZE:,} angles (ms)':<34}{'radians':>10}{'kernel':>10}")
+    for label, angles in inputs:
+        for name, numpy_function, kernel in kernels:
+            baseline = best_of(lambda: numpy_function(np.radians(angles)), 10) * 1e3
+            ours = best_of(lambda: kernel(angles), 10) * 1e3
+            print(f"{f'{name}, {label}':<34}{baseline:>10.1f}{ours:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
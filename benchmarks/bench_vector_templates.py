@@ -0,0 +1,75 @@
+"""
+Benchmark: scalar quick-calculation templates called in a loop against their
+vectorized counterparts, across batch sizes (requires NumPy).
+
+The vector kernels pay a fixed cost of tens of microseconds per call (array
+conversion, masking), so they only win from roughly a hundred rows up; this
+is why the scalar calculate_* functions do not delegate to them.
+
+Run with: python benchmarks/bench_vector_templates.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from calculator import (  # noqa: E402
+    calculate_bmi, calculate_compound_interest, calculate_tip,
+    bmi_many, compound_interest_many, tip_many
+)
+
+SIZES = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+
+def per_row_ns(func, rows, budget=0.5):
+    """Best time per row over enough repeats to fill roughly budget seconds"""
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+    repeats = max(1, min(1000, int(budget / max(first, 1e-9))))
+    best = first
+    for _ in range(min(repeats, 5)):
+        start = time.perf_counter()
+        for _ in range(max(1, repeats // 5)):
+            func()
+        best = min(best, (time.perf_counter() - start) / max(1, repeats // 5))
+    return best / rows * 1e9
+
+
+def main():
+    rng = np.random.default_rng(0)
+    biggest = max(SIZES)
+    weights = rng.uniform(40, 120, biggest)
+    heights = rng.uniform(1.4, 2.1, biggest)
+    principals = rng.uniform(1_000, 500_000, biggest)
+    rates = rng.uniform(1, 9, biggest)
+    years = rng.integers(1, 30, biggest).astype(np.float64)
+    bills = rng.uniform(5, 300, biggest)
+
+    cases = [
+        ("bmi",
+         lambda n, w=weights.tolist(), h=heights.tolist(): [calculate_bmi(w[i], h[i]) for i in range(n)],
+         lambda n: bmi_many(weights[:n], heights[:n])),
+        ("compound interest",
+         lambda n, p=principals.tolist(), r=rates.tolist(), t=years.tolist():
+             [calculate_compound_interest(p[i], r[i], t[i], 12) for i in range(n)],
+         lambda n: compound_interest_many(principals[:n], rates[:n], years[:n], 12)),
+        ("tip",
+         lambda n, b=bills.tolist(): [calculate_tip(b[i], 18, 2) for i in range(n)],
+         lambda n: tip_many(bills[:n], 18, 2)),
+    ]
+    for name, scalar, vector in cases:
+        print(f"\n{name}")
+        print(f"{'rows':>10}  {'scalar ns/row':>14}  {'vector ns/row':>14}  {'speedup':>8}")
+        for n in SIZES:
+            scalar_ns = per_row_ns(lambda: scalar(n), n)
+            vector_ns = per_row_ns(lambda: vector(n), n)
+            print(f"{n:>10,}  {scalar_ns:>14.1f}  {vector_ns:>14.1f}  {scalar_ns / vector_ns:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
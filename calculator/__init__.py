@@ -0,0 +1,243 @@
+"""
+Smart Advanced Calculator
+
+The calculator is split into submodules:
+
+    core        basic arithmetic and scientific functions
+    trig        degree-based trig kernel (exact special angles, reduction)
+    registry    operation registry behind the menu, expressions and batch mode
+    expression  expression engine (parser, compiler, cache, batch evaluation)
+    templates   quick calculation templates
+    calculus    numerical integration and derivatives of expressions
+    schedule    compound-interest and amortization schedules
+    session     per-user memory, history and variables (CalculatorSession)
+    variables   named variables with incremental (spreadsheet-style) recompute
+    memory      memory register of the default session
+    history     calculation history of the default session
+    history_store  history entries and their ring buffer
+    journal     on-disk JSON Lines history journal
+    history_index  search indexes over the history
+    history_view   virtual-scrolling model for the GUI history pane
+    bignum      big-number results, factorial/power caches, approximations
+    sandbox     cost-bounded evaluation in a killable worker process
+    background  worker-thread evaluation behind the GUI
+    batch       non-interactive batch mode
+    server      local asyncio evaluation server (line-delimited JSON)
+    bench       benchmark suite with JSON results and baseline checks
+    stats       opt-in call counters and latency histograms
+    cli         text-mode calculator and command-line entry point
+    gui         Tkinter GUI
+
+Only ``core`` (and the small ``bignum``, ``registry`` and ``trig`` it uses) is
+imported with the package. Everything else is imported the first time one
+of its names is accessed, so ``from calculator import add`` in a headless
+worker never loads Tkinter, JSON or datetime, and machines without Tk can
+use everything except the GUI.
+
+Run the calculator with: python -m calculator
+"""
+
+import importlib
+
+from .core import (
+    add, subtract, multiply, divide, power, modulus,
+    square_root, sine, cosine, tangent, logarithm, natural_log,
+    factorial, absolute_value, set_exact_trig
+)
+
+# Public name -> submodule that defines it, imported on first access
+_LAZY_ATTRIBUTES = {
+    # registry
+    'Operation': 'registry',
+    'OperationRegistry': 'registry',
+    'register_operation': 'registry',
+    'unregister_operation': 'registry',
+    'get_operation': 'registry',
+    'list_operations': 'registry',
+    # trig
+    'TAN_POLE_MESSAGE': 'trig',
+    'sin_degrees': 'trig',
+    'cos_degrees': 'trig',
+    'tan_degrees': 'trig',
+    'sin_degrees_many': 'trig',
+    'cos_degrees_many': 'trig',
+    'tan_degrees_many': 'trig',
+    # session
+    'CalculatorSession': 'session',
+    'default_session': 'session',
+    # variables
+    'VariableGraph': 'variables',
+    'set_variable': 'variables',
+    'show_variables': 'variables',
+    'get_variables': 'variables',
+    # memory
+    'calculator_memory': 'memory',
+    'memory_clear': 'memory',
+    'memory_recall': 'memory',
+    'memory_add': 'memory',
+    'memory_subtract': 'memory',
+    'memory_store': 'memory',
+    # history
+    'calculation_history': 'history',
+    'add_to_history': 'history',
+    'show_history': 'history',
+    'clear_history': 'history',
+    'export_history': 'history',
+    'set_history_capacity': 'history',
+    'HistoryEntry': 'history_store',
+    'HistoryStore': 'history_store',
+    'enable_history_journal': 'history',
+    'disable_history_journal': 'history',
+    'HistoryJournal': 'journal',
+    'get_history_index': 'history',
+    'search_history': 'history',
+    'show_history_search': 'history',
+    'HistoryIndex': 'history_index',
+    'HistoryViewModel': 'history_view',
+    # expression
+    'ExpressionError': 'expression',
+    'MAX_POWER_BITS': 'expression',
+    'checked_power': 'expression',
+    'FUNCTIONS': 'expression',
+    'CONSTANTS': 'expression',
+    'SAFE_NAMESPACE': 'expression',
+    'tokenize_expression': 'expression',
+    'parse_expression': 'expression',
+    'tree_to_source': 'expression',
+    'optimize_tree': 'expression',
+    'explain_expression': 'expression',
+    'ExpressionCache': 'expression',
+    'expression_cache': 'expression',
+    'compile_expression_text': 'expression',
+    'evaluate_expression': 'expression',
+    'set_expression_cache_size': 'expression',
+    'clear_expression_cache': 'expression',
+    'expression_cache_info': 'expression',
+    'compile_expression': 'expression',
+    'BatchResult': 'expression',
+    'check_variable_names': 'expression',
+    'evaluate_many': 'expression',
+    # bignum
+    'MAX_DISPLAY_DIGITS': 'bignum',
+    'BigNumber': 'bignum',
+    'BigNumberCache': 'bignum',
+    'ApproximateNumber': 'bignum',
+    'factorial_cache': 'bignum',
+    'power_cache': 'bignum',
+    'cached_factorial': 'bignum',
+    'cached_power': 'bignum',
+    'clear_big_number_caches': 'bignum',
+    'approximate_factorial': 'bignum',
+    'log10_factorial': 'bignum',
+    # sandbox
+    'SANDBOX_COST_BITS': 'sandbox',
+    'estimate_tree_cost': 'sandbox',
+    'estimate_expression_cost': 'sandbox',
+    'estimate_power_cost': 'sandbox',
+    'estimate_factorial_cost': 'sandbox',
+    'SandboxWorker': 'sandbox',
+    'get_sandbox_worker': 'sandbox',
+    'evaluate_sandboxed': 'sandbox',
+    'sandboxed_factorial': 'sandbox',
+    'sandboxed_power': 'sandbox',
+    # background
+    'EvaluationResult': 'background',
+    'BackgroundEvaluator': 'background',
+    # calculus
+    'IntegrationResult': 'calculus',
+    'integrate': 'calculus',
+    'differentiate': 'calculus',
+    'derivative': 'calculus',
+    # templates
+    'calculate_percentage': 'templates',
+    'calculate_tip': 'templates',
+    'calculate_discount': 'templates',
+    'calculate_compound_interest': 'templates',
+    'calculate_bmi': 'templates',
+    'TEMPLATE_FORMULAS': 'templates',
+    'BMI_BOUNDS': 'templates',
+    'BMI_CATEGORIES': 'templates',
+    'TipColumns': 'templates',
+    'DiscountColumns': 'templates',
+    'CompoundInterestColumns': 'templates',
+    'BMIColumns': 'templates',
+    'percentage_many': 'templates',
+    'tip_many': 'templates',
+    'discount_many': 'templates',
+    'compound_interest_many': 'templates',
+    'bmi_many': 'templates',
+    # schedule
+    'SCHEDULE_FORMATS': 'schedule',
+    'ScheduleRow': 'schedule',
+    'ScheduleChunk': 'schedule',
+    'schedule_periods': 'schedule',
+    'iter_compound_schedule': 'schedule',
+    'amortization_payment': 'schedule',
+    'iter_amortization_schedule': 'schedule',
+    'write_schedule': 'schedule',
+    'export_schedule': 'schedule',
+    'iter_schedule_matrix': 'schedule',
+    # batch
+    'BATCH_OPERATIONS': 'batch',
+    'BATCH_FORMATS': 'batch',
+    'BatchLine': 'batch',
+    'evaluate_line': 'batch',
+    'iter_batch_results': 'batch',
+    'iter_parallel_results': 'batch',
+    'write_batch_results': 'batch',
+    'run_batch': 'batch',
+    # server
+    'CalculatorServer': 'server',
+    'RequestError': 'server',
+    'parse_request': 'server',
+    'evaluate_request': 'server',
+    'run_server': 'server',
+    # stats
+    'EXPRESSION_PHASES': 'stats',
+    'LatencyHistogram': 'stats',
+    'Instrumentation': 'stats',
+    'instrumentation': 'stats',
+    'enable_stats': 'stats',
+    'disable_stats': 'stats',
+    'reset_stats': 'stats',
+    'get_stats': 'stats',
+    'dump_stats': 'stats',
+    'show_stats': 'stats',
+    'collect_stats': 'stats',
+    # bench
+    'benchmark_cases': 'bench',
+    'run_benchmarks': 'bench',
+    'compare_results': 'bench',
+    'run_bench_suite': 'bench',
+    # cli
+    'calculator': 'cli',
+    'run_tests': 'cli',
+    'main_menu': 'cli',
+    'main': 'cli',
+    # gui
+    'launch_gui': 'gui',
+}
+
+# Module-level state that is rebound at runtime; always read it fresh
+_DYNAMIC_ATTRIBUTES = {'calculator_memory'}
+
+__all__ = [
+    'add', 'subtract', 'multiply', 'divide', 'power', 'modulus',
+    'square_root', 'sine', 'cosine', 'tangent', 'logarithm', 'natural_log',
+    'factorial', 'absolute_value', 'set_exact_trig',
+] + list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"{__name__}.{module_name}")
+    value = getattr(module, name)
+    if name not in _DYNAMIC_ATTRIBUTES:
+        globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,8 @@
+"""Run with: python -m calculator"""
+
+import sys
+
+from .cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Toolkit-independent background evaluation for the GUI (worker thread + result queue)"""
+
+import queue
+import threading
+from collections import namedtuple
+
+from .sandbox import SANDBOX_COST_BITS, SandboxWorker, estimate_expression_cost, evaluate_sandboxed
+from .stats import instrumentation
+
+# request is the number submit() returned; result is None for a preview that
+# was too expensive to evaluate while typing
+EvaluationResult = namedtuple('EvaluationResult', 'request expression result preview')
+
+
+class BackgroundEvaluator:
+    """Evaluates expressions on a worker thread, newest request only.
+
+    submit() queues an expression and returns at once; the GUI collects the
+    result with poll() from a timer. Each submit supersedes everything before
+    it: requests still waiting are skipped, a calculation running in the
+    sandbox process is killed, and results that still arrive for old requests
+    are dropped by poll(). cancel() abandons the newest request the same way.
+
+    Previews (preview=True) are evaluated only if they are cheap enough to run
+    inline; more expensive ones come back with a result of None instead of
+    starting a sandboxed calculation on every keystroke.
+    """
+
+    def __init__(self, timeout=None, worker=None):
+        self.timeout = timeout
+        self.worker = worker or SandboxWorker()
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._latest = 0    # number of the newest request
+        self._answered = 0  # newest request whose result poll() returned (or cancelled)
+        self._running = 0   # number of the request being evaluated, 0 when idle
+        self._cancelled = None  # threading.Event of the running request
+        self._thread = None
+
+    def submit(self, expression, preview=False):
+        """Queue expression for evaluation; returns its request number"""
+        with self._lock:
+            self._supersede()
+            request = self._latest
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="calculator-evaluator",
+                                                daemon=True)
+                self._thread.start()
+        self._requests.put((request, expression, preview))
+        return request
+
+    def cancel(self):
+        """Abandon the newest request (and everything before it)"""
+        with self._lock:
+            self._supersede()
+            self._answered = self._latest
+
+    @property
+    def pending(self):
+        """Whether the newest request's result has yet to be returned by poll()"""
+        return self._answered != self._latest
+
+    def _supersede(self):
+        self._latest += 1
+        if self._running:
+            # The event stops a request that has not reached the sandbox yet;
+            # cancel() kills one that has
+            self._cancelled.set()
+            self.worker.cancel()
+
+    def poll(self):
+        """The newest request's EvaluationResult if it has arrived, else None.
+
+        Results of superseded requests are discarded.
+        """
+        newest = None
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                return newest
+            if result.request == self._latest:
+                newest = result
+                self._answered = result.request
+
+    def _run(self):
+        while True:
+            request, expression, preview = self._requests.get()
+            if request is None:
+                return
+            with self._lock:
+                if request != self._latest:
+                    continue
+                self._running = request
+                self._cancelled = cancelled = threading.Event()
+            try:
+                if preview and estimate_expression_cost(expression) > SANDBOX_COST_BITS:
+                    result = None
+                else:
+                    result = instrumentation.call('expr', evaluate_sandboxed, expression,
+                                                  self.timeout, self.worker, cancelled)
+            except Exception as e:
+                # Report it like any other failed calculation; the thread
+                # must stay alive for the next request
+                result = f"Error: {str(e)}"
+            finally:
+                with self._lock:
+                    self._running = 0
+            self._results.put(EvaluationResult(request, expression, result, preview))
+
+    def close(self):
+        """Stop the worker thread and the sandbox process"""
+        self.cancel()
+        if self._thread is not None:
+            self._requests.put((None, None, None))
+            self._thread.join(1)
+            self._thread = None
+        self.worker.close()
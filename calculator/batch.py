@@ -0,0 +1,218 @@
+"""Non-interactive batch evaluation, serial and in a process pool"""
+
+import sys
+from collections import deque, namedtuple
+from collections.abc import Mapping
+
+from . import templates  # noqa: F401  (registers the quick calculations)
+from .bignum import json_value
+from .expression import evaluate_expression
+from .registry import registry
+from .stats import instrumentation
+
+### ----------- Batch Mode -----------
+class _OperationTable(Mapping):
+    """Live view of the registry: name -> (function, min args, max args) for
+    every operation whose arguments are all numbers"""
+
+    def __getitem__(self, name):
+        spec = self.get(name)
+        if spec is None:
+            raise KeyError(name)
+        return spec
+
+    def get(self, name, default=None):
+        operation = registry.get(name)
+        if operation is None or not operation.numeric:
+            return default
+        return operation.function, operation.min_args, operation.max_args
+
+    def __iter__(self):
+        return (operation.name for operation in registry if operation.numeric)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+# One-line operations accepted by batch mode, including any registered later.
+# Anything else on a line is evaluated as an expression.
+BATCH_OPERATIONS = _OperationTable()
+
+BATCH_FORMATS = ('text', 'csv', 'jsonl')
+
+BatchLine = namedtuple('BatchLine', ['line_number', 'input', 'result', 'error'])
+
+
+def evaluate_line(line):
+    """Evaluate one batch line: 'op arg...' or an expression.
+
+    A line is an operation only if every argument is a plain number, so
+    'sqrt (16)' or 'sqrt 16 + 1' is evaluated as an expression. Returns
+    (result, error); exactly one of them is None.
+    """
+    parts = line.split()
+    spec = BATCH_OPERATIONS.get(parts[0])
+    if spec is not None:
+        try:
+            args = [float(part) for part in parts[1:]]
+        except ValueError:
+            spec = None
+    if spec is None:
+        if parts[0] == 'expr':
+            line = line.split(None, 1)[1] if len(parts) > 1 else ''
+        result = instrumentation.call('expr', evaluate_expression, line)
+    else:
+        function, min_args, max_args = spec
+        if not min_args <= len(parts) - 1 <= max_args:
+            expected = min_args if min_args == max_args else f"{min_args}-{max_args}"
+            return None, f"Error: '{parts[0]}' takes {expected} number(s)!"
+        try:
+            result = instrumentation.call(parts[0], function, *args)
+        except Exception as e:
+            return None, f"Error: {str(e)}"
+    if isinstance(result, str):
+        return None, result
+    return result, None
+
+
+def iter_batch_lines(lines):
+    """Yield (line_number, line) pairs, skipping blanks and # comments"""
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line_number, line
+
+
+def iter_batch_results(lines):
+    """Lazily evaluate an iterable of lines, skipping blanks and # comments"""
+    for line_number, line in iter_batch_lines(lines):
+        result, error = evaluate_line(line)
+        yield BatchLine(line_number, line, result, error)
+
+
+### ----------- Parallel Batch Evaluation -----------
+def evaluate_chunk(lines):
+    """Evaluate a list of lines to (result, error) pairs; runs in worker processes"""
+    return [evaluate_line(line) for line in lines]
+
+
+def _submit_chunk(executor, chunk):
+    return chunk, executor.submit(evaluate_chunk, [line for _, line in chunk])
+
+
+def _chunk_results(chunk, future):
+    # Only results cross the process boundary; the input text stays here.
+    return [BatchLine(number, line, result, error)
+            for (number, line), (result, error) in zip(chunk, future.result())]
+
+
+def iter_chunks(pairs, chunk_size):
+    chunk = []
+    for pair in pairs:
+        chunk.append(pair)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_parallel_results(lines, workers=None, chunk_size=2000, ordered=True):
+    """Evaluate lines across a pool of worker processes.
+
+    Lines are split into chunks and fanned out to a ProcessPoolExecutor. At
+    most two chunks per worker are in flight at a time, so memory stays
+    bounded however large the input is. With ordered=True results come back
+    in input order; with ordered=False each chunk is yielded as soon as it
+    completes (every BatchLine still carries its line number).
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    chunks = iter_chunks(iter_batch_lines(lines), chunk_size)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(_submit_chunk(executor, chunk))
+                if len(pending) >= max_in_flight:
+                    yield from _chunk_results(*pending.popleft())
+            while pending:
+                yield from _chunk_results(*pending.popleft())
+        else:
+            pending = {}
+            for chunk in chunks:
+                chunk, future = _submit_chunk(executor, chunk)
+                pending[future] = chunk
+                if len(pending) >= max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from _chunk_results(pending.pop(future), future)
+            for future in as_completed(pending):
+                yield from _chunk_results(pending[future], future)
+
+
+def _format_batch_result(result):
+    if isinstance(result, dict):
+        return ", ".join(f"{key}={value}" for key, value in result.items())
+    return str(result)
+
+
+def write_batch_results(results, out, fmt='text'):
+    """Stream BatchLine results to a text file object; returns (lines, errors)"""
+    if fmt not in BATCH_FORMATS:
+        raise ValueError(f"Unknown batch format '{fmt}'")
+    import json
+
+    count = errors = 0
+    write = out.write
+    if fmt == 'csv':
+        import csv
+
+        writer = csv.writer(out)
+        writer.writerow(['line', 'input', 'result', 'error'])
+    for item in results:
+        count += 1
+        if item.error is not None:
+            errors += 1
+        if fmt == 'text':
+            shown = item.error if item.error is not None else _format_batch_result(item.result)
+            write(f"{item.input} = {shown}\n")
+        elif fmt == 'csv':
+            shown = '' if item.error is not None else _format_batch_result(item.result)
+            writer.writerow([item.line_number, item.input, shown, item.error or ''])
+        else:
+            write(json.dumps({
+                'line': item.line_number,
+                'input': item.input,
+                'result': json_value(item.result),
+                'error': item.error
+            }) + "\n")
+    return count, errors
+
+
+def run_batch(source='-', output='-', fmt='text', workers=1, ordered=True, chunk_size=2000):
+    """Evaluate a file (or '-' for stdin) line by line without prompting.
+
+    Results are written as they are produced, so memory use does not grow
+    with the input size. Batch mode does not record calculation history.
+    With workers > 1 the lines are evaluated in a process pool
+    (see iter_parallel_results).
+    """
+    infile = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    outfile = sys.stdout if output == '-' else open(output, 'w', encoding='utf-8', newline='')
+    try:
+        if workers > 1:
+            results = iter_parallel_results(infile, workers, chunk_size, ordered)
+        else:
+            results = iter_batch_results(infile)
+        return write_batch_results(results, outfile, fmt)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+        else:
+            outfile.flush()
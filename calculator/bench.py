@@ -0,0 +1,246 @@
+"""Benchmark suite: timings of the public functions, JSON results and baseline checks
+
+Every case is timed with timeit: the call is repeated until one run lasts
+at least min_time seconds, and the best of `repeat` runs is kept, which is
+the least noisy estimate on a busy machine. Results are plain JSON, so a
+run saved with --bench-json can be the --baseline of a later one; a case
+that got slower than its baseline by more than the threshold is a
+regression.
+"""
+
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+
+from .core import (
+    add, subtract, multiply, divide, power, modulus,
+    square_root, sine, cosine, tangent, logarithm, natural_log,
+    factorial, absolute_value
+)
+from .expression import evaluate_expression
+from .session import CalculatorSession
+from .templates import (
+    calculate_percentage, calculate_tip, calculate_discount,
+    calculate_compound_interest, calculate_bmi
+)
+
+BENCH_FORMAT_VERSION = 1
+# Percent slower than the baseline that counts as a regression. Cases that
+# take ~100 ns jitter by about 10% between runs even as best-of-5.
+DEFAULT_THRESHOLD = 20.0
+EXPORT_SIZES = (10_000, 100_000, 1_000_000)
+QUICK_EXPORT_SIZES = (10_000,)
+
+SIMPLE_EXPRESSIONS = ["2+3", "12*7", "100/8", "7-19", "2^10", "15//4", "3.5*2", "1e3+1"]
+NESTED_EXPRESSIONS = [
+    "((1+2)*(3+4))/5",
+    "sqrt(16)+sin(30)*2^3",
+    "abs(-3*(2-7))+log(1000)",
+    "(2+3)*(4-(6/(1+1)))^2",
+    "ln(e^2)+cos(60)*(pi-3)",
+    "-(2^(1+2))*((5//2)+(7-3))",
+]
+
+SCALAR_CASES = [
+    ('add', add, (2.5, 3.5)),
+    ('subtract', subtract, (9.0, 4.5)),
+    ('multiply', multiply, (3.0, 4.0)),
+    ('divide', divide, (10.0, 4.0)),
+    ('power', power, (2.0, 10.0)),
+    ('modulus', modulus, (10.0, 3.0)),
+    ('square_root', square_root, (16.0,)),
+    ('sine', sine, (30.0,)),
+    ('cosine', cosine, (60.0,)),
+    ('tangent', tangent, (45.0,)),
+    ('logarithm', logarithm, (1000.0,)),
+    ('natural_log', natural_log, (10.0,)),
+    ('factorial', factorial, (20,)),
+    ('absolute_value', absolute_value, (-5.0,)),
+]
+
+TEMPLATE_CASES = [
+    ('calculate_percentage', calculate_percentage, (250.0, 15.0)),
+    ('calculate_tip', calculate_tip, (84.2, 18.0, 3)),
+    ('calculate_discount', calculate_discount, (120.0, 25.0)),
+    ('calculate_compound_interest', calculate_compound_interest, (10000.0, 5.0, 10.0, 12)),
+    ('calculate_bmi', calculate_bmi, (70.0, 1.75)),
+]
+
+
+### ----------- Cases -----------
+# A case is (name, make) where make() returns (function, operations per call, cleanup or None)
+
+def _call_case(function, args):
+    def make():
+        return (lambda: function(*args)), 1, None
+    return make
+
+
+def _corpus_case(corpus):
+    def make():
+        def run():
+            for expression in corpus:
+                evaluate_expression(expression)
+        return run, len(corpus), None
+    return make
+
+
+def _append_case(batch=1000):
+    def make():
+        session = CalculatorSession()
+        add_to_history = session.add_to_history
+
+        def run():
+            for i in range(batch):
+                add_to_history("2 + 3", 5)
+        return run, batch, None
+    return make
+
+
+def _export_case(entries):
+    def make():
+        session = CalculatorSession(history_capacity=entries)
+        for i in range(entries):
+            session.history.append(f"{i} * 2", i * 2, timestamp=1.7e9 + i)
+        handle, filename = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+
+        def run():
+            message = session.export_history(filename)
+            if not message.startswith("History exported"):
+                raise RuntimeError(message)
+        return run, entries, lambda: os.remove(filename)
+    return make
+
+
+def benchmark_cases(quick=False):
+    """The suite as a list of (name, make); quick leaves out the big exports"""
+    cases = [(f"scalar.{name}", _call_case(function, args)) for name, function, args in SCALAR_CASES]
+    cases += [
+        ("expression.simple", _corpus_case(SIMPLE_EXPRESSIONS)),
+        ("expression.nested", _corpus_case(NESTED_EXPRESSIONS)),
+    ]
+    cases += [(f"template.{name}", _call_case(function, args)) for name, function, args in TEMPLATE_CASES]
+    cases.append(("history.add_to_history", _append_case()))
+    for entries in (QUICK_EXPORT_SIZES if quick else EXPORT_SIZES):
+        cases.append((f"history.export_history.{entries}", _export_case(entries)))
+    return cases
+
+
+### ----------- Running -----------
+def time_case(make, repeat=5, min_time=0.2):
+    """Best seconds per operation of one case, and the number of timed calls per run"""
+    function, operations, cleanup = make()
+    try:
+        timer = timeit.Timer(function)
+        number = 1
+        while True:
+            elapsed = timer.timeit(number)
+            if elapsed >= min_time / 10:
+                break
+            number *= 10
+        # Scale to the wanted run length
+        number = max(1, int(number * min_time / elapsed))
+        if elapsed >= min_time and number == 1:
+            # Slow case (a big export): fewer repeats, about a second's worth
+            runs = [elapsed] + timer.repeat(min(repeat, max(1, int(1.0 / elapsed))) - 1, 1)
+        else:
+            runs = timer.repeat(repeat, number)
+        return min(runs) / number / operations, number
+    finally:
+        if cleanup is not None:
+            cleanup()
+
+
+def run_benchmarks(quick=False, pattern=None, repeat=5, min_time=0.2, progress=None):
+    """Run the suite; returns the JSON-ready results dict.
+
+    pattern keeps only the cases whose name contains it. progress, if given,
+    is called with (name, result) after each case.
+    """
+    results = {}
+    for name, make in benchmark_cases(quick):
+        if pattern and pattern not in name:
+            continue
+        seconds, number = time_case(make, repeat, min_time)
+        results[name] = {"seconds_per_op": seconds, "ops_per_sec": 1 / seconds if seconds else 0.0,
+                         "calls_per_run": number, "repeat": repeat}
+        if progress is not None:
+            progress(name, results[name])
+    return {
+        "version": BENCH_FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def compare_results(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare two results dicts case by case.
+
+    Returns a list of (name, baseline seconds, current seconds, change in
+    percent, regressed) for the cases present in both.
+    """
+    rows = []
+    baseline_results = baseline.get("results", {})
+    for name, result in current["results"].items():
+        before = baseline_results.get(name)
+        if before is None:
+            continue
+        old, new = before["seconds_per_op"], result["seconds_per_op"]
+        change = (new - old) / old * 100 if old else 0.0
+        rows.append((name, old, new, change, change > threshold))
+    return rows
+
+
+def format_duration(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds * 1e9:.3g} ns"
+
+
+def _print_result(name, result, out):
+    out.write(f"  {name:<40}{format_duration(result['seconds_per_op']):>12}/op"
+              f"{result['ops_per_sec']:>16,.0f} ops/s\n")
+
+
+def run_bench_suite(output=None, baseline=None, threshold=DEFAULT_THRESHOLD, quick=False,
+                    pattern=None, out=None):
+    """Run the suite, print it, optionally save JSON and check a baseline.
+
+    Returns 0, or 1 if any case regressed by more than threshold percent.
+    """
+    import json
+
+    out = sys.stdout if out is None else out
+    out.write(f"⏱️ Benchmarking ({'quick' if quick else 'full'} suite)...\n")
+    # The quick suite also takes shorter, fewer runs: noisier, but a few seconds in all
+    repeat, min_time = (3, 0.05) if quick else (5, 0.2)
+    current = run_benchmarks(quick, pattern, repeat, min_time,
+                             progress=lambda name, result: _print_result(name, result, out))
+    if output:
+        with open(output, 'w') as f:
+            json.dump(current, f, indent=2)
+        out.write(f"Results saved to {output}\n")
+    if not baseline:
+        return 0
+    with open(baseline) as f:
+        reference = json.load(f)
+    rows = compare_results(current, reference, threshold)
+    regressions = [row for row in rows if row[4]]
+    out.write(f"\nCompared with {baseline} (threshold {threshold:g}%):\n")
+    for name, old, new, change, regressed in rows:
+        flag = "  ❌ REGRESSION" if regressed else ""
+        out.write(f"  {name:<40}{format_duration(old):>12} -> {format_duration(new):<12}{change:+7.1f}%{flag}\n")
+    if regressions:
+        out.write(f"{len(regressions)} case(s) regressed by more than {threshold:g}%\n")
+        return 1
+    out.write("No regressions.\n")
+    return 0
@@ -0,0 +1,254 @@
+"""Big-number results: lazy rendering, cached factorials and powers, approximations"""
+
+import math
+import threading
+from collections import OrderedDict
+
+# Integers longer than this are shown as "8.263931688e+5565708 (5,565,709 digits)".
+# Converting an int to decimal takes quadratic time (minutes for 1000000!) and
+# Python refuses ints over 4300 digits by default anyway.
+MAX_DISPLAY_DIGITS = 1000
+
+# Bit length above which integer results are wrapped in BigNumber
+BIG_NUMBER_BITS = int(MAX_DISPLAY_DIGITS / math.log10(2))
+
+# log10(2) split so that shift * _LOG10_2_HI is exact for shifts below 2**27
+_LOG10_2_HI = 0.3010299950838089
+_LOG10_2_LO = 5.801722962879576e-10
+
+
+def _log10_parts(magnitude):
+    """(integer, fraction) parts of log10(magnitude) for a positive int,
+    accurate to about 1e-15 however long the number is"""
+    shift = max(0, magnitude.bit_length() - 64)
+    head = shift * _LOG10_2_HI
+    integer = math.floor(head)
+    fraction = (head - integer) + shift * _LOG10_2_LO + math.log10(magnitude >> shift)
+    carry = math.floor(fraction)
+    return integer + carry, fraction - carry
+
+
+class BigNumber(int):
+    """An integer result that is rendered lazily.
+
+    It is a real int (arithmetic, comparisons and hashing are unchanged),
+    but str() and f-strings show a summary instead of converting millions of
+    digits: scientific notation plus the digit count, computed from the top
+    bits in constant time. Numbers with at most MAX_DISPLAY_DIGITS digits are
+    shown in full.
+    """
+
+    def digit_count(self):
+        magnitude = abs(int(self))
+        if magnitude < 10:
+            return 1
+        exponent, fraction = _log10_parts(magnitude)
+        if fraction < 1e-9 or fraction > 1 - 1e-9:
+            # Too close to a power of ten to trust the float; check exactly
+            exponent = round(exponent + fraction)
+            return exponent + 1 if magnitude >= 10 ** exponent else exponent
+        return exponent + 1
+
+    def scientific(self, digits=10):
+        """'8.263931688e+5565708' with the given number of significant digits"""
+        magnitude = abs(int(self))
+        if magnitude == 0:
+            return "0"
+        exponent, fraction = _log10_parts(magnitude)
+        mantissa = f"{10 ** fraction:.{digits - 1}f}"
+        if mantissa.startswith("10"):
+            exponent += 1
+            mantissa = f"{1:.{digits - 1}f}"
+        sign = "-" if self < 0 else ""
+        return f"{sign}{mantissa}e+{exponent}"
+
+    def truncated(self, edge=12):
+        """'826393168833...000000 (5,565,709 digits)': leading and trailing digits"""
+        count = self.digit_count()
+        if count <= 2 * edge:
+            return int.__repr__(self)
+        magnitude = abs(int(self))
+        _, fraction = _log10_parts(magnitude)
+        scaled = 10 ** (fraction + edge - 1)
+        leading = math.floor(scaled)
+        if edge > 14 or not 1e-3 < scaled - leading < 1 - 1e-3 or leading >= 10 ** edge:
+            # The float cannot decide the last leading digit; divide exactly
+            leading = magnitude // 10 ** (count - edge)
+        trailing = f"{magnitude % 10 ** edge:0{edge}d}"
+        sign = "-" if self < 0 else ""
+        return f"{sign}{leading}...{trailing} ({count:,} digits)"
+
+    def __str__(self):
+        if self.bit_length() <= BIG_NUMBER_BITS:
+            return int.__repr__(self)
+        return f"{self.scientific()} ({self.digit_count():,} digits)"
+
+    def __repr__(self):
+        return f"BigNumber({self})"
+
+    def __format__(self, spec):
+        if not spec:
+            return str(self)
+        return int.__format__(self, spec)
+
+
+def big_result(value):
+    """Wrap an int too long to print comfortably in BigNumber"""
+    if type(value) is int and value.bit_length() > BIG_NUMBER_BITS:
+        return BigNumber(value)
+    return value
+
+
+def json_value(result):
+    """A JSON-serialisable form of a result: huge ints become their summary"""
+    if isinstance(result, int) and not isinstance(result, bool) and result.bit_length() > BIG_NUMBER_BITS:
+        return str(BigNumber(result))
+    return result
+
+
+class BigNumberCache:
+    """LRU cache of big integers, bounded by their total size in bits.
+
+    Shared by all sessions; a lock keeps the size accounting right when
+    threads use it at once (each entry took far longer to compute than the
+    lock takes to acquire).
+    """
+
+    def __init__(self, max_bits=256 * 1024 * 1024):
+        self.max_bits = max_bits
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bits = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = value.bit_length()
+        if size > self.max_bits:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bits -= previous.bit_length()
+            self._entries[key] = value
+            self.bits += size
+            while self.bits > self.max_bits:
+                _, evicted = self._entries.popitem(last=False)
+                self.bits -= evicted.bit_length()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bits = self.hits = self.misses = 0
+
+    def info(self):
+        return {
+            "entries": len(self._entries),
+            "bits": self.bits,
+            "max_bits": self.max_bits,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+factorial_cache = BigNumberCache()
+power_cache = BigNumberCache()
+
+
+def cached_factorial(n):
+    """n! for a non-negative int; big results are cached and returned as BigNumber"""
+    if n.bit_length() * n <= BIG_NUMBER_BITS:
+        return math.factorial(n)
+    result = factorial_cache.get(n)
+    if result is None:
+        result = big_result(math.factorial(n))
+        if isinstance(result, BigNumber):
+            factorial_cache.put(n, result)
+    return result
+
+
+def cached_power(x, y):
+    """x ** y; big integer results are cached and returned as BigNumber"""
+    if not (type(x) is int and type(y) is int) or y < 2 or abs(x) < 2:
+        return x ** y
+    if y * math.log2(abs(x)) <= BIG_NUMBER_BITS:
+        return x ** y
+    key = (x, y)
+    result = power_cache.get(key)
+    if result is None:
+        result = big_result(x ** y)
+        power_cache.put(key, result)
+    return result
+
+
+def clear_big_number_caches():
+    factorial_cache.clear()
+    power_cache.clear()
+    return "Big number caches cleared!"
+
+
+### ----------- Approximations -----------
+class ApproximateNumber:
+    """mantissa * 10**exponent, for results too large to compute exactly.
+
+    digits is the number of significant digits of the mantissa that can be
+    trusted.
+    """
+
+    __slots__ = ('mantissa', 'exponent', 'digits')
+
+    def __init__(self, mantissa, exponent, digits=9):
+        self.mantissa = mantissa
+        self.exponent = exponent
+        self.digits = digits
+
+    def __float__(self):
+        try:
+            return self.mantissa * 10.0 ** self.exponent
+        except OverflowError:
+            return math.inf
+
+    def __str__(self):
+        return f"≈ {self.mantissa:.{self.digits - 1}f}e+{self.exponent}"
+
+    def __repr__(self):
+        return f"ApproximateNumber({self.mantissa!r}, {self.exponent!r}, {self.digits!r})"
+
+
+def log10_factorial(n):
+    """log10(n!) from the log-gamma function (Stirling's series for large n)"""
+    return math.lgamma(n + 1) / math.log(10)
+
+
+def approximate_factorial(n):
+    """n! as an ApproximateNumber, in constant time for any n up to ~1e12.
+
+    The absolute error of log10(n!) grows with its size, so fewer mantissa
+    digits are reliable for larger n: nine around a million, four around a
+    billion.
+    """
+    if n < 0:
+        return "Error: Factorial undefined for negative numbers!"
+    if not float(n).is_integer():
+        return "Error: Factorial only defined for integers!"
+    logarithm = log10_factorial(float(n))
+    # A few ulps of error in log10 become this relative error in the mantissa
+    error = 4 * math.ulp(logarithm) * math.log(10)
+    if not error < 0.05:
+        return "Error: Number too large to approximate!"
+    digits = max(1, min(9, math.floor(-math.log10(error))))
+    exponent = math.floor(logarithm)
+    mantissa = round(10 ** (logarithm - exponent), digits - 1)
+    if mantissa >= 10:
+        mantissa, exponent = mantissa / 10, exponent + 1
+    return ApproximateNumber(mantissa, exponent, digits)
@@ -0,0 +1,428 @@
+"""Numerical calculus over expressions: adaptive integration and derivatives
+
+    integrate("1/(1+x^2)", "x", 0, 1)       # 0.7853981633974483 (pi/4)
+    derivative("x^3 + sin(x)", "x", 2)      # 12.017442660445713
+    differentiate("x^3 + sin(x)", "x")      # '3 * x ^ 2 + cos(x) * (pi / 180)'
+
+Both work on the expressions of calculator.expression, with the same
+functions and constants. As everywhere in the calculator, sin, cos and tan
+take degrees, so their derivatives carry a factor pi/180.
+"""
+
+import math
+import sys
+from collections import namedtuple
+
+from .expression import (
+    ExpressionError, check_variable_names, compile_expression, compile_vector_code,
+    get_vector_namespace, parse_expression, _require_numpy
+)
+from .registry import register_operation
+
+### ----------- Integration -----------
+# Adaptive Gauss-Kronrod quadrature. Every interval that is not yet accurate
+# enough is split in two, and all intervals of a refinement level are
+# evaluated together: their 15 nodes each go into one evaluation of the
+# expression's vectorized code (as in evaluate_many), so a level costs one
+# pass of NumPy code however many intervals it has.
+IntegrationResult = namedtuple('IntegrationResult',
+                               ['value', 'error', 'evaluations', 'intervals', 'converged'])
+IntegrationResult.__doc__ = """Result of integrate(..., details=True).
+
+value: the integral; error: estimated absolute error; evaluations: number
+of integrand evaluations; intervals: subintervals in the final partition;
+converged: False if max_evaluations ran out before the tolerance was met
+"""
+
+# Kronrod nodes on [0, 1) for the 15-point rule (7-point Gauss nodes are the
+# odd ones) with their weights, from QUADPACK's qk15
+_KRONROD_NODES = (0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                  0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                  0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                  0.207784955007898467600689403773245, 0.0)
+_KRONROD_WEIGHTS = (0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                    0.204432940075298892414161999234649, 0.209482141084727828012999174891714)
+_GAUSS_WEIGHTS = (0.0, 0.129484966168869693270611432679082, 0.0, 0.279705391489276667901467771423780,
+                  0.0, 0.381830050505118944950369775488975, 0.0, 0.417959183673469387755102040816327)
+
+DEFAULT_TOLERANCE = 1e-10
+MAX_EVALUATIONS = 150_000
+
+_rule = None
+
+
+def _gauss_kronrod_rule():
+    """(nodes, weights) on [-1, 1] as arrays, built on first use.
+
+    weights has two columns, the Kronrod weights and their difference from
+    the Gauss weights, so samples @ weights gives each interval's estimate
+    and its error in one product.
+    """
+    global _rule
+    if _rule is None:
+        np = _require_numpy()
+
+        def mirrored(values, sign):
+            return np.array([sign * v for v in values[:-1]] + [values[-1]] + list(values[-2::-1]))
+        kronrod, gauss = mirrored(_KRONROD_WEIGHTS, 1), mirrored(_GAUSS_WEIGHTS, 1)
+        _rule = (mirrored(_KRONROD_NODES, -1), np.column_stack((kronrod, kronrod - gauss)))
+    return _rule
+
+
+def integrate(expression, var, a, b, tol=DEFAULT_TOLERANCE, max_evaluations=MAX_EVALUATIONS,
+              details=False):
+    """Integral of expression over var from a to b.
+
+    Refines until the estimated error is below tol, absolute or relative to
+    the integral, whichever is larger. Returns the value (an
+    IntegrationResult with details=True), or an error string if the
+    expression is invalid, the integrand is undefined somewhere in [a, b]
+    or the tolerance is not met within max_evaluations. Needs NumPy.
+    """
+    np = _require_numpy()
+    try:
+        code = compile_vector_code(expression, [var])
+    except ExpressionError as e:
+        return f"Error: {e}"
+    a, b = float(a), float(b)
+    if not (math.isfinite(a) and math.isfinite(b)):
+        return "Error: Integration bounds must be finite!"
+    if a == b:
+        return IntegrationResult(0.0, 0.0, 0, 0, True) if details else 0.0
+    sign = 1.0
+    if a > b:
+        a, b, sign = b, a, -1.0
+    nodes, weights = _gauss_kronrod_rule()
+    namespace = get_vector_namespace()
+
+    # All intervals of a level have the same half-width; each row of points
+    # holds the nodes of one interval
+    centers = np.array([(a + b) / 2])
+    half = width = (b - a) / 2
+    accepted_value = accepted_error = 0.0
+    evaluations = intervals = 0
+    converged = True
+    while len(centers):
+        points = centers[:, None] + half * nodes
+        with np.errstate(all='ignore'):
+            samples = eval(code, namespace, {var: points})
+            if np.ndim(samples) != 2:
+                samples = np.broadcast_to(samples, points.shape)
+            estimates = samples @ weights * half
+        evaluations += points.size
+        if not np.isfinite(estimates).all():
+            undefined = points[~np.isfinite(samples)]
+            where = f" at {var} = {undefined[0]:.10g}" if len(undefined) else ""
+            return f"Error: Integrand is undefined or infinite{where}!"
+        kronrod = estimates[:, 0]
+        errors = np.abs(estimates[:, 1])
+        # Each interval may use its share of the tolerance
+        tolerance = max(tol, tol * abs(accepted_value + kronrod.sum()))
+        done = errors <= tolerance * half / width
+        if done.all():
+            accepted_value += kronrod.sum()
+            accepted_error += errors.sum()
+            intervals += len(done)
+            break
+        remaining = len(done) - int(done.sum())
+        if evaluations + 2 * remaining * len(nodes) > max_evaluations or half < 1e-13 * width:
+            # Out of budget, or down to rounding error: take what we have
+            converged = bool(accepted_error + errors.sum() <= tolerance)
+            done[:] = True
+        accepted_value += kronrod[done].sum()
+        accepted_error += errors[done].sum()
+        intervals += int(done.sum())
+        # Split the rest in two for the next level
+        half /= 2
+        rest = centers[~done]
+        centers = np.concatenate((rest - half, rest + half))
+
+    value = sign * float(accepted_value)
+    if details:
+        return IntegrationResult(value, float(accepted_error), evaluations, intervals, converged)
+    if not converged:
+        return (f"Error: Integral did not converge (estimate {value:.10g}, "
+                f"error {float(accepted_error):.2g})!")
+    return value
+
+
+### ----------- Derivatives -----------
+# The expression tree is differentiated symbolically; the result is an
+# ordinary expression, compiled like any other. Trees that have no symbolic
+# derivative here (floor division, registered functions) fall back to a
+# central finite difference.
+class _NotDifferentiable(Exception):
+    pass
+
+
+_ZERO = ('num', 0)
+_ONE = ('num', 1)
+# sin, cos and tan take degrees: d/dx sin(x) = cos(x) * pi/180
+_DEGREE = ('/', ('name', 'pi'), ('num', 180))
+
+
+def _add(left, right):
+    if left == _ZERO:
+        return right
+    if right == _ZERO:
+        return left
+    if left[0] == right[0] == 'num':
+        return ('num', left[1] + right[1])
+    return ('+', left, right)
+
+
+def _sub(left, right):
+    if right == _ZERO:
+        return left
+    if left == _ZERO:
+        return _neg(right)
+    if left[0] == right[0] == 'num':
+        return ('num', left[1] - right[1])
+    return ('-', left, right)
+
+
+def _mul(left, right):
+    if left == _ZERO or right == _ZERO:
+        return _ZERO
+    if left == _ONE:
+        return right
+    if right == _ONE:
+        return left
+    if left[0] == right[0] == 'num':
+        return ('num', left[1] * right[1])
+    return ('*', left, right)
+
+
+def _div(left, right):
+    if left == _ZERO:
+        return _ZERO
+    if right == _ONE:
+        return left
+    return ('/', left, right)
+
+
+def _neg(node):
+    if node[0] == 'num':
+        return ('num', -node[1])
+    if node[0] == 'neg':
+        return node[1]
+    if node[0] == '*' and node[1][0] == 'num':
+        return _mul(_neg(node[1]), node[2])
+    return ('neg', node)
+
+
+def _power(base, exponent):
+    if exponent == _ONE:
+        return base
+    if exponent == _ZERO:
+        return _ONE
+    return ('**', base, exponent)
+
+
+def _call(name, *args):
+    return ('call', name, args)
+
+
+def _depends(node, var):
+    """True if var occurs in the tree"""
+    kind = node[0]
+    if kind == 'num':
+        return False
+    if kind == 'name':
+        return node[1] == var
+    if kind == 'call':
+        return any(_depends(arg, var) for arg in node[2])
+    return any(_depends(child, var) for child in node[1:])
+
+
+def _d(node, var):
+    """Derivative of a tree with respect to var, as a tree"""
+    if not _depends(node, var):
+        return _ZERO
+    kind = node[0]
+    if kind == 'name':
+        return _ONE
+    if kind == 'neg':
+        return _neg(_d(node[1], var))
+    if kind == 'pos':
+        return _d(node[1], var)
+    if kind == 'call':
+        return _d_call(node[1], node[2], var)
+    u, v = node[1], node[2]
+    if kind == '+':
+        return _add(_d(u, var), _d(v, var))
+    if kind == '-':
+        return _sub(_d(u, var), _d(v, var))
+    if kind == '*':
+        return _add(_mul(_d(u, var), v), _mul(u, _d(v, var)))
+    if kind == '/':
+        if not _depends(v, var):
+            return _div(_d(u, var), v)
+        return _div(_sub(_mul(_d(u, var), v), _mul(u, _d(v, var))), _power(v, ('num', 2)))
+    if kind == '**':
+        if not _depends(v, var):
+            # n * u^(n-1) * u'
+            return _mul(_mul(v, _power(u, _sub(v, _ONE))), _d(u, var))
+        if not _depends(u, var):
+            # u^v * ln(u) * v'
+            if u == ('name', 'e'):
+                return _mul(node, _d(v, var))
+            return _mul(_mul(node, _call('ln', u)), _d(v, var))
+        # u^v * (v' * ln(u) + v * u' / u)
+        return _mul(node, _add(_mul(_d(v, var), _call('ln', u)), _div(_mul(v, _d(u, var)), u)))
+    raise _NotDifferentiable(kind)
+
+
+def _d_call(name, args, var):
+    u = args[0]
+    if name == 'sqrt':
+        outer = _div(_ONE, _mul(('num', 2), _call('sqrt', u)))
+    elif name == 'sin':
+        outer = _mul(_call('cos', u), _DEGREE)
+    elif name == 'cos':
+        outer = _neg(_mul(_call('sin', u), _DEGREE))
+    elif name == 'tan':
+        outer = _div(_DEGREE, _power(_call('cos', u), ('num', 2)))
+    elif name == 'log':
+        outer = _div(_ONE, _mul(u, _call('ln', ('num', 10))))
+    elif name == 'ln' and len(args) == 2:
+        # ln(u, base) = ln(u) / ln(base)
+        return _d(('/', _call('ln', u), _call('ln', args[1])), var)
+    elif name == 'ln':
+        outer = _div(_ONE, u)
+    elif name == 'abs':
+        outer = _div(u, _call('abs', u))
+    else:
+        raise _NotDifferentiable(name)
+    if outer[0] == '/' and outer[1] == _ONE:
+        # 1/g(u) * u' reads better as u' / g(u)
+        return _div(_d(u, var), outer[2])
+    return _mul(outer, _d(u, var))
+
+
+# Binding strength of each node kind when printed back as calculator syntax
+_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, '//': 2, 'neg': 3, 'pos': 3, '**': 4}
+_ATOM = 5
+
+
+def _format(node):
+    """(text, precedence) of a tree in calculator syntax"""
+    kind = node[0]
+    if kind == 'num':
+        if node[1] < 0:
+            return f"-{-node[1]!r}", _PRECEDENCE['neg']
+        return repr(node[1]), _ATOM
+    if kind == 'name':
+        return node[1], _ATOM
+    if kind == 'call':
+        return f"{node[1]}({', '.join(_format(arg)[0] for arg in node[2])})", _ATOM
+    precedence = _PRECEDENCE[kind]
+    if kind in ('neg', 'pos'):
+        text, inner = _format(node[1])
+        sign = '-' if kind == 'neg' else '+'
+        return f"{sign}{text if inner >= precedence else f'({text})'}", precedence
+    left, left_precedence = _format(node[1])
+    right, right_precedence = _format(node[2])
+    if kind == '**':
+        # The base of a power must be an atom: -x^2 is -(x^2)
+        left_needed, right_needed, symbol = _ATOM, _PRECEDENCE['neg'], '^'
+    else:
+        # Left-associative: a - (b - c) keeps its parentheses
+        left_needed, right_needed, symbol = precedence, precedence + 1, kind
+    if left_precedence < left_needed:
+        left = f"({left})"
+    if right_precedence < right_needed:
+        right = f"({right})"
+    return f"{left} {symbol} {right}", precedence
+
+
+def _derivative_tree(expression, var):
+    check_variable_names([var])
+    return _d(parse_expression(expression, variables=[var]), var)
+
+
+def differentiate(expression, var):
+    """Symbolic derivative of expression with respect to var, as an expression.
+
+    Raises ExpressionError if the expression is invalid or has no symbolic
+    derivative (floor division, functions registered by plugins).
+    """
+    try:
+        return _format(_derivative_tree(expression, var))[0]
+    except _NotDifferentiable as e:
+        raise ExpressionError(f"Cannot differentiate '{e}' symbolically!") from None
+
+
+def _finite_difference(expression, var, at):
+    """Five-point central difference, accurate to O(h^4)"""
+    function = compile_expression(expression, [var])
+    h = sys.float_info.epsilon ** 0.2 * max(1.0, abs(at))
+    return (function(at - 2 * h) - 8 * function(at - h)
+            + 8 * function(at + h) - function(at + 2 * h)) / (12 * h)
+
+
+def derivative(expression, var, at):
+    """Value of the derivative of expression with respect to var at var = at.
+
+    Uses the symbolic derivative (see differentiate) and falls back to a
+    finite difference where there is none. Returns an error string if the
+    expression is invalid or the derivative is undefined at that point.
+    """
+    at = float(at)
+    try:
+        try:
+            tree = _derivative_tree(expression, var)
+        except _NotDifferentiable:
+            result = _finite_difference(expression, var, at)
+        else:
+            result = compile_expression(_format(tree)[0], [var])(at)
+        result = float(result)
+    except ExpressionError as e:
+        return f"Error: {e}"
+    except OverflowError:
+        return f"Error: Derivative is too large at {var} = {at:g}!"
+    except (ArithmeticError, ValueError):
+        return f"Error: Derivative is undefined at {var} = {at:g}!"
+    if not math.isfinite(result):
+        return f"Error: Derivative is undefined at {var} = {at:g}!"
+    return result
+
+
+### ----------- REPL Operations -----------
+_CALCULUS = "Calculus"
+
+
+def _integrate_command(expression, a, b, var='x'):
+    return integrate(expression, var, a, b)
+
+
+def _derivative_command(expression, at, var='x'):
+    return derivative(expression, var, at)
+
+
+def _format_derivative(args, result):
+    expression, at = args[:2]
+    var = args[2] if len(args) > 2 else 'x'
+    try:
+        text = f"d/d{var} {expression} = {differentiate(expression, var)}\n"
+    except ExpressionError:
+        text = f"d/d{var} {expression}: no symbolic derivative, using a finite difference\n"
+    return f"{text}✅ At {var} = {at:g}: {result}"
+
+
+register_operation('integ', _integrate_command, (3, 4),
+                   prompts=("Enter expression to integrate: ", "Enter lower bound: ",
+                            "Enter upper bound: ", "Variable (press Enter for x): "),
+                   parsers=(str, float, float, str),
+                   label=lambda expression, a, b, var='x': f"∫[{a:g}, {b:g}] {expression} d{var}",
+                   formatter=lambda args, result: f"✅ Integral = {result}",
+                   description="Definite integral (e.g., 'x^2' from 0 to 1)", category=_CALCULUS)
+register_operation('deriv', _derivative_command, (2, 3),
+                   prompts=("Enter expression to differentiate: ", "At what point? ",
+                            "Variable (press Enter for x): "),
+                   parsers=(str, float, str),
+                   label=lambda expression, at, var='x': f"d/d{var} {expression} at {var}={at:g}",
+                   formatter=_format_derivative,
+                   description="Derivative at a point (e.g., 'x^3' at 2)", category=_CALCULUS)
@@ -0,0 +1,388 @@
+"""Interactive text-mode calculator, main menu and command-line entry point"""
+
+import os
+import sys
+
+from .core import (
+    add, subtract, multiply, divide, power, modulus,
+    square_root, absolute_value
+)
+from .memory import memory_clear, memory_recall, memory_add, memory_subtract, memory_store
+from .history import (
+    add_to_history, show_history, show_history_search, clear_history, export_history,
+    enable_history_journal
+)
+from .registry import registry
+from .sandbox import sandboxed
+from .schedule import iter_compound_schedule, write_schedule, export_schedule
+from .batch import BATCH_FORMATS, run_batch
+from . import calculus  # noqa: F401  (registers integ and deriv)
+from .variables import get_variables, parse_assignment, set_variable, show_variables
+from .stats import instrumentation, enable_stats, disable_stats, reset_stats, dump_stats, show_stats
+from .bench import DEFAULT_THRESHOLD
+
+# Runs an operation, recording it in the statistics when they are enabled
+record = instrumentation.call
+
+# Width of one menu column ("name : description")
+MENU_COLUMN = 26
+
+# ----------- Main Calculator Function -----------
+def menu_lines(entries):
+    """(name, description) pairs laid out two per line; long ones get a line of their own"""
+    lines = []
+    pending = None
+    for name, description in entries:
+        entry = f"{name:<4} : {description}"
+        if len(entry) >= MENU_COLUMN:
+            if pending:
+                lines.append(f"    {pending}")
+                pending = None
+            lines.append(f"    {entry}")
+        elif pending:
+            lines.append(f"    {pending:<{MENU_COLUMN}}{entry}")
+            pending = None
+        else:
+            pending = entry
+    if pending:
+        lines.append(f"    {pending}")
+    return lines
+
+
+def print_menu():
+    print("\n📋 Available operations:")
+    for category, operations in registry.categories().items():
+        print(f"\n  {category}:")
+        for line in menu_lines((operation.name, operation.description) for operation in operations):
+            print(line)
+    print("\n  Memory Functions:")
+    print("    mc   : Memory Clear       mr  : Memory Recall")
+    print("    m+   : Memory Add         m-  : Memory Subtract")
+    print("    ms   : Memory Store")
+    print("\n  History Functions:")
+    print("    hist : Show History       clear : Clear History")
+    print("    export : Export History")
+    print("    hist find <text> | hist since <date> | hist result>N : Search History")
+    print("\n  Variables:")
+    print("    name = formula : Define a variable, e.g. rate = 5.5, monthly = rate/12/100")
+    print("    vars : Show Variables     <name> : Show one variable's value")
+    print("\n  Statistics:")
+    print("    stats : Show Statistics   stats on | off | reset | save <file>")
+    print("\n  Type 'q' to quit\n")
+
+
+def read_arguments(operation):
+    """Prompt for an operation's arguments; optional ones end at an empty answer.
+
+    Raises ValueError on input that does not parse or a missing argument.
+    """
+    args = []
+    for index, (prompt, parse) in enumerate(zip(operation.prompts, operation.parsers)):
+        text = input(prompt).strip()
+        if not text:
+            if index >= operation.min_args:
+                break
+            raise ValueError("missing argument")
+        args.append(parse(text))
+    return args
+
+
+def run_operation(operation):
+    """Read the arguments of a registered operation, run it, print and record the result"""
+    try:
+        args = read_arguments(operation)
+    except ValueError:
+        if not operation.numeric:
+            print("❌ No input provided!")
+        elif operation.max_args == 1:
+            print("❌ Invalid input! Please enter a numeric value.")
+        else:
+            print("❌ Invalid input! Please enter numeric values.")
+        return
+    try:
+        # Factorials, powers and expressions that may blow up run in the sandbox
+        result = record(operation.name, sandboxed(operation.function), *args)
+    except Exception as e:
+        result = f"Error: {str(e)}"
+    if isinstance(result, str):
+        print(f"❌ {result}")
+    else:
+        print(operation.format_result(args, result))
+        add_to_history(operation.history_label(args), operation.history_value(result))
+    followup = REPL_FOLLOWUPS.get(operation.name)
+    if followup is not None:
+        followup(args, result)
+
+
+def calculator():
+    print("=" * 70)
+    print("🧮 Welcome to Advanced Python Calculator 🧮")
+    print("=" * 70)
+    print_menu()
+    print("=" * 70)
+
+    while True:
+        line = input("\n➤ Enter operation or 'q' to quit: ").strip()
+        operation = line.lower()
+        if operation == 'q':
+            print("\n" + "=" * 70)
+            print("👋 Goodbye! Thanks for using Advanced Python Calculator.")
+            print("=" * 70)
+            break
+
+        command, _, argument = operation.partition(' ')
+        handler = COMMANDS.get(command)
+        if handler is not None and (not argument or command in ARGUMENT_COMMANDS):
+            message = handler(argument.strip())
+            if message:
+                print(message)
+            continue
+
+        assignment = parse_assignment(line)
+        if assignment is not None:
+            print(variable_command(*assignment))
+            continue
+
+        entry = registry.get(operation)
+        if entry is None:
+            variables = get_variables()
+            if line in variables:
+                print(f"{line} = {variables[line]}")
+            else:
+                print("❌ Invalid operation! Please choose a valid operation from the list.\n")
+            continue
+        run_operation(entry)
+
+### ----------- REPL Commands -----------
+def history_command(argument):
+    """'hist' shows the history, 'hist <query>' searches it"""
+    if not argument:
+        show_history()
+        return ""
+    message = show_history_search(argument)
+    return f"❌ {message}" if message.startswith("Error") else message
+
+def _memory_value_command(function):
+    def command(argument):
+        try:
+            value = float(input("Enter value: "))
+        except ValueError:
+            return "❌ Invalid input! Please enter a numeric value."
+        return f"✅ {function(value)}"
+    return command
+
+def variable_command(name, formula):
+    """'name = formula' defines a variable and shows what was recomputed"""
+    message = set_variable(name, formula)
+    if message.startswith("Error"):
+        return f"❌ {message}"
+    # Defined, but its value is an error (undefined input, division by zero, ...)
+    return f"⚠️ {message}" if isinstance(get_variables()[name], str) else f"✅ {message}"
+
+def vars_command(argument):
+    message = show_variables()
+    return message or ""
+
+def factorial_hint(args, result):
+    if isinstance(result, str) and "cancelled" in result:
+        print("💡 Tip: use '!~' for an instant approximation")
+
+def schedule_prompt(args, result):
+    """After 'ci': offer to print or export the period-by-period schedule"""
+    if isinstance(result, str):
+        return
+    principal, rate, time = args[:3]
+    compounds = args[3] if len(args) > 3 else 1
+    choice = input("\nSchedule? (Enter to skip, 'p' to print, or a .csv/.jsonl filename): ").strip()
+    if not choice:
+        return
+    try:
+        contribution_input = input("Contribution per period (press Enter for 0): ").strip()
+        contribution = float(contribution_input) if contribution_input else 0.0
+    except ValueError:
+        print("❌ Invalid input! Please enter numeric values.")
+        return
+    rows = iter_compound_schedule(principal, rate, time, compounds, contribution)
+    if choice.lower() == 'p':
+        print()
+        write_schedule(rows, sys.stdout)
+    else:
+        message = export_schedule(rows, choice)
+        print(f"❌ {message}" if message.startswith("Error") else f"✅ {message}")
+
+### ----------- Extra Features -----------
+def stats_command(argument):
+    """The 'stats' REPL command: show, 'on', 'off', 'reset' or 'save <file>'"""
+    if not argument:
+        show_stats()
+        return ""
+    command, _, filename = argument.partition(' ')
+    if command == 'on':
+        return f"✅ {enable_stats()}"
+    if command == 'off':
+        return f"✅ {disable_stats()}"
+    if command == 'reset':
+        return f"✅ {reset_stats()}"
+    if command == 'save':
+        message = dump_stats(filename.strip() or "calculator_stats.json")
+        return f"❌ {message}" if message.startswith("Error") else f"✅ {message}"
+    return "❌ Usage: stats [on | off | reset | save <file>]"
+
+# REPL commands that are not calculations: name -> handler(argument) returning
+# the message to print. Only those in ARGUMENT_COMMANDS accept an argument.
+COMMANDS = {
+    'hist': history_command,
+    'clear': lambda argument: f"✅ {clear_history()}",
+    'export': lambda argument: f"✅ {export_history()}",
+    'stats': stats_command,
+    'vars': vars_command,
+    'mc': lambda argument: f"✅ {memory_clear()}",
+    'mr': lambda argument: f"✅ Memory value: {memory_recall()}",
+    'm+': _memory_value_command(memory_add),
+    'm-': _memory_value_command(memory_subtract),
+    'ms': _memory_value_command(memory_store),
+}
+ARGUMENT_COMMANDS = ('hist', 'stats')
+
+# Extra interactive steps after an operation: name -> followup(args, result)
+REPL_FOLLOWUPS = {
+    '!': factorial_hint,
+    'ci': schedule_prompt,
+}
+
+def run_tests():
+    print("\n🧩 Running basic tests...")
+    assert add(2,3) == 5
+    assert subtract(5,2) == 3
+    assert multiply(3,4) == 12
+    assert divide(10,2) == 5
+    assert power(2,3) == 8
+    assert modulus(10,3) == 1
+    assert square_root(16) == 4
+    assert absolute_value(-5) == 5
+    print("✅ All tests passed!")
+
+
+### ----------- Program Entry -----------
+def main_menu():
+    print("\n📘 MAIN MENU")
+    print("1. Run Calculator (Text Mode)")
+    print("2. Run GUI Calculator")
+    print("3. Show History")
+    print("4. Run Tests")
+    print("5. Export History")
+    print("6. Quit")
+    print("7. Run Benchmarks")
+
+    choice = input("Choose an option: ").strip()
+
+    if choice == '1':
+        calculator()
+    elif choice == '2':
+        from .gui import launch_gui
+        launch_gui()
+    elif choice == '3':
+        show_history()
+    elif choice == '4':
+        run_tests()
+    elif choice == '5':
+        print(export_history())
+    elif choice == '7':
+        from .bench import run_bench_suite
+        run_bench_suite(quick=True)
+    else:
+        print("👋 Goodbye!")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Advanced Python Calculator")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="evaluate expressions or operations from FILE ('-' for stdin) without prompting")
+    parser.add_argument('--format', choices=BATCH_FORMATS, default='text',
+                        help="batch output format (default: text)")
+    parser.add_argument('--output', default='-', metavar='FILE',
+                        help="write batch results to FILE instead of stdout")
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help="evaluate batch input in N worker processes (default: 1)")
+    parser.add_argument('--chunk-size', type=int, default=2000, metavar='N',
+                        help="lines per work unit sent to a worker (default: 2000)")
+    parser.add_argument('--unordered', action='store_true',
+                        help="with --workers, write results as chunks complete instead of in input order")
+    parser.add_argument('--serve', metavar='[HOST:]PORT',
+                        help="run the line-delimited JSON evaluation server on HOST:PORT (default host 127.0.0.1)")
+    parser.add_argument('--socket', metavar='PATH',
+                        help="run the evaluation server on a Unix socket at PATH")
+    parser.add_argument('--bench', action='store_true',
+                        help="run the benchmark suite and exit (1 if a case regressed against --baseline)")
+    parser.add_argument('--quick', action='store_true',
+                        help="with --bench, leave out the 100k and 1M entry history exports")
+    parser.add_argument('--bench-json', metavar='FILE',
+                        help="with --bench, save the results as JSON (usable as a later --baseline)")
+    parser.add_argument('--baseline', metavar='FILE',
+                        help="with --bench, compare against the results saved in FILE")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, metavar='PCT',
+                        help=f"with --baseline, percent slowdown that counts as a regression "
+                             f"(default: {DEFAULT_THRESHOLD:g})")
+    parser.add_argument('--bench-filter', metavar='TEXT',
+                        help="with --bench, only run cases whose name contains TEXT")
+    parser.add_argument('--explain', metavar='EXPR',
+                        help="print the Python code EXPR compiles to, before and after optimization")
+    parser.add_argument('--stats', nargs='?', const='-', metavar='FILE',
+                        help="record per-operation statistics; batch mode prints them to stderr "
+                             "at the end, or saves them as JSON to FILE")
+    parser.add_argument('--history-dir', metavar='DIR',
+                        default=os.path.join(os.path.expanduser("~"), ".calculator_history"),
+                        help="directory of the history journal (default: ~/.calculator_history)")
+    parser.add_argument('--no-history-file', action='store_true',
+                        help="keep history in memory only")
+    args = parser.parse_args(argv)
+
+    if args.explain is not None:
+        from .expression import ExpressionError, explain_expression
+
+        try:
+            print(explain_expression(args.explain))
+        except ExpressionError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        return 0
+    if args.bench:
+        from .bench import run_bench_suite
+
+        return run_bench_suite(args.bench_json, args.baseline, args.threshold,
+                               quick=args.quick, pattern=args.bench_filter)
+    if args.serve or args.socket:
+        from .server import DEFAULT_HOST, run_server
+
+        host, _, port = (args.serve or '').rpartition(':')
+        try:
+            port = int(port) if port else 0
+        except ValueError:
+            parser.error(f"invalid --serve address '{args.serve}'")
+        run_server(host or DEFAULT_HOST, port, path=args.socket, workers=max(1, args.workers))
+        return 0
+    if args.stats:
+        enable_stats()
+    if args.batch is None:
+        if not args.no_history_file:
+            try:
+                enable_history_journal(args.history_dir)
+            except OSError as e:
+                print(f"⚠️ History will not be saved: {e}")
+        main_menu()
+        return 0
+    try:
+        run_batch(args.batch, args.output, args.format,
+                  workers=args.workers, ordered=not args.unordered, chunk_size=args.chunk_size)
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head); silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    if args.stats == '-':
+        show_stats(sys.stderr)
+    elif args.stats:
+        print(dump_stats(args.stats), file=sys.stderr)
+    return 0
+
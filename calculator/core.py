@@ -0,0 +1,140 @@
+"""Basic arithmetic and scientific functions"""
+
+import math
+
+from .bignum import approximate_factorial, cached_factorial, cached_power
+from .registry import register_operation
+from .trig import (
+    cos_degrees, cos_degrees_many, sin_degrees, sin_degrees_many, tan_degrees, tan_degrees_many,
+    plain_cos, plain_cos_many, plain_sin, plain_sin_many, plain_tan, plain_tan_many
+)
+
+# Whether sin, cos and tan use the exact degree kernel (see set_exact_trig)
+EXACT_TRIG = False
+
+### ----------- Basic Arithmetic Functions -----------
+def add(x, y):
+    return x + y
+
+def subtract(x, y):
+    return x - y
+
+def multiply(x, y):
+    return x * y
+
+def divide(x, y):
+    if y == 0:
+        return "Error: Division by zero is not allowed!"
+    return x / y
+
+def power(x, y):
+    return cached_power(x, y)
+
+def modulus(x, y):
+    if y == 0:
+        return "Error: Modulus by zero is not allowed!"
+    return x % y
+
+### ----------- Scientific Functions -----------
+def square_root(x):
+    if x < 0:
+        return "Error: Cannot calculate square root of negative number!"
+    return math.sqrt(x)
+
+def sine(x):
+    if EXACT_TRIG:
+        return sin_degrees(x)
+    return math.sin(math.radians(x))
+
+def cosine(x):
+    if EXACT_TRIG:
+        return cos_degrees(x)
+    return math.cos(math.radians(x))
+
+def tangent(x):
+    if not EXACT_TRIG:
+        return math.tan(math.radians(x))
+    try:
+        return tan_degrees(x)
+    except ValueError:
+        return f"Error: Tangent undefined at {x}°!"
+
+def logarithm(x, base=10):
+    if x <= 0:
+        return "Error: Logarithm undefined for non-positive numbers!"
+    if base <= 0 or base == 1:
+        return "Error: Invalid logarithm base!"
+    return math.log(x, base)
+
+def natural_log(x):
+    if x <= 0:
+        return "Error: Natural log undefined for non-positive numbers!"
+    return math.log(x)
+
+def factorial(x):
+    if x < 0:
+        return "Error: Factorial undefined for negative numbers!"
+    if not float(x).is_integer():
+        return "Error: Factorial only defined for integers!"
+    return cached_factorial(int(x))
+
+def absolute_value(x):
+    return abs(x)
+
+### ----------- Registration -----------
+def _factorial_label(x):
+    return f"{int(x) if float(x).is_integer() else x}!"
+
+def _register_trig(replace=False):
+    exact = EXACT_TRIG
+    register_operation('sin', sine, label="sin({0}°)", description="Sine (degrees)",
+                       category=_SCIENTIFIC, expression=sin_degrees if exact else plain_sin,
+                       vector=sin_degrees_many if exact else plain_sin_many, pure=True,
+                       replace=replace)
+    register_operation('cos', cosine, label="cos({0}°)", description="Cosine (degrees)",
+                       category=_SCIENTIFIC, expression=cos_degrees if exact else plain_cos,
+                       vector=cos_degrees_many if exact else plain_cos_many, pure=True,
+                       replace=replace)
+    register_operation('tan', tangent, label="tan({0}°)", description="Tangent (degrees)",
+                       category=_SCIENTIFIC, expression=tan_degrees if exact else plain_tan,
+                       vector=tan_degrees_many if exact else plain_tan_many, pure=True,
+                       replace=replace)
+
+def set_exact_trig(enabled=True):
+    """Use the exact degree kernel (calculator.trig) for sin, cos and tan.
+
+    Applies to the REPL, expressions, batch mode and evaluate_many: multiples
+    of 30 and 45 degrees give exact results, huge angles are reduced exactly
+    and tan is an error at its poles. Off by default because a call costs
+    about 70 ns more than math.sin(math.radians(x)) (benchmarks/bench_trig.py).
+    """
+    global EXACT_TRIG
+    EXACT_TRIG = bool(enabled)
+    _register_trig(replace=True)
+
+_BASIC = "Basic Operations"
+_SCIENTIFIC = "Scientific Functions"
+
+register_operation('+', add, 2, label="{0} + {1}", description="Addition", category=_BASIC)
+register_operation('-', subtract, 2, label="{0} - {1}", description="Subtraction", category=_BASIC)
+register_operation('*', multiply, 2, label="{0} × {1}", description="Multiplication", category=_BASIC)
+register_operation('/', divide, 2, label="{0} ÷ {1}", description="Division", category=_BASIC)
+register_operation('^', power, 2, label="{0} ^ {1}", description="Power", category=_BASIC)
+register_operation('%', modulus, 2, label="{0} % {1}", description="Modulus", category=_BASIC)
+
+# Inside expressions, functions raise on domain errors instead of returning
+# an error string, and log() is the base-10 logarithm only
+register_operation('sqrt', square_root, label="√{0}", description="Square Root",
+                   category=_SCIENTIFIC, expression=math.sqrt, pure=True)
+_register_trig()
+register_operation('log', logarithm, (1, 2), label=lambda x, base=10: f"log_{base}({x})",
+                   prompts=("Enter number: ", "Enter base (press Enter for base 10): "),
+                   description="Logarithm", category=_SCIENTIFIC, expression=(math.log10, 1, 1),
+                   pure=True)
+register_operation('ln', natural_log, label="ln({0})", description="Natural Log",
+                   category=_SCIENTIFIC, expression=(math.log, 1, 2), pure=True)
+register_operation('!', factorial, label=_factorial_label, description="Factorial", category=_SCIENTIFIC)
+register_operation('abs', absolute_value, label="|{0}|", description="Absolute Value",
+                   category=_SCIENTIFIC, expression=abs, pure=True)
+register_operation('!~', approximate_factorial, label=lambda x: f"{_factorial_label(x)} (approx.)",
+                   description="Approx. Factorial (huge numbers, instant)", category=_SCIENTIFIC)
@@ -0,0 +1,864 @@
+"""Expression engine: tokenizer, parser, compiler, cache and batch evaluation"""
+
+import keyword
+import math
+import operator
+import re
+import time
+from collections import OrderedDict, namedtuple
+
+from .bignum import BIG_NUMBER_BITS, BigNumber, cached_power
+from .core import add, subtract, multiply
+from .registry import register_operation, registry
+from .stats import instrumentation
+
+### ----------- Expression Evaluator -----------
+# Expressions are tokenized and parsed into a small tuple AST that only
+# contains whitelisted node types:
+#   ('num', value)            numeric literal
+#   ('name', identifier)      constant or bound variable
+#   ('neg', x) / ('pos', x)   unary minus / plus
+#   (op, left, right)         op in '+', '-', '*', '/', '//', '**'
+#   ('call', name, (args,))   call of a whitelisted function
+# The optimizer (optimize_tree) may also produce
+#   ('let', temp, x)          evaluate x once and keep it as temp
+#   ('temp', temp)            a value kept by an earlier 'let'
+# The validated tree is turned back into Python source and compiled once, so
+# cached expressions run at plain eval() speed.
+
+class ExpressionError(Exception):
+    """Raised when an expression is rejected before evaluation"""
+
+
+# Refuse integer powers whose result would need more bits than this
+# (9^9^9 would need about 1.2 billion bits).
+MAX_POWER_BITS = 10_000_000
+
+def checked_power(x, y):
+    """x ** y, refusing integer results too large to compute in reasonable time"""
+    if isinstance(x, int) and isinstance(y, int) and y > 1 and abs(x) > 1:
+        if y * math.log2(abs(x)) > MAX_POWER_BITS:
+            raise OverflowError("Result too large to compute!")
+        return cached_power(x, y)
+    return x ** y
+
+# name -> (function, min args, max args): every registered operation that
+# can be used in expressions (see _sync_operation)
+FUNCTIONS = {operation.name: operation.expression for operation in registry
+             if operation.expression is not None}
+# Functions whose calls with constant arguments may be folded
+PURE_FUNCTIONS = {operation.name for operation in registry
+                  if operation.expression is not None and operation.pure}
+
+CONSTANTS = {
+    'pi': math.pi,
+    'e': math.e,
+}
+
+# Names available inside compiled expressions. Built once at import time
+# instead of on every call to evaluate_expression, and updated in place when
+# operations are registered.
+SAFE_NAMESPACE = {name: spec[0] for name, spec in FUNCTIONS.items()}
+SAFE_NAMESPACE.update(CONSTANTS)
+SAFE_NAMESPACE['_pow'] = checked_power
+SAFE_NAMESPACE['__builtins__'] = {}
+
+BINARY_OPERATORS = ('+', '-', '*', '/', '//', '**')
+
+_TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op>\*\*|//|[-+*/^(),])
+      | (?P<invalid>\S)
+    )""", re.VERBOSE)
+
+
+def tokenize_expression(expression):
+    """Split an expression into (kind, value) tokens.
+
+    kind is 'number', 'name' or 'op'; '^' is returned as '**'.
+    """
+    tokens = []
+    append = tokens.append
+    for number, name, op, invalid in _TOKEN_PATTERN.findall(expression):
+        if op:
+            append(('op', '**' if op == '^' else op))
+        elif name:
+            append(('name', name))
+        elif number:
+            if '.' in number or 'e' in number or 'E' in number:
+                append(('number', float(number)))
+            else:
+                append(('number', int(number)))
+        else:
+            raise ExpressionError("Expression contains invalid characters!")
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing the tuple AST described above.
+
+    Grammar (same precedence and associativity as Python):
+        expr   := term (('+' | '-') term)*
+        term   := unary (('*' | '/' | '//') unary)*
+        unary  := ('+' | '-') unary | power
+        power  := atom ('**' unary)?
+        atom   := NUMBER | NAME | NAME '(' expr (',' expr)* ')' | '(' expr ')'
+    """
+
+    def __init__(self, tokens, variables):
+        self.tokens = tokens
+        self.pos = 0
+        self.variables = variables
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+
+    def take_op(self, *ops):
+        kind, value = self.peek()
+        if kind == 'op' and value in ops:
+            self.pos += 1
+            return value
+        return None
+
+    def expect_op(self, op):
+        if self.take_op(op) is None:
+            raise ExpressionError("Invalid expression syntax!")
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("Invalid expression syntax!")
+        node = self.expr()
+        if self.pos != len(self.tokens):
+            raise ExpressionError("Invalid expression syntax!")
+        return node
+
+    def expr(self):
+        node = self.term()
+        op = self.take_op('+', '-')
+        while op:
+            node = (op, node, self.term())
+            op = self.take_op('+', '-')
+        return node
+
+    def term(self):
+        node = self.unary()
+        op = self.take_op('*', '/', '//')
+        while op:
+            node = (op, node, self.unary())
+            op = self.take_op('*', '/', '//')
+        return node
+
+    def unary(self):
+        op = self.take_op('+', '-')
+        if op == '-':
+            return ('neg', self.unary())
+        if op == '+':
+            return ('pos', self.unary())
+        return self.power()
+
+    def power(self):
+        node = self.atom()
+        if self.take_op('**'):
+            node = ('**', node, self.unary())
+        return node
+
+    def atom(self):
+        kind, value = self.peek()
+        if kind == 'number':
+            self.pos += 1
+            return ('num', value)
+        if kind == 'name':
+            self.pos += 1
+            if self.take_op('('):
+                return self.call(value)
+            if value in CONSTANTS or (self.variables is not None and value in self.variables):
+                return ('name', value)
+            if value in FUNCTIONS:
+                raise ExpressionError("Invalid expression syntax!")
+            raise ExpressionError(f"name '{value}' is not defined")
+        if self.take_op('('):
+            node = self.expr()
+            self.expect_op(')')
+            return node
+        raise ExpressionError("Invalid expression syntax!")
+
+    def call(self, name):
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"name '{name}' is not defined")
+        args = [self.expr()]
+        while self.take_op(','):
+            args.append(self.expr())
+        self.expect_op(')')
+        _, min_args, max_args = FUNCTIONS[name]
+        if not min_args <= len(args) <= max_args:
+            raise ExpressionError(f"{name}() takes {max_args} argument(s) ({len(args)} given)")
+        return ('call', name, tuple(args))
+
+
+def parse_expression(expression, variables=None):
+    """Parse an expression into a validated tuple AST.
+
+    Only whitelisted functions and constants are accepted; any other name
+    must appear in ``variables``. Raises ExpressionError otherwise.
+    """
+    parser = _Parser(tokenize_expression(expression), variables)
+    try:
+        return parser.parse()
+    except RecursionError:
+        raise ExpressionError("Expression is too deeply nested!") from None
+
+
+def tree_to_source(node):
+    """Render a tuple AST as fully parenthesised Python source"""
+    kind = node[0]
+    if kind == 'num':
+        value = repr(node[1])
+        return f"({value})" if value.startswith('-') else value
+    if kind in ('name', 'temp'):
+        return node[1]
+    if kind == 'let':
+        return f"({node[1]} := {tree_to_source(node[2])})"
+    if kind == 'neg':
+        return f"(-{tree_to_source(node[1])})"
+    if kind == 'pos':
+        return f"(+{tree_to_source(node[1])})"
+    if kind == 'call':
+        args = ", ".join(tree_to_source(arg) for arg in node[2])
+        return f"{node[1]}({args})"
+    if kind == '**':
+        return f"_pow({tree_to_source(node[1])}, {tree_to_source(node[2])})"
+    if kind in BINARY_OPERATORS:
+        return f"({tree_to_source(node[1])} {kind} {tree_to_source(node[2])})"
+    raise ExpressionError("Invalid expression syntax!")
+
+
+### ----------- Optimizer -----------
+# Optimized code must give bit-identical results to the tree it came from:
+#   - constant subtrees are folded by calling the very functions the compiled
+#     code would call; a subtree whose evaluation fails, or whose value is not
+#     a finite float or a small int, is left for evaluation time
+#   - only functions registered as pure are folded
+#   - x*1, 1*x and x^1 are rewritten to x when 1 is the integer 1 (x*1.0
+#     would turn an int into a float), and x-0 to x when 0 is the integer 0;
+#     x+0 is kept (-0.0 + 0 is 0.0) and so is x/1 (it makes a float)
+#   - repeated subtrees without impure calls (and more than one cheap
+#     operation) are evaluated once ('let') and reused ('temp'); Python
+#     evaluates operands left to right, so the 'let' is always reached first
+OPTIMIZE_EXPRESSIONS = True
+
+# Folded ints are written into the code as literals; larger ones stay computed
+FOLD_MAX_BITS = 4096
+
+_FOLD_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '//': operator.floordiv,
+    'neg': operator.neg,
+    'pos': operator.pos,
+}
+
+
+def _constant(function, args, node):
+    """('num', function(*args)), or node if that cannot be folded safely"""
+    try:
+        value = function(*args)
+    except Exception:
+        return node     # raised again, identically, when evaluated
+    if isinstance(value, float) and math.isfinite(value):
+        return ('num', float(value))
+    if type(value) is int and value.bit_length() <= FOLD_MAX_BITS:
+        return ('num', value)
+    return node
+
+
+def _is_int(node, value):
+    return node[0] == 'num' and type(node[1]) is int and node[1] == value
+
+
+def _fold(node, namespace):
+    kind = node[0]
+    if kind == 'num':
+        return node
+    if kind == 'name':
+        value = CONSTANTS.get(node[1])
+        return node if value is None else ('num', value)
+    if kind == 'call':
+        name = node[1]
+        args = tuple(_fold(arg, namespace) for arg in node[2])
+        node = ('call', name, args)
+        if name in PURE_FUNCTIONS and all(arg[0] == 'num' for arg in args):
+            return _constant(namespace[name], [arg[1] for arg in args], node)
+        return node
+    if kind in ('neg', 'pos'):
+        child = _fold(node[1], namespace)
+        node = (kind, child)
+        if child[0] == 'num':
+            return _constant(_FOLD_OPERATORS[kind], [child[1]], node)
+        return node
+    left, right = _fold(node[1], namespace), _fold(node[2], namespace)
+    node = (kind, left, right)
+    if left[0] == 'num' and right[0] == 'num':
+        x, y = left[1], right[1]
+        if kind == '**':
+            if (isinstance(x, int) and isinstance(y, int) and y > 1 and abs(x) > 1
+                    and y * math.log2(abs(x)) > FOLD_MAX_BITS):
+                return node
+            return _constant(namespace['_pow'], [x, y], node)
+        return _constant(_FOLD_OPERATORS[kind], [x, y], node)
+    if kind == '*':
+        if _is_int(right, 1):
+            return left
+        if _is_int(left, 1):
+            return right
+    elif (kind == '**' and _is_int(right, 1)) or (kind == '-' and _is_int(right, 0)):
+        return left
+    return node
+
+
+def _node_key(node, keys):
+    """Hashable identity of a subtree (type-exact: 1, 1.0 and -0.0 differ),
+    memoized by node id in keys"""
+    key = keys.get(id(node))
+    if key is None:
+        kind = node[0]
+        if kind == 'num':
+            key = ('num', type(node[1]), repr(node[1]))
+        elif kind == 'name':
+            key = node
+        elif kind == 'call':
+            key = ('call', node[1]) + tuple(_node_key(arg, keys) for arg in node[2])
+        else:
+            key = (kind,) + tuple(_node_key(child, keys) for child in node[1:])
+        keys[id(node)] = key
+    return key
+
+
+def _children(node):
+    return node[2] if node[0] == 'call' else node[1:]
+
+
+def _count_pure(node, keys, counts):
+    """Count the subtrees worth sharing; returns (no impure calls, weight).
+
+    A subtree's weight is its number of operations, calls and powers counting
+    double. Sharing a single cheap operation is not worth it: keeping the
+    value costs as much as recomputing it, and on arrays it stops NumPy from
+    reusing temporaries.
+    """
+    kind = node[0]
+    if kind in ('num', 'name'):
+        return True, 0
+    pure = kind != 'call' or node[1] in PURE_FUNCTIONS
+    weight = 2 if kind in ('call', '**') else 1
+    for child in _children(node):
+        child_pure, child_weight = _count_pure(child, keys, counts)
+        pure = pure and child_pure
+        weight += child_weight
+    if pure and weight >= 2:
+        key = _node_key(node, keys)
+        counts[key] = counts.get(key, 0) + 1
+    return pure, weight
+
+
+def _count_uses(node, keys, counts, uses):
+    """Occurrences left once repeated subtrees are shared (one inside a shared
+    subtree is not evaluated again)"""
+    if node[0] in ('num', 'name'):
+        return
+    key = _node_key(node, keys)
+    if counts.get(key, 0) > 1:
+        uses[key] = uses.get(key, 0) + 1
+        if uses[key] > 1:
+            return
+    for child in _children(node):
+        _count_uses(child, keys, counts, uses)
+
+
+def _share(node, keys, shared, assigned):
+    kind = node[0]
+    if kind in ('num', 'name'):
+        return node
+    key = _node_key(node, keys)
+    temp = shared.get(key)
+    if temp is not None and temp in assigned:
+        return ('temp', temp)
+    if kind == 'call':
+        rebuilt = ('call', node[1], tuple(_share(arg, keys, shared, assigned) for arg in node[2]))
+    else:
+        rebuilt = (kind,) + tuple(_share(child, keys, shared, assigned) for child in node[1:])
+    if temp is None:
+        return rebuilt
+    assigned.add(temp)
+    return ('let', temp, rebuilt)
+
+
+def optimize_tree(tree, namespace=None):
+    """Fold constants, drop exact identities and share repeated subtrees.
+
+    namespace holds the functions the code will run with (SAFE_NAMESPACE by
+    default, or the NumPy one for evaluate_many); folding uses them, so the
+    optimized tree evaluates to exactly the same result.
+    """
+    tree = _fold(tree, SAFE_NAMESPACE if namespace is None else namespace)
+    keys, counts = {}, {}
+    _count_pure(tree, keys, counts)
+    uses = {}
+    _count_uses(tree, keys, counts, uses)
+    shared = {}
+    for key, count in uses.items():
+        if count > 1:
+            shared[key] = f"_t{len(shared)}"
+    if not shared:
+        return tree
+    return _share(tree, keys, shared, set())
+
+
+def explain_expression(expression, variables=None):
+    """The Python source an expression is compiled to, before and after optimization.
+
+    Names that are not functions or constants are taken as variables unless
+    variables is given. Raises ExpressionError if the expression is invalid.
+    """
+    if variables is None:
+        variables = [value for kind, value in tokenize_expression(expression)
+                     if kind == 'name' and value not in SAFE_NAMESPACE]
+    check_variable_names(set(variables))
+    tree = parse_expression(expression.strip(), variables=variables)
+    return (f"expression: {expression.strip()}\n"
+            f"parsed:     {tree_to_source(tree)}\n"
+            f"optimized:  {tree_to_source(optimize_tree(tree))}")
+
+
+class ExpressionCache:
+    """Bounded LRU cache mapping expression text to compiled code objects.
+
+    Validation failures are cached too (as their error string), so a bad
+    formula that keeps coming back is rejected without being parsed again.
+    The cache is shared by all sessions and threads without a lock: each
+    dict operation is atomic, and a key evicted by another thread between
+    two of them is treated as already handled.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            pass  # evicted by another thread meanwhile; the value is still good
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return
+        self._entries[key] = value
+        try:
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        except KeyError:
+            pass  # another thread evicted it first
+
+    def resize(self, capacity):
+        self.capacity = capacity
+        while len(self._entries) > max(capacity, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'capacity': self.capacity
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+expression_cache = ExpressionCache()
+
+
+def compile_expression_text(expression):
+    """Parse, validate and compile an expression to a code object.
+
+    Returns the code object, or an error string if the expression is rejected.
+    """
+    try:
+        tree = parse_expression(expression)
+        if OPTIMIZE_EXPRESSIONS:
+            tree = optimize_tree(tree)
+        return compile(tree_to_source(tree), "<expression>", "eval")
+    except ExpressionError as e:
+        return f"Error: {e}"
+    except (SyntaxError, RecursionError, MemoryError):
+        return "Error: Invalid expression syntax!"
+
+
+# "number op number" is by far the most common one-off input (batch files,
+# the GUI); it is computed directly instead of being parsed and compiled.
+# The cache keeps (operator, x, y) for it in place of code, so it is counted
+# and evicted like any other expression.
+_SIMPLE_BINARY_PATTERN = re.compile(r'(\d+\.?\d*)\s*([-+*/])\s*(\d+\.?\d*)$')
+
+_SIMPLE_OPERATORS = {
+    '+': add,
+    '-': subtract,
+    '*': multiply,
+    '/': lambda x, y: x / y,
+}
+
+def _parse_simple_binary(key):
+    """(operator, x, y) for 'number op number' text, else None"""
+    match = _SIMPLE_BINARY_PATTERN.match(key)
+    if match is None:
+        return None
+    left, op, right = match.groups()
+    x = float(left) if '.' in left else int(left)
+    y = float(right) if '.' in right else int(right)
+    return _SIMPLE_OPERATORS[op], x, y
+
+
+def _evaluate_simple_binary(simple):
+    operator, x, y = simple
+    try:
+        return operator(x, y)
+    except ZeroDivisionError:
+        return "Error: Division by zero in expression!"
+
+
+def _run_code(code):
+    try:
+        result = eval(code, SAFE_NAMESPACE, {})
+
+        if isinstance(result, int) and result.bit_length() > BIG_NUMBER_BITS:
+            return BigNumber(result)
+        if isinstance(result, (int, float)):
+            return result
+        else:
+            return "Error: Invalid result type!"
+    except ZeroDivisionError:
+        return "Error: Division by zero in expression!"
+    except MemoryError:
+        return "Error: Calculation exceeded the memory limit!"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+def evaluate_expression(expression):
+    if instrumentation.enabled:
+        return _evaluate_instrumented(expression)
+    key = expression.strip()
+    code = expression_cache.get(key)
+    if code is None:
+        code = _parse_simple_binary(key) or compile_expression_text(key)
+        expression_cache.put(key, code)
+    if isinstance(code, str):
+        return code
+    if isinstance(code, tuple):
+        return _evaluate_simple_binary(code)
+    return _run_code(code)
+
+
+def _compile_instrumented(key, start):
+    """compile_expression_text, timing each phase into the statistics"""
+    clock, record = time.perf_counter_ns, instrumentation.record_phase
+    try:
+        tree = parse_expression(key)
+        now = clock()
+        record('parse', now - start)
+        if OPTIMIZE_EXPRESSIONS:
+            start = now
+            tree = optimize_tree(tree)
+            now = clock()
+            record('optimize', now - start)
+        start = now
+        code = compile(tree_to_source(tree), "<expression>", "eval")
+        record('compile', clock() - start)
+        return code
+    except ExpressionError as e:
+        record('parse', clock() - start)
+        return f"Error: {e}"
+    except (SyntaxError, RecursionError, MemoryError):
+        record('parse', clock() - start)
+        return "Error: Invalid expression syntax!"
+
+
+def _evaluate_instrumented(expression):
+    """evaluate_expression, timing each phase into the statistics"""
+    clock, record = time.perf_counter_ns, instrumentation.record_phase
+    start = clock()
+    key = expression.strip()
+    code = expression_cache.get(key)
+    now = clock()
+    record('cache', now - start)
+    if code is None:
+        code = _parse_simple_binary(key)
+        if code is None:
+            code = _compile_instrumented(key, now)
+        expression_cache.put(key, code)
+    if isinstance(code, str):
+        return code
+    start = clock()
+    if isinstance(code, tuple):
+        result = _evaluate_simple_binary(code)
+        record('fast_path', clock() - start)
+        return result
+    result = _run_code(code)
+    record('eval', clock() - start)
+    return result
+
+
+def set_expression_cache_size(capacity):
+    """Change how many compiled expressions are kept (0 disables caching)"""
+    expression_cache.resize(capacity)
+
+
+def clear_expression_cache():
+    """Drop all cached compiled expressions and reset the counters"""
+    expression_cache.clear()
+    return "Expression cache cleared!"
+
+
+def expression_cache_info():
+    """Return hit/miss/eviction counters for the expression cache"""
+    return expression_cache.info()
+
+def _inline_constants(node):
+    """Replace constant names with their numeric value"""
+    kind = node[0]
+    if kind == 'name':
+        if node[1] in CONSTANTS:
+            return ('num', CONSTANTS[node[1]])
+        return node
+    if kind == 'num':
+        return node
+    if kind == 'call':
+        return ('call', node[1], tuple(_inline_constants(arg) for arg in node[2]))
+    return (kind,) + tuple(_inline_constants(child) for child in node[1:])
+
+
+def _used_helpers(node, found):
+    """Collect the namespace helpers (functions and _pow) a tree refers to"""
+    kind = node[0]
+    if kind == 'call':
+        found.add(node[1])
+        for arg in node[2]:
+            _used_helpers(arg, found)
+    elif kind == 'let':
+        _used_helpers(node[2], found)
+    elif kind not in ('num', 'name', 'temp'):
+        if kind == '**':
+            found.add('_pow')
+        for child in node[1:]:
+            _used_helpers(child, found)
+    return found
+
+
+def compile_expression(expression, variables=()):
+    """Compile a formula with free variables into a reusable Python function.
+
+    The expression is parsed and validated once. The returned function takes
+    the variables as positional (or keyword) arguments in the given order,
+    has the math functions it needs bound as closure cells, constant
+    subexpressions folded and repeated ones computed once (optimize_tree),
+    so each call costs about as much as a hand-written function.
+
+    The function exposes ``variables`` and ``expression`` attributes. Unlike
+    evaluate_expression it raises on domain errors (ZeroDivisionError,
+    ValueError) rather than returning an error string.
+
+    Raises ExpressionError if the expression or variable names are invalid.
+    """
+    variables = tuple(variables)
+    check_variable_names(variables)
+    if len(set(variables)) != len(variables):
+        raise ExpressionError("Duplicate variable name!")
+    tree = parse_expression(expression, variables=variables)
+    tree = optimize_tree(tree) if OPTIMIZE_EXPRESSIONS else _inline_constants(tree)
+    helpers = sorted(_used_helpers(tree, set()))
+    source = (
+        f"def _factory({', '.join(helpers)}):\n"
+        f"    def compiled_expression({', '.join(variables)}):\n"
+        f"        return {tree_to_source(tree)}\n"
+        f"    return compiled_expression\n"
+    )
+    namespace = {'__builtins__': {}}
+    exec(compile(source, "<expression>", "exec"), namespace)
+    function = namespace['_factory'](*(SAFE_NAMESPACE[name] for name in helpers))
+    function.variables = variables
+    function.expression = expression
+    function.__doc__ = f"Compiled expression: {expression}"
+    return function
+
+
+### ----------- Batch Evaluation -----------
+# Vectorized evaluation needs NumPy, which stays an optional dependency: it is
+# only imported the first time a batch API is used.
+BatchResult = namedtuple('BatchResult', ['values', 'errors'])
+BatchResult.__doc__ = """Result of evaluate_many.
+
+values: float64 array, NaN wherever the row could not be evaluated
+errors: boolean array, True for rows with a domain error
+"""
+
+_vector_namespace = None
+vector_expression_cache = ExpressionCache(capacity=256)
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Batch evaluation requires NumPy (pip install numpy)") from None
+    return numpy
+
+
+def _vector_ln(x, base=None):
+    np = _require_numpy()
+    if base is None:
+        return np.log(x)
+    return np.log(x) / np.log(base)
+
+
+def _vector_power(x, y):
+    np = _require_numpy()
+    if isinstance(x, np.ndarray) or isinstance(y, np.ndarray):
+        return np.power(x, y)
+    try:
+        return float(checked_power(x, y))
+    except OverflowError:
+        return math.inf
+
+
+def get_vector_namespace():
+    """NumPy counterparts of SAFE_NAMESPACE, built on first use"""
+    global _vector_namespace
+    if _vector_namespace is None:
+        np = _require_numpy()
+        _vector_namespace = {
+            'sqrt': np.sqrt,
+            'log': np.log10,
+            'ln': _vector_ln,
+            'abs': np.abs,
+            'pi': math.pi,
+            'e': math.e,
+            '_pow': _vector_power,
+            '__builtins__': {}
+        }
+        # Registered functions without a NumPy version are applied element-wise
+        for operation in registry:
+            if operation.expression is not None and operation.name not in _vector_namespace:
+                _vector_namespace[operation.name] = (
+                    operation.vector or np.vectorize(operation.expression[0], otypes=[float]))
+    return _vector_namespace
+
+
+def check_variable_names(names):
+    """Reject variable names that would shadow functions, constants or internals"""
+    for name in names:
+        if (not name.isidentifier() or keyword.iskeyword(name)
+                or name.startswith('_') or name in SAFE_NAMESPACE):
+            raise ExpressionError(f"Invalid variable name '{name}'!")
+
+
+def compile_vector_code(expression, variables):
+    """Cached code object of an expression for eval over NumPy arrays.
+
+    Evaluate it with get_vector_namespace() as globals and the variables as
+    locals, inside np.errstate(all='ignore'). Raises ExpressionError if the
+    expression or variable names are invalid.
+    """
+    check_variable_names(variables)
+    key = (expression.strip(), tuple(sorted(variables)))
+    code = vector_expression_cache.get(key)
+    if code is None:
+        tree = parse_expression(key[0], variables=variables)
+        if OPTIMIZE_EXPRESSIONS:
+            tree = optimize_tree(tree, get_vector_namespace())
+        code = compile(tree_to_source(tree), "<expression>", "eval")
+        vector_expression_cache.put(key, code)
+    return code
+
+
+def evaluate_many(expression, **columns):
+    """Evaluate one expression over whole columns of variables at once.
+
+    Each keyword binds a variable name to a NumPy array or sequence; columns
+    are broadcast against each other. Rows with a domain error (division by
+    zero, sqrt or log of a negative number, ...) come back as NaN in
+    ``values`` and True in ``errors`` instead of raising.
+
+    Raises ExpressionError if the expression itself is invalid.
+    """
+    np = _require_numpy()
+    code = compile_vector_code(expression, columns)
+    arrays = np.broadcast_arrays(*(np.asarray(column, dtype=np.float64) for column in columns.values()))
+    variables = dict(zip(columns, arrays))
+    shape = arrays[0].shape if arrays else ()
+    with np.errstate(all='ignore'):
+        values = eval(code, get_vector_namespace(), variables)
+    values = np.array(np.broadcast_to(values, shape), dtype=np.float64)
+    errors = ~np.isfinite(values)
+    values[errors] = np.nan
+    return BatchResult(values, errors)
+
+
+### ----------- Registered Operations -----------
+def _sync_operation(operation, added):
+    """Registry listener: keep FUNCTIONS, PURE_FUNCTIONS and the namespaces in step with it"""
+    global _vector_namespace
+    name = operation.name
+    if operation.expression is None:
+        return
+    if added:
+        if name in CONSTANTS or (name in SAFE_NAMESPACE and name not in FUNCTIONS):
+            raise ValueError(f"'{name}' is already used in expressions")
+        FUNCTIONS[name] = operation.expression
+        SAFE_NAMESPACE[name] = operation.expression[0]
+        if operation.pure:
+            PURE_FUNCTIONS.add(name)
+        else:
+            PURE_FUNCTIONS.discard(name)
+    elif FUNCTIONS.get(name) is operation.expression:
+        del FUNCTIONS[name]
+        del SAFE_NAMESPACE[name]
+        PURE_FUNCTIONS.discard(name)
+    else:
+        return
+    # Cached code (folded calls included) and errors ("name 'x' is not
+    # defined") may now be wrong
+    _vector_namespace = None
+    expression_cache.clear()
+    vector_expression_cache.clear()
+
+
+registry.add_listener(_sync_operation)
+
+register_operation('expr', evaluate_expression, prompts=("Enter mathematical expression: ",),
+                   parsers=(str,), label="{0}", category="Expression Mode",
+                   description="Evaluate full expressions (e.g., '2+3*4', 'sqrt(16)+5')")
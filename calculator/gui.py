@@ -0,0 +1,200 @@
+"""Tkinter GUI. Only imported when the GUI is launched."""
+
+import tkinter as tk
+from tkinter import font as tkfont
+
+from .background import BackgroundEvaluator
+from .history import add_to_history, calculation_history
+from .history_view import HistoryViewModel
+
+# Milliseconds between checks for a result, and of typing pause before a preview
+POLL_INTERVAL = 30
+PREVIEW_DELAY = 250
+
+PREVIEW_COLOR = "gray45"
+RESULT_COLOR = "black"
+ERROR_COLOR = "firebrick"
+
+
+class HistoryPane(tk.Frame):
+    """Virtually scrolled history list.
+
+    The Listbox only ever holds the rows that fit on screen; the scrollbar
+    and mouse wheel move a HistoryViewModel, which fetches that page from
+    the store. Store updates schedule one redraw per idle cycle, so a burst
+    of appends costs a single refresh.
+    """
+
+    def __init__(self, master, store, rows=12, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = HistoryViewModel(store, rows, on_change=self.schedule_refresh)
+        self._refresh_pending = False
+
+        self.listbox = tk.Listbox(self, height=rows, font=("Courier", 11), activestyle='none')
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._line_height = tkfont.Font(font=self.listbox['font']).metrics('linespace') + 1
+
+        self.listbox.bind('<Configure>', self._on_resize)
+        self.listbox.bind('<MouseWheel>', self._on_wheel)
+        self.listbox.bind('<Button-4>', lambda event: self._scroll(-3))
+        self.listbox.bind('<Button-5>', lambda event: self._scroll(3))
+        self.listbox.bind('<Prior>', lambda event: self._scroll(-self.model.rows))
+        self.listbox.bind('<Next>', lambda event: self._scroll(self.model.rows))
+        self.listbox.bind('<End>', lambda event: self._scroll(len(self.model.store)))
+        self.listbox.bind('<Home>', lambda event: self._scroll(-len(self.model.store)))
+        self.bind('<Destroy>', lambda event: self.model.close() if event.widget is self else None)
+        self.refresh()
+
+    def schedule_refresh(self):
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self.refresh)
+
+    def refresh(self):
+        self._refresh_pending = False
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *self.model.visible_rows())
+        self.scrollbar.set(*self.model.fraction())
+
+    def _scroll(self, rows):
+        self.model.scroll_by(rows)
+        self.refresh()
+        return "break"
+
+    def _on_scrollbar(self, *args):
+        self.model.yview(*args)
+        self.refresh()
+
+    def _on_wheel(self, event):
+        return self._scroll(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        rows = max(1, event.height // self._line_height)
+        if rows != self.model.rows:
+            self.model.resize(rows)
+            self.refresh()
+
+
+def launch_gui():
+    """Run the GUI. Expressions are evaluated on a background thread (see
+    BackgroundEvaluator); the window checks for results with after(), shows
+    them in a label, and previews the result while the user types."""
+    evaluator = BackgroundEvaluator()
+    preview_job = None
+    polling = False
+
+    def show(text, color):
+        result_label.config(text=text, fg=color)
+
+    def start_polling():
+        nonlocal polling
+        if not polling:
+            polling = True
+            window.after(POLL_INTERVAL, poll)
+
+    def poll():
+        nonlocal polling
+        result = evaluator.poll()
+        if result is not None:
+            show_result(result)
+        if evaluator.pending:
+            window.after(POLL_INTERVAL, poll)
+        else:
+            polling = False
+
+    def show_result(result):
+        value = result.result
+        if result.preview:
+            if value is None:
+                show("Press Enter to calculate", PREVIEW_COLOR)
+            elif not isinstance(value, str):
+                show(f"= {value}", PREVIEW_COLOR)
+            else:
+                show("", PREVIEW_COLOR)  # incomplete input; errors wait for Calculate
+            return
+        cancel_button.config(state=tk.DISABLED)
+        if isinstance(value, str):
+            show(value, ERROR_COLOR)
+        else:
+            show(f"{result.expression} = {value}", RESULT_COLOR)
+            add_to_history(result.expression, value)
+
+    def on_edit(*args):
+        # Debounce: only a pause in typing evaluates, and only the newest text
+        nonlocal preview_job
+        if preview_job is not None:
+            window.after_cancel(preview_job)
+        preview_job = window.after(PREVIEW_DELAY, on_preview)
+
+    def on_preview():
+        nonlocal preview_job
+        preview_job = None
+        expr = text.get()
+        cancel_button.config(state=tk.DISABLED)  # the preview supersedes a calculation
+        if expr.strip():
+            evaluator.submit(expr, preview=True)
+            start_polling()
+        else:
+            evaluator.cancel()
+            show("", PREVIEW_COLOR)
+
+    def on_calculate(event=None):
+        nonlocal preview_job
+        expr = text.get()
+        if not expr.strip():
+            return
+        if preview_job is not None:
+            window.after_cancel(preview_job)
+            preview_job = None
+        evaluator.submit(expr)
+        cancel_button.config(state=tk.NORMAL)
+        show("Calculating...", PREVIEW_COLOR)
+        start_polling()
+
+    def on_cancel():
+        evaluator.cancel()
+        cancel_button.config(state=tk.DISABLED)
+        show("Cancelled", ERROR_COLOR)
+
+    def on_close():
+        evaluator.close()
+        window.destroy()
+
+    def toggle_history():
+        if history_pane.winfo_ismapped():
+            history_pane.pack_forget()
+            history_button.config(text="Show History")
+            window.geometry("400x250")
+        else:
+            history_pane.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+            history_button.config(text="Hide History")
+            window.geometry("600x530")
+
+    window = tk.Tk()
+    window.title("🧮 Advanced Python Calculator (GUI)")
+    window.geometry("400x250")
+    window.protocol("WM_DELETE_WINDOW", on_close)
+
+    tk.Label(window, text="Enter Expression:", font=("Arial", 14)).pack(pady=10)
+    text = tk.StringVar(window)
+    text.trace_add('write', on_edit)
+    entry = tk.Entry(window, textvariable=text, font=("Arial", 14), width=25)
+    entry.pack(pady=5)
+    entry.bind('<Return>', on_calculate)
+    entry.focus_set()
+    result_label = tk.Label(window, font=("Arial", 12), wraplength=380, justify=tk.LEFT)
+    result_label.pack(pady=5)
+
+    buttons = tk.Frame(window)
+    buttons.pack(pady=5)
+    tk.Button(buttons, text="Calculate", font=("Arial", 12), command=on_calculate).pack(side=tk.LEFT, padx=5)
+    cancel_button = tk.Button(buttons, text="Cancel", font=("Arial", 12), command=on_cancel,
+                              state=tk.DISABLED)
+    cancel_button.pack(side=tk.LEFT, padx=5)
+    history_button = tk.Button(window, text="Show History", font=("Arial", 12), command=toggle_history)
+    history_button.pack()
+    history_pane = HistoryPane(window, calculation_history)
+
+    window.mainloop()
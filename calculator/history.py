@@ -0,0 +1,49 @@
+"""Calculation history: recording, display and export (of the default session)"""
+
+from .history_store import (  # noqa: F401  (re-exported)
+    TIMESTAMP_FORMAT, DEFAULT_HISTORY_CAPACITY, HistoryEntry, HistoryStore
+)
+from .session import default_session
+
+# History of the default session; the object stays the same across
+# clear_history() and set_history_capacity()
+calculation_history = default_session.history
+
+
+def __getattr__(name):
+    # The journal is switched on and off at runtime; always read it fresh
+    if name == 'history_journal':
+        return default_session.journal
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+### ----------- History Functions -----------
+def add_to_history(operation, result):
+    default_session.add_to_history(operation, result)
+
+def enable_history_journal(directory, load=True, **options):
+    return default_session.enable_history_journal(directory, load, **options)
+
+def disable_history_journal():
+    default_session.disable_history_journal()
+
+def get_history_index():
+    return default_session.get_history_index()
+
+def search_history(query, limit=None):
+    return default_session.search_history(query, limit)
+
+def show_history_search(query, limit=50):
+    return default_session.show_history_search(query, limit)
+
+def set_history_capacity(capacity):
+    return default_session.set_history_capacity(capacity)
+
+def show_history():
+    return default_session.show_history()
+
+def clear_history():
+    return default_session.clear_history()
+
+def export_history(filename="calculator_history.json"):
+    return default_session.export_history(filename)
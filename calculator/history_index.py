@@ -0,0 +1,272 @@
+"""Indexes over the calculation history for fast search and filtering"""
+
+import math
+import re
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import deque
+
+_TOKEN_PATTERN = re.compile(r"[a-z_]+|\d+(?:\.\d+)?|[^\s\w]")
+
+_RESULT_FILTER_PATTERN = re.compile(r"^result\s*(<=|>=|==|=|<|>)\s*(\S+)$")
+
+
+def history_tokens(operation):
+    """Lower-case search tokens of an operation string ('√16' -> {'√', '16'})"""
+    return set(_TOKEN_PATTERN.findall(str(operation).lower()))
+
+
+class SortedKeyList:
+    """Sorted list of keys kept in bounded chunks.
+
+    Insert and remove cost O(log n + chunk size) instead of the O(n) memmove
+    of one big sorted list, which matters with a million keys.
+    """
+
+    CHUNK_SIZE = 512
+
+    def __init__(self):
+        self._chunks = []
+        self._maxes = []
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def add(self, key):
+        self._len += 1
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._chunks):
+            i -= 1
+            self._chunks[i].append(key)
+            self._maxes[i] = key
+        else:
+            insort(self._chunks[i], key)
+        chunk = self._chunks[i]
+        if len(chunk) > 2 * self.CHUNK_SIZE:
+            self._chunks[i:i + 1] = [chunk[:self.CHUNK_SIZE], chunk[self.CHUNK_SIZE:]]
+            self._maxes[i:i + 1] = [chunk[self.CHUNK_SIZE - 1], chunk[-1]]
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._chunks):
+            raise ValueError("key not in list")
+        chunk = self._chunks[i]
+        j = bisect_left(chunk, key)
+        if j == len(chunk) or chunk[j] != key:
+            raise ValueError("key not in list")
+        del chunk[j]
+        self._len -= 1
+        if not chunk:
+            del self._chunks[i]
+            del self._maxes[i]
+        elif j == len(chunk):
+            self._maxes[i] = chunk[-1]
+
+    def irange(self, low, high):
+        """Yield keys with low <= key < high, in order"""
+        i = bisect_left(self._maxes, low)
+        for chunk in self._chunks[i:]:
+            start = bisect_left(chunk, low)
+            stop = bisect_left(chunk, high)
+            yield from chunk[start:stop]
+            if stop < len(chunk):
+                return
+
+    def clear(self):
+        self._chunks = []
+        self._maxes = []
+        self._len = 0
+
+    def bulk_load(self, keys):
+        """Replace the contents with keys (any order); O(n log n)"""
+        keys = sorted(keys)
+        size = self.CHUNK_SIZE
+        self._chunks = [keys[i:i + size] for i in range(0, len(keys), size)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        self._len = len(keys)
+
+
+class HistoryIndex:
+    """Incrementally maintained indexes over a HistoryStore.
+
+    - timestamps: array of entry times in sequence order, searched with bisect
+    - tokens: inverted index from operation token to sequence numbers
+    - results: sorted (result, sequence) keys for numeric range queries
+
+    The index registers itself as a listener on the store, so appends and
+    evictions keep it up to date. Timestamps are forced to be non-decreasing
+    (a clock that steps backwards files the entry under the previous time).
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._times = array('d')
+        self._head = 0
+        self._base_sequence = store.first_sequence
+        self._tokens = {}
+        self._results = SortedKeyList()
+        self._bulk_load(store)
+        store.add_listener(self)
+
+    def _bulk_load(self, store):
+        times, tokens, keys = self._times, self._tokens, []
+        last = -math.inf
+        for sequence, entry in enumerate(store, self._base_sequence):
+            last = max(last, entry.timestamp)
+            times.append(last)
+            for token in history_tokens(entry.operation):
+                postings = tokens.get(token)
+                if postings is None:
+                    tokens[token] = deque((sequence,))
+                else:
+                    postings.append(sequence)
+            key = self._result_key(entry.result)
+            if key is not None:
+                keys.append((key, sequence))
+        self._results.bulk_load(keys)
+
+    # ---- maintenance (called by HistoryStore) ----
+    def on_append(self, sequence, entry):
+        times = self._times
+        timestamp = entry.timestamp
+        if len(times) > self._head and times[-1] > timestamp:
+            timestamp = times[-1]
+        times.append(timestamp)
+        for token in history_tokens(entry.operation):
+            postings = self._tokens.get(token)
+            if postings is None:
+                self._tokens[token] = deque((sequence,))
+            else:
+                postings.append(sequence)
+        key = self._result_key(entry.result)
+        if key is not None:
+            self._results.add((key, sequence))
+
+    def on_evict(self, sequence, entry):
+        self._head += 1
+        if self._head > 4096 and self._head * 2 > len(self._times):
+            del self._times[:self._head]
+            self._base_sequence += self._head
+            self._head = 0
+        for token in history_tokens(entry.operation):
+            postings = self._tokens[token]
+            postings.popleft()
+            if not postings:
+                del self._tokens[token]
+        key = self._result_key(entry.result)
+        if key is not None:
+            self._results.remove((key, sequence))
+
+    def on_clear(self):
+        self._times = array('d')
+        self._head = 0
+        self._base_sequence = self.store.appended
+        self._tokens.clear()
+        self._results.clear()
+
+    @staticmethod
+    def _result_key(result):
+        if isinstance(result, (int, float)) and not isinstance(result, bool):
+            if isinstance(result, int) or not math.isnan(result):
+                return result
+        return None
+
+    # ---- queries ----
+    def _entries(self, sequences, limit):
+        get = self.store.get_by_sequence
+        entries = []
+        for sequence in sequences:
+            entries.append(get(sequence))
+            if limit is not None and len(entries) >= limit:
+                break
+        return entries
+
+    def find(self, text, limit=None):
+        """Entries whose operation contains every token of text, oldest first"""
+        tokens = history_tokens(text)
+        if not tokens:
+            return []
+        rarest = min(tokens, key=lambda token: len(self._tokens.get(token, ())))
+        postings = self._tokens.get(rarest, ())
+        if len(tokens) == 1:
+            return self._entries(postings, limit)
+        # Walk the shortest posting list and check the other tokens per entry,
+        # which stops as soon as the limit is reached
+        get = self.store.get_by_sequence
+        entries = []
+        for sequence in postings:
+            entry = get(sequence)
+            if tokens <= history_tokens(entry.operation):
+                entries.append(entry)
+                if limit is not None and len(entries) >= limit:
+                    break
+        return entries
+
+    def between(self, start=None, end=None, limit=None):
+        """Entries with start <= timestamp < end (epoch seconds)"""
+        times, head = self._times, self._head
+        lo = head if start is None else bisect_left(times, start, head)
+        hi = len(times) if end is None else bisect_left(times, end, head)
+        first = self._base_sequence
+        return self._entries(range(first + lo, first + hi), limit)
+
+    def since(self, start, limit=None):
+        return self.between(start, None, limit)
+
+    def result_range(self, low=-math.inf, high=math.inf, include_low=True, include_high=True, limit=None):
+        """Entries with a numeric result between low and high, smallest first"""
+        low_key = (low, -1) if include_low else (low, math.inf)
+        high_key = (high, math.inf) if include_high else (high, -1)
+        return self._entries((sequence for _, sequence in self._results.irange(low_key, high_key)), limit)
+
+
+def parse_history_time(text):
+    """'2026-10-01' or '2026-10-01 12:30[:00]' (local time) -> epoch seconds"""
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(text.strip(), fmt))
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date '{text}' (use YYYY-MM-DD [HH:MM[:SS]])")
+
+
+def query_history_index(index, query, limit=None):
+    """Run a text query against an index.
+
+    Supported forms:
+        find <words>              operation contains all words
+        since <date>              entries at or after a date
+        between <date> and <date>
+        result>1000 (also <, <=, >=, =)
+    Raises ValueError for anything else.
+    """
+    query = query.strip()
+    command, _, argument = query.partition(' ')
+    command = command.lower()
+    if command == 'find' and argument.strip():
+        return index.find(argument, limit)
+    if command == 'since' and argument.strip():
+        return index.since(parse_history_time(argument), limit)
+    if command == 'between' and ' and ' in argument:
+        start, end = argument.split(' and ', 1)
+        return index.between(parse_history_time(start), parse_history_time(end), limit)
+    match = _RESULT_FILTER_PATTERN.match(query.lower())
+    if match:
+        op, value = match.groups()
+        value = float(value)
+        if op == '>':
+            return index.result_range(value, include_low=False, limit=limit)
+        if op == '>=':
+            return index.result_range(value, limit=limit)
+        if op == '<':
+            return index.result_range(high=value, include_high=False, limit=limit)
+        if op == '<=':
+            return index.result_range(high=value, limit=limit)
+        return index.result_range(value, value, limit=limit)
+    raise ValueError(f"Unknown history query '{query}'")
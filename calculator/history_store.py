@@ -0,0 +1,154 @@
+"""History entries and the fixed-capacity ring buffer that stores them"""
+
+import sys
+import time
+
+from .bignum import json_value
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_HISTORY_CAPACITY = 100_000
+
+
+class HistoryEntry:
+    """One calculation. The timestamp is kept as epoch seconds and only
+    formatted when the entry is displayed or exported."""
+
+    __slots__ = ('timestamp', 'operation', 'result')
+
+    def __init__(self, timestamp, operation, result):
+        self.timestamp = timestamp
+        self.operation = operation
+        self.result = result
+
+    def formatted_timestamp(self):
+        return time.strftime(TIMESTAMP_FORMAT, time.localtime(self.timestamp))
+
+    def as_dict(self):
+        return {
+            "timestamp": self.formatted_timestamp(),
+            "operation": self.operation,
+            "result": json_value(self.result)
+        }
+
+    def __getitem__(self, key):
+        # Entries used to be dicts; keep entry['operation'] style access working
+        if key == 'timestamp':
+            return self.formatted_timestamp()
+        if key in ('operation', 'result'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __repr__(self):
+        return f"HistoryEntry({self.timestamp!r}, {self.operation!r}, {self.result!r})"
+
+
+class HistoryStore:
+    """Fixed-capacity ring buffer of HistoryEntry records, oldest first.
+
+    Once full, each append overwrites the oldest entry, so memory use is
+    bounded by the capacity. Every appended entry gets a sequence number
+    (0, 1, 2, ...) that stays valid until the entry is evicted.
+
+    Listeners (see add_listener) are told about every append, eviction and
+    clear, which lets indexes stay in sync without rescanning.
+    """
+
+    def __init__(self, capacity=DEFAULT_HISTORY_CAPACITY):
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.capacity = capacity
+        self._records = []
+        self._start = 0
+        self._listeners = []
+        self.appended = 0
+
+    def add_listener(self, listener):
+        """Register an object with on_append(sequence, entry),
+        on_evict(sequence, entry) and on_clear() methods"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def append(self, operation, result, timestamp=None):
+        if isinstance(operation, str):
+            operation = sys.intern(operation)
+        entry = HistoryEntry(time.time() if timestamp is None else timestamp, operation, result)
+        records = self._records
+        if len(records) < self.capacity:
+            records.append(entry)
+        else:
+            if self._listeners:
+                evicted = records[self._start]
+                for listener in self._listeners:
+                    listener.on_evict(self.first_sequence, evicted)
+            records[self._start] = entry
+            self._start = (self._start + 1) % self.capacity
+        self.appended += 1
+        if self._listeners:
+            for listener in self._listeners:
+                listener.on_append(self.appended - 1, entry)
+        return entry
+
+    @property
+    def first_sequence(self):
+        """Sequence number of the oldest entry still stored"""
+        return self.appended - len(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __bool__(self):
+        return bool(self._records)
+
+    def __iter__(self):
+        records, start = self._records, self._start
+        yield from records[start:]
+        yield from records[:start]
+
+    def __getitem__(self, index):
+        size = len(self._records)
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        return self._records[(self._start + index) % size]
+
+    def get_by_sequence(self, sequence):
+        """Return the entry with the given sequence number (IndexError if evicted)"""
+        position = sequence - self.first_sequence
+        if not 0 <= position < len(self._records):
+            raise IndexError("history entry no longer stored")
+        return self._records[(self._start + position) % len(self._records)]
+
+    def page(self, start, count):
+        """Return up to count entries starting at position start (oldest = 0)"""
+        size = len(self._records)
+        start = max(0, min(start, size))
+        stop = min(size, start + max(count, 0))
+        records, offset = self._records, self._start
+        if offset == 0:
+            return records[start:stop]
+        return [records[(offset + i) % size] for i in range(start, stop)]
+
+    def clear(self):
+        self._records = []
+        self._start = 0
+        for listener in self._listeners:
+            listener.on_clear()
+
+    def resize(self, capacity):
+        """Change the capacity, dropping the oldest entries if necessary"""
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        entries = list(self)
+        dropped = max(0, len(entries) - capacity)
+        first = self.first_sequence
+        for offset in range(dropped):
+            for listener in self._listeners:
+                listener.on_evict(first + offset, entries[offset])
+        self._records = entries[dropped:]
+        self._start = 0
+        self.capacity = capacity
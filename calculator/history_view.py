@@ -0,0 +1,115 @@
+"""Toolkit-independent model behind the GUI history pane (virtual scrolling)"""
+
+
+def format_history_row(number, entry):
+    return f"{number}. [{entry.formatted_timestamp()}] {entry.operation} = {entry.result}"
+
+
+class HistoryViewModel:
+    """The visible window of a HistoryStore, one page at a time.
+
+    Only ``rows`` entries are ever fetched and formatted, however long the
+    history is. The top of the window is remembered as a sequence number, so
+    evictions at the old end do not make the view jump. While the window
+    shows the newest entry it follows new appends ("tail mode"); after the
+    user scrolls up it stays put.
+
+    The model listens to the store and calls ``on_change()`` (if given) when
+    the visible rows may have changed; the GUI coalesces those into one
+    redraw.
+    """
+
+    def __init__(self, store, rows=20, on_change=None):
+        self.store = store
+        self.rows = max(1, rows)
+        self.on_change = on_change
+        self.follow_tail = True
+        self._top = store.first_sequence
+        self._page = None
+        self._scroll_to_end()
+        store.add_listener(self)
+
+    def close(self):
+        self.store.remove_listener(self)
+
+    # ---- position ----
+    @property
+    def top(self):
+        """Position (0 = oldest stored entry) of the first visible row"""
+        return max(0, self._top - self.store.first_sequence)
+
+    def _max_top(self):
+        return max(0, len(self.store) - self.rows)
+
+    def _scroll_to_end(self):
+        self._top = self.store.first_sequence + self._max_top()
+
+    def scroll_to(self, position):
+        position = max(0, min(int(position), self._max_top()))
+        self._top = self.store.first_sequence + position
+        self.follow_tail = position >= self._max_top()
+        self._page = None
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.top + rows)
+
+    def resize(self, rows):
+        self.rows = max(1, rows)
+        if self.follow_tail:
+            self._scroll_to_end()
+        self._page = None
+
+    def yview(self, *args):
+        """Handle a Tk scrollbar command ('moveto', f) or ('scroll', n, 'units'|'pages')"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.scroll_to(round(float(args[1]) * len(self.store)))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if len(args) > 2 and args[2] == 'pages':
+                step *= self.rows
+            self.scroll_by(step)
+
+    def fraction(self):
+        """(first, last) visible fraction of the history, for Scrollbar.set"""
+        size = len(self.store)
+        if not size:
+            return 0.0, 1.0
+        top = self.top
+        return top / size, min(size, top + self.rows) / size
+
+    # ---- content ----
+    def visible_entries(self):
+        """(number, entry) pairs for the window; numbers count from 1"""
+        if self._page is None:
+            top = self.top
+            self._page = list(enumerate(self.store.page(top, self.rows), top + 1))
+        return self._page
+
+    def visible_rows(self):
+        return [format_history_row(number, entry) for number, entry in self.visible_entries()]
+
+    # ---- store listener ----
+    def _changed(self):
+        self._page = None
+        if self.on_change is not None:
+            self.on_change()
+
+    def on_append(self, sequence, entry):
+        if self.follow_tail:
+            self._scroll_to_end()
+            self._changed()
+        elif sequence < self._top + self.rows:
+            self._changed()
+
+    def on_evict(self, sequence, entry):
+        if self._top <= sequence:
+            self._top = sequence + 1
+        # Row numbers shift by one whether or not the entry was visible
+        self._changed()
+
+    def on_clear(self):
+        self.follow_tail = True
+        self._top = self.store.appended
+        self._changed()
@@ -0,0 +1,208 @@
+"""Append-only JSON Lines journal that persists calculation history"""
+
+import json
+import os
+import shutil
+import threading
+from collections import deque
+
+from .bignum import json_value
+
+SEGMENT_PREFIX = "history-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+def _segment_name(number):
+    return f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}"
+
+
+def _segment_number(filename):
+    if filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX):
+        number = filename[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+        if number.isdigit():
+            return int(number)
+    return None
+
+
+def _repair_torn_line(path):
+    """Cut off a partial last line, so the next append starts on a line of its own"""
+    try:
+        f = open(path, 'rb+')
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            block = f.read(position - start)
+            if position == end and block.endswith(b"\n"):
+                return  # the last line is complete
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+class HistoryJournal:
+    """Persist history entries as one JSON object per line.
+
+    Entries are appended to the newest segment file through a buffered
+    writer. The buffer is flushed every ``flush_every`` entries (1 means every
+    entry reaches the OS immediately and survives a crash of this process);
+    with ``fsync=True`` each flush is also forced to disk. When a segment grows
+    past ``segment_size`` bytes a new one is started, and once more than
+    ``max_segments`` closed segments exist they are compacted in a background
+    thread into one, keeping only the newest ``keep_entries`` lines.
+
+    Each line looks like {"timestamp": 1760000000.0, "operation": "2 + 3",
+    "result": 5}, with the timestamp in epoch seconds.
+    """
+
+    def __init__(self, directory, flush_every=1, fsync=False, segment_size=4 * 1024 * 1024,
+                 max_segments=4, keep_entries=None):
+        self.directory = directory
+        self.flush_every = max(1, flush_every)
+        self.fsync = fsync
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.keep_entries = keep_entries
+        self._lock = threading.Lock()
+        self._compactor = None
+        self._pending = 0
+        os.makedirs(directory, exist_ok=True)
+        self._segments = sorted(
+            number for number in map(_segment_number, os.listdir(directory)) if number is not None
+        )
+        if not self._segments:
+            self._segments.append(1)
+        # A crash mid-write leaves a partial line; appending to it would
+        # corrupt the first new entry too
+        _repair_torn_line(self._path(self._segments[-1]))
+        self._file = open(self._path(self._segments[-1]), 'a', encoding='utf-8')
+
+    def _path(self, number):
+        return os.path.join(self.directory, _segment_name(number))
+
+    @property
+    def segment_paths(self):
+        with self._lock:
+            return [self._path(number) for number in self._segments]
+
+    def append(self, entry):
+        """Write one HistoryEntry (or anything with timestamp/operation/result)"""
+        self._file.write(json.dumps({
+            "timestamp": entry.timestamp,
+            "operation": entry.operation,
+            "result": json_value(entry.result)
+        }, default=str) + "\n")
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+            if self._file.tell() >= self.segment_size:
+                self._rotate()
+
+    def flush(self):
+        if self._file.closed:
+            return
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def _rotate(self):
+        self._file.close()
+        with self._lock:
+            self._segments.append(self._segments[-1] + 1)
+            self._file = open(self._path(self._segments[-1]), 'a', encoding='utf-8')
+            closed = len(self._segments) - 1
+        if closed > self.max_segments:
+            self.compact(background=True)
+
+    def iter_entries(self):
+        """Stream stored entries, oldest first, as (timestamp, operation, result).
+
+        Lines that are not complete records, such as a truncated last line
+        (the process died mid-write), are skipped.
+        """
+        self.flush()
+        for path in self.segment_paths:
+            try:
+                f = open(path, encoding='utf-8')
+            except FileNotFoundError:
+                continue  # removed by a concurrent compaction
+            with f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        entry = record["timestamp"], record["operation"], record["result"]
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    yield entry
+
+    def load_into(self, store):
+        """Append every journaled entry to a HistoryStore; returns the count"""
+        count = 0
+        for timestamp, operation, result in self.iter_entries():
+            store.append(operation, result, timestamp)
+            count += 1
+        return count
+
+    def compact(self, background=False):
+        """Merge closed segments into one, keeping the newest keep_entries lines"""
+        if background:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, daemon=True)
+            self._compactor.start()
+            return
+        with self._lock:
+            closed = self._segments[:-1]
+        if not closed or (len(closed) < 2 and self.keep_entries is None):
+            return
+        lines = deque(maxlen=self.keep_entries)
+        for number in closed:
+            with open(self._path(number), encoding='utf-8') as f:
+                lines.extend(line for line in f if line.endswith("\n"))
+        target = self._path(closed[0])
+        temporary = target + ".tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            os.replace(temporary, target)
+            for number in closed[1:]:
+                os.remove(self._path(number))
+            self._segments = [closed[0]] + self._segments[len(closed):]
+
+    def wait_for_compaction(self):
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def export(self, filename):
+        """Copy the journal segments into one JSON Lines file"""
+        self.flush()
+        with self._lock, open(filename, 'wb') as out:
+            for number in self._segments:
+                with open(self._path(number), 'rb') as f:
+                    shutil.copyfileobj(f, out)
+
+    def clear(self):
+        """Delete all journaled entries"""
+        self.wait_for_compaction()
+        self._file.close()
+        with self._lock:
+            for number in self._segments:
+                os.remove(self._path(number))
+            self._segments = [self._segments[-1] + 1]
+            self._file = open(self._path(self._segments[-1]), 'a', encoding='utf-8')
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        self.wait_for_compaction()
+        self._file.close()
@@ -0,0 +1,27 @@
+"""Calculator memory register (MC / MR / M+ / M- / MS) of the default session"""
+
+from .session import default_session
+
+
+def __getattr__(name):
+    # calculator_memory used to be a module global; it now lives on the session
+    if name == 'calculator_memory':
+        return default_session.memory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+### ----------- Memory Functions -----------
+def memory_clear():
+    return default_session.memory_clear()
+
+def memory_recall():
+    return default_session.memory_recall()
+
+def memory_add(value):
+    return default_session.memory_add(value)
+
+def memory_subtract(value):
+    return default_session.memory_subtract(value)
+
+def memory_store(value):
+    return default_session.memory_store(value)
@@ -0,0 +1,203 @@
+"""Operation registry: every calculator operation, its arguments and how it is shown
+
+The REPL menu and dispatch, the names usable inside expressions and the
+one-line operations of batch mode are all generated from this registry, so
+registering a function here makes it available everywhere:
+
+    from calculator import register_operation
+
+    @register_operation('hyp', arity=2, description="Hypotenuse", category="Geometry",
+                        prompts=("Enter side a: ", "Enter side b: "), expression=True)
+    def hypotenuse(a, b):
+        return math.hypot(a, b)
+
+Register extra operations at startup, before the calculator runs.
+"""
+
+DEFAULT_CATEGORY = "Extra Functions"
+
+_DEFAULT_PROMPTS = {
+    1: ("Enter number: ",),
+    2: ("Enter the first number: ", "Enter the second number: "),
+}
+
+
+def _default_formatter(args, result):
+    return f"✅ Result: {result}"
+
+
+class Operation:
+    """One registered operation.
+
+    function is called with the parsed arguments. min_args..max_args
+    arguments are read with prompts (one per argument; arguments past
+    min_args are optional and skipped on an empty answer) and converted with
+    parsers (float by default). label is a format string or a callable over
+    the arguments giving the text stored in the history, together with
+    history_value(result). formatter(args, result) gives the text printed
+    in the REPL. expression, if not None, is (function, min args, max args)
+    for use inside expressions, and vector an optional NumPy counterpart.
+    pure means the expression function always gives the same result for the
+    same arguments, so calls with constant arguments may be folded.
+    """
+
+    __slots__ = ('name', 'function', 'min_args', 'max_args', 'prompts', 'parsers', 'label',
+                 'formatter', 'history_value', 'description', 'category', 'expression', 'vector',
+                 'pure', 'numeric')
+
+    def __init__(self, name, function, min_args, max_args, prompts, parsers, label, formatter,
+                 history_value, description, category, expression, vector, pure):
+        self.name = name
+        self.function = function
+        self.min_args = min_args
+        self.max_args = max_args
+        self.prompts = prompts
+        self.parsers = parsers
+        self.label = label
+        self.formatter = formatter
+        self.history_value = history_value
+        self.description = description
+        self.category = category
+        self.expression = expression
+        self.vector = vector
+        self.pure = pure
+        # Every argument is a number, so it can be a batch-mode line
+        self.numeric = all(parser in (float, int) for parser in parsers)
+
+    def history_label(self, args):
+        if callable(self.label):
+            return self.label(*args)
+        return self.label.format(*args)
+
+    def format_result(self, args, result):
+        return self.formatter(args, result)
+
+    def __repr__(self):
+        return f"Operation({self.name!r}, {getattr(self.function, '__name__', self.function)!r})"
+
+
+class OperationRegistry:
+    """Name -> Operation, in registration order.
+
+    Listeners are called with (operation, added) whenever an operation is
+    registered (added=True) or removed (added=False).
+    """
+
+    def __init__(self):
+        self._operations = {}
+        self._listeners = []
+
+    def register(self, name, function, arity=1, *, prompts=None, parsers=None, label=None,
+                 formatter=None, history_value=None, description="", category=DEFAULT_CATEGORY,
+                 expression=None, vector=None, pure=False, replace=False):
+        """Register function under name; returns the Operation.
+
+        arity is a number of arguments or a (min, max) pair. expression=True
+        makes function itself callable by name inside expressions; pass a
+        function, or a (function, min, max) tuple, to use a different one
+        there. Declare pure=True if it has no side effects and no randomness.
+        Registering a taken name raises ValueError unless replace=True; the
+        replacement takes the old operation's place in the menu.
+        """
+        if not isinstance(name, str) or not name or name != name.strip() or ' ' in name:
+            raise ValueError(f"Invalid operation name {name!r}")
+        if name in self._operations and not replace:
+            raise ValueError(f"Operation '{name}' is already registered")
+        min_args, max_args = (arity, arity) if isinstance(arity, int) else arity
+        if not 0 <= min_args <= max_args:
+            raise ValueError(f"Invalid arity {arity!r}")
+        if prompts is None:
+            prompts = _DEFAULT_PROMPTS.get(max_args) or tuple(
+                f"Enter argument {i}: " for i in range(1, max_args + 1))
+        if len(prompts) != max_args:
+            raise ValueError(f"'{name}' needs {max_args} prompt(s), got {len(prompts)}")
+        if parsers is None:
+            parsers = (float,) * max_args
+        if label is None:
+            label = f"{name}(" + ", ".join("{%d}" % i for i in range(min_args)) + ")"
+        if expression is True:
+            expression = (function, min_args, max_args)
+        elif callable(expression):
+            expression = (expression, min_args, max_args)
+        if expression is not None and (not name.isidentifier() or name.startswith('_')):
+            raise ValueError(f"'{name}' cannot be used in expressions; use a plain identifier")
+        operation = Operation(name, function, min_args, max_args, tuple(prompts), tuple(parsers),
+                              label, formatter or _default_formatter,
+                              history_value or (lambda result: result),
+                              description or name, category, expression, vector, pure)
+        replaced = self._operations.get(name)
+        if replaced is not None:
+            for listener in self._listeners:
+                listener(replaced, False)
+        self._operations[name] = operation
+        try:
+            for listener in self._listeners:
+                listener(operation, True)
+        except Exception:
+            # A listener refused it (e.g. the name clashes with a constant)
+            self.unregister(name)
+            raise
+        return operation
+
+    def unregister(self, name):
+        operation = self._operations.pop(name)
+        for listener in self._listeners:
+            listener(operation, False)
+        return operation
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def get(self, name, default=None):
+        return self._operations.get(name, default)
+
+    def __getitem__(self, name):
+        return self._operations[name]
+
+    def __contains__(self, name):
+        return name in self._operations
+
+    def __iter__(self):
+        return iter(self._operations.values())
+
+    def __len__(self):
+        return len(self._operations)
+
+    def categories(self):
+        """category -> [Operation], categories in order of first registration"""
+        grouped = {}
+        for operation in self._operations.values():
+            grouped.setdefault(operation.category, []).append(operation)
+        return grouped
+
+
+# The registry used by the REPL, expressions and batch mode
+registry = OperationRegistry()
+
+
+def register_operation(name, function=None, arity=1, **metadata):
+    """registry.register(...); without function, returns a decorator"""
+    if function is None:
+        def decorator(function):
+            registry.register(name, function, arity, **metadata)
+            return function
+        return decorator
+    return registry.register(name, function, arity, **metadata)
+
+
+def unregister_operation(name):
+    return registry.unregister(name)
+
+
+def get_operation(name):
+    """The Operation registered under name, or None"""
+    return registry.get(name)
+
+
+def list_operations(category=None):
+    """Registered operations in registration order, optionally of one category"""
+    return [operation for operation in registry
+            if category is None or operation.category == category]
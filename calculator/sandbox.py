@@ -0,0 +1,332 @@
+"""Cost-bounded evaluation: expensive calculations run in a killable worker process"""
+
+import math
+import os
+import threading
+
+from .bignum import BigNumber, factorial_cache
+from .core import factorial, power
+from .expression import ExpressionCache, ExpressionError, evaluate_expression, parse_expression
+
+# Calculations whose largest integer is estimated to need more bits than this
+# are sent to the worker process; everything cheaper runs inline, exactly as
+# before. One million bits is ~300,000 digits, a few milliseconds of work.
+SANDBOX_COST_BITS = 1_000_000
+
+DEFAULT_TIMEOUT = 10.0                      # seconds
+DEFAULT_MEMORY_LIMIT = 1024 * 1024 * 1024   # extra bytes the worker may allocate
+
+# Floats never get expensive: they overflow to an error instead of growing
+FLOAT_BITS = 1024
+
+### ----------- Cost Estimates -----------
+def _literal_bits(value):
+    magnitude = abs(value)
+    if magnitude <= 1:
+        return 0.0
+    if isinstance(value, int):
+        return math.log2(magnitude)
+    return min(math.log2(magnitude), FLOAT_BITS)
+
+
+def _tree_cost(node, costs):
+    """Upper bound on log2|value| of node, and whether it is an integer.
+
+    The bits of every integer intermediate are appended to costs.
+    """
+    kind = node[0]
+    if kind == 'num':
+        bits, is_int = _literal_bits(node[1]), isinstance(node[1], int)
+    elif kind == 'name':
+        bits, is_int = 2.0, False
+    elif kind in ('neg', 'pos'):
+        bits, is_int = _tree_cost(node[1], costs)
+    elif kind == 'call':
+        arguments = [_tree_cost(argument, costs) for argument in node[2]]
+        if node[1] == 'abs':
+            bits, is_int = arguments[0]
+        else:
+            bits, is_int = FLOAT_BITS, False
+    else:
+        left, left_int = _tree_cost(node[1], costs)
+        right, right_int = _tree_cost(node[2], costs)
+        is_int = left_int and right_int and kind != '/'
+        if not is_int:
+            bits = FLOAT_BITS
+        elif kind in ('+', '-'):
+            bits = max(left, right) + 1
+        elif kind == '*':
+            bits = left + right
+        elif kind == '//':
+            bits = left
+        elif not left:
+            bits = 0.0  # 0, 1 and -1 to any power stay small
+        else:
+            # |y| < 2 ** right, so x ** y has fewer than left * 2 ** right bits
+            bits = left * 2.0 ** right if right < FLOAT_BITS else math.inf
+    if is_int:
+        costs.append(bits)
+    return bits, is_int
+
+
+def estimate_tree_cost(tree):
+    """Estimated size in bits of the largest integer a parsed expression builds"""
+    costs = [0.0]
+    _tree_cost(tree, costs)
+    return max(costs)
+
+
+_cost_cache = ExpressionCache()
+
+def estimate_expression_cost(expression):
+    """Like estimate_tree_cost for expression text; 0 if it does not parse"""
+    key = expression.strip()
+    cost = _cost_cache.get(key)
+    if cost is None:
+        try:
+            cost = estimate_tree_cost(parse_expression(key))
+        except (ExpressionError, RecursionError):
+            cost = 0.0
+        _cost_cache.put(key, cost)
+    return cost
+
+
+def estimate_power_cost(x, y):
+    """Estimated bits of x ** y (only integer powers grow without bound)"""
+    if isinstance(x, int) and isinstance(y, int) and y > 1:
+        return _literal_bits(x) * y
+    return 0.0
+
+
+def estimate_factorial_cost(x):
+    """Estimated bits of x!, from log-gamma (math.inf if that overflows)"""
+    try:
+        n = float(x)
+    except (TypeError, ValueError):
+        return 0.0
+    except OverflowError:
+        return math.inf  # an int beyond the float range
+    if not 1 < n < math.inf:
+        return 0.0  # factorial rejects these straight away
+    try:
+        return math.lgamma(n + 1) / math.log(2)
+    except OverflowError:
+        return math.inf
+
+
+### ----------- Worker Process -----------
+def _address_space_in_use():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _limit_memory(limit):
+    """Let this process allocate at most limit more bytes"""
+    if not limit:
+        return
+    try:
+        import resource
+    except ImportError:
+        return  # not available on Windows; the timeout still applies
+    limit += _address_space_in_use()
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _worker_main(connection, memory_limit):
+    _limit_memory(memory_limit)
+    tasks = {
+        'expression': evaluate_expression,
+        'factorial': factorial,
+        'power': power,
+    }
+    while True:
+        try:
+            request = connection.recv()
+        except (EOFError, OSError):
+            return
+        if request is None:
+            return
+        task, args = request
+        try:
+            result = tasks[task](*args)
+        except MemoryError:
+            result = "Error: Calculation exceeded the memory limit!"
+        except Exception as e:
+            result = f"Error: {str(e)}"
+        try:
+            connection.send(result)
+        except MemoryError:
+            connection.send("Error: Calculation exceeded the memory limit!")
+
+
+class SandboxWorker:
+    """A reusable worker process for expensive calculations.
+
+    The process is started on first use and kept for later calls. A call
+    that runs past its timeout kills the process and returns an error
+    string; the next call starts a fresh one. The worker's address space is
+    allowed to grow by at most memory_limit bytes (Unix only), so a huge
+    result fails with a MemoryError in the worker instead of swapping the
+    machine.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, memory_limit=DEFAULT_MEMORY_LIMIT):
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self._lock = threading.Lock()
+        self._process = None
+        self._connection = None
+        self._cancelled = False
+
+    @property
+    def running(self):
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Start the worker process now instead of on the first call"""
+        with self._lock:
+            self._ensure_started()
+
+    def _ensure_started(self):
+        if self.running:
+            return
+        self._discard()
+        import multiprocessing
+
+        # fork where available: it starts in milliseconds and, unlike spawn,
+        # does not re-run the caller's __main__ module
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+        self._connection, child = context.Pipe()
+        self._process = context.Process(target=_worker_main, args=(child, self.memory_limit),
+                                        name="calculator-sandbox", daemon=True)
+        self._process.start()
+        child.close()
+
+    def _discard(self):
+        if self._process is not None and self._process.pid is not None:
+            if self._process.is_alive():
+                self._process.kill()
+            self._process.join()
+        if self._connection is not None:
+            self._connection.close()
+        self._process = None
+        self._connection = None
+
+    def run(self, task, *args, timeout=None, cancelled=None):
+        """Run task ('expression', 'factorial' or 'power') in the worker.
+
+        Returns the result, or an error string if the calculation did not
+        finish within timeout seconds or the worker died. cancelled is an
+        optional threading.Event: once it is set, a call still waiting for
+        the worker returns without starting the calculation. Set it before
+        calling cancel(), which only reaches a calculation already running.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self._cancelled = False
+            if cancelled is not None and cancelled.is_set():
+                return "Error: Calculation was cancelled!"
+            self._ensure_started()
+            # Checked again now that there is a process: a cancel() before
+            # this point found nothing to kill
+            if cancelled is not None and cancelled.is_set():
+                return "Error: Calculation was cancelled!"
+            try:
+                self._connection.send((task, args))
+                if not self._connection.poll(timeout):
+                    self._discard()
+                    return f"Error: Calculation took longer than {timeout:g} seconds and was cancelled!"
+                return self._connection.recv()
+            except (EOFError, OSError):
+                self._discard()
+                if self._cancelled:
+                    return "Error: Calculation was cancelled!"
+                return "Error: Calculation exceeded the memory limit!"
+
+    def cancel(self):
+        """Stop the calculation in progress, if any.
+
+        Safe to call from another thread: the process is killed and the
+        pending run() returns an error string. Does nothing while idle.
+        """
+        process = self._process
+        if self._lock.locked() and process is not None and process.is_alive():
+            self._cancelled = True
+            process.kill()
+
+    def close(self):
+        with self._lock:
+            if self.running:
+                try:
+                    self._connection.send(None)
+                except OSError:
+                    pass
+                self._process.join(1)
+            self._discard()
+
+
+_default_worker = None
+
+def get_sandbox_worker():
+    """The shared SandboxWorker, created on first use and closed at exit"""
+    global _default_worker
+    if _default_worker is None:
+        import atexit
+
+        _default_worker = SandboxWorker()
+        atexit.register(_default_worker.close)
+    return _default_worker
+
+
+### ----------- Sandboxed Calculations -----------
+def evaluate_sandboxed(expression, timeout=None, worker=None, cancelled=None):
+    """evaluate_expression, but expensive expressions run in the worker process
+    (worker, or the shared one; see SandboxWorker.run for cancelled)"""
+    if estimate_expression_cost(expression) <= SANDBOX_COST_BITS:
+        return evaluate_expression(expression)
+    return (worker or get_sandbox_worker()).run('expression', expression, timeout=timeout,
+                                                cancelled=cancelled)
+
+
+def sandboxed_factorial(x, timeout=None):
+    if estimate_factorial_cost(x) <= SANDBOX_COST_BITS:
+        return factorial(x)
+    if float(x).is_integer():
+        # Keep results computed in the worker in this process's cache too
+        n = int(x)
+        result = factorial_cache.get(n)
+        if result is None:
+            result = get_sandbox_worker().run('factorial', n, timeout=timeout)
+            if isinstance(result, BigNumber):
+                factorial_cache.put(n, result)
+        return result
+    return get_sandbox_worker().run('factorial', x, timeout=timeout)
+
+
+def sandboxed_power(x, y, timeout=None):
+    try:
+        if estimate_power_cost(x, y) <= SANDBOX_COST_BITS:
+            return power(x, y)
+    except OverflowError:
+        return "Error: Result too large!"
+    return get_sandbox_worker().run('power', x, y, timeout=timeout)
+
+
+# Operations whose cost can explode, and the variant that guards them
+SANDBOXED_FUNCTIONS = {
+    evaluate_expression: evaluate_sandboxed,
+    factorial: sandboxed_factorial,
+    power: sandboxed_power,
+}
+
+
+def sandboxed(function):
+    """The sandboxed variant of an operation's function, or the function itself"""
+    return SANDBOXED_FUNCTIONS.get(function, function)
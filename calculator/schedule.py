@@ -0,0 +1,149 @@
+"""Period-by-period compound-interest and amortization schedules"""
+
+import math
+from collections import namedtuple
+
+from .expression import _require_numpy
+
+SCHEDULE_FORMATS = ('text', 'csv', 'jsonl')
+
+ScheduleRow = namedtuple('ScheduleRow', ['period', 'balance', 'interest',
+                                         'cumulative_interest', 'contributions'])
+ScheduleRow.__doc__ = """One period of a schedule.
+
+balance: balance at the end of the period
+interest: interest credited in this period
+cumulative_interest: interest credited so far
+contributions: total of the periodic contributions so far
+"""
+
+ScheduleChunk = namedtuple('ScheduleChunk', ['start', 'balances', 'cumulative_interest'])
+ScheduleChunk.__doc__ = """A block of rows of the (loans x periods) schedule matrix.
+
+start: index of the first loan in the block
+balances, cumulative_interest: float64 arrays of shape (loans in block, periods)
+"""
+
+
+def schedule_periods(time, compounds_per_year=1):
+    """Number of rows in a schedule (a final partial period counts as one)"""
+    return max(0, math.ceil(compounds_per_year * time - 1e-9))
+
+
+def iter_compound_schedule(principal, rate, time, compounds_per_year=1, contribution=0.0):
+    """Yield a ScheduleRow per compounding period, lazily.
+
+    rate is the annual rate in percent and contribution is added at the end
+    of every period (use a negative contribution for loan repayments). Each
+    balance is computed in closed form from the period number, so there is no
+    error building up over long horizons; without contributions the last
+    balance equals calculate_compound_interest(...)['final_amount'] exactly.
+    """
+    if compounds_per_year <= 0:
+        raise ValueError("Compounds per year must be positive")
+    periodic_rate = rate / (100 * compounds_per_year)
+    growth = 1 + periodic_rate
+    periods = schedule_periods(time, compounds_per_year)
+    previous, previous_contributions = principal, 0.0
+    for period in range(1, periods + 1):
+        # A final partial period grows, and is contributed to, pro rata
+        exponent = compounds_per_year * time if period == periods else period
+        factor = growth ** exponent
+        if periodic_rate:
+            balance = principal * factor + contribution * (factor - 1) / periodic_rate
+        else:
+            balance = principal + contribution * exponent
+        contributions = contribution * exponent
+        yield ScheduleRow(period, balance, balance - previous - (contributions - previous_contributions),
+                          balance - principal - contributions, contributions)
+        previous, previous_contributions = balance, contributions
+
+
+def amortization_payment(principal, rate, time, compounds_per_year=12):
+    """Level payment per period that pays off a loan over time years"""
+    periods = compounds_per_year * time
+    periodic_rate = rate / (100 * compounds_per_year)
+    if periods <= 0:
+        raise ValueError("Loan term must be positive")
+    if not periodic_rate:
+        return principal / periods
+    return principal * periodic_rate / (1 - (1 + periodic_rate) ** -periods)
+
+
+def iter_amortization_schedule(principal, rate, time, compounds_per_year=12):
+    """Schedule of a loan repaid in level payments; the balance ends at ~0"""
+    payment = amortization_payment(principal, rate, time, compounds_per_year)
+    return iter_compound_schedule(principal, rate, time, compounds_per_year, -payment)
+
+
+def write_schedule(rows, out, fmt='text'):
+    """Stream ScheduleRows to a text file object; returns the number of rows"""
+    if fmt not in SCHEDULE_FORMATS:
+        raise ValueError(f"Unknown schedule format '{fmt}'")
+    write = out.write
+    count = 0
+    if fmt == 'csv':
+        import csv
+
+        writer = csv.writer(out)
+        writer.writerow(ScheduleRow._fields)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == 'jsonl':
+        import json
+
+        for row in rows:
+            write(json.dumps(row._asdict()) + "\n")
+            count += 1
+    else:
+        write(f"{'Period':>7} {'Balance':>16} {'Interest':>14} {'Total Interest':>16} {'Contributions':>16}\n")
+        for row in rows:
+            write(f"{row.period:>7} {row.balance:>16,.2f} {row.interest:>14,.2f} "
+                  f"{row.cumulative_interest:>16,.2f} {row.contributions:>16,.2f}\n")
+            count += 1
+    return count
+
+
+def export_schedule(rows, filename):
+    """Write a schedule to filename as CSV or, for *.jsonl, JSON Lines"""
+    fmt = 'jsonl' if filename.endswith('.jsonl') else 'csv'
+    try:
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            count = write_schedule(rows, f, fmt)
+        return f"Schedule ({count} periods) exported to {filename}"
+    except (OSError, ValueError) as e:
+        return f"Error exporting schedule: {str(e)}"
+
+
+def iter_schedule_matrix(principals, rates, time, compounds_per_year=1, contributions=0.0,
+                         chunk_size=4096):
+    """Schedules of many loans as (loans x periods) matrices, chunk by chunk.
+
+    principals, rates and contributions are broadcast per loan; time and
+    compounds_per_year are shared, so every loan has the same periods. Yields
+    ScheduleChunk blocks of at most chunk_size loans, so memory stays at
+    about chunk_size * periods * 16 bytes however many loans there are.
+    """
+    np = _require_numpy()
+    if compounds_per_year <= 0:
+        raise ValueError("Compounds per year must be positive")
+    principals, rates, contributions = np.broadcast_arrays(
+        *(np.asarray(column, dtype=np.float64) for column in (principals, rates, contributions)))
+    principals, rates, contributions = (np.atleast_1d(column) for column in
+                                        (principals, rates, contributions))
+    periods = schedule_periods(time, compounds_per_year)
+    exponents = np.arange(1, periods + 1, dtype=np.float64)
+    if periods:
+        exponents[-1] = compounds_per_year * time
+    for start in range(0, len(principals), chunk_size):
+        stop = start + chunk_size
+        principal = principals[start:stop, None]
+        contribution = contributions[start:stop, None]
+        periodic_rate = rates[start:stop, None] / (100 * compounds_per_year)
+        factors = (1 + periodic_rate) ** exponents
+        with np.errstate(divide='ignore', invalid='ignore'):
+            annuity = np.where(periodic_rate != 0, (factors - 1) / periodic_rate, exponents)
+        balances = principal * factors + contribution * annuity
+        cumulative_interest = balances - principal - contribution * exponents
+        yield ScheduleChunk(start, balances, cumulative_interest)
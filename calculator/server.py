@@ -0,0 +1,362 @@
+"""Local evaluation server: line-delimited JSON over TCP or a Unix socket (asyncio)
+
+Each request is one line of JSON and gets one line back, in the order the
+requests arrived on the connection:
+
+    {"id": 1, "op": "expr", "args": ["2+3*4"]}      ->  {"id": 1, "result": 14}
+    {"id": 2, "op": "tip", "args": [80, 15]}        ->  {"id": 2, "result": {...}}
+    {"id": 3, "op": "/", "args": [1, 0]}            ->  {"id": 3, "error": "Error: ..."}
+
+{"id": 1, "expr": "2+3"} is short for the "expr" form. "op" is "expr" or
+any name in BATCH_OPERATIONS (the basic and scientific operations and the
+quick templates). Connections stay open for any number of requests, and
+clients may pipeline them without waiting for the replies.
+"""
+
+import asyncio
+import json
+import math
+import os
+
+from .batch import BATCH_OPERATIONS
+from .bignum import json_value
+from .expression import evaluate_expression
+from .stats import instrumentation
+from .sandbox import (
+    DEFAULT_TIMEOUT, SANDBOX_COST_BITS, SandboxWorker,
+    estimate_expression_cost, estimate_factorial_cost, estimate_power_cost
+)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_BATCH = 256
+MAX_LINE = 1024 * 1024      # longest request line accepted, in bytes
+
+
+class RequestError(Exception):
+    """A request that cannot be evaluated; the message is sent back as the error"""
+
+
+def parse_request(request):
+    """Check a decoded request; returns (id, op, args)"""
+    if not isinstance(request, dict):
+        raise RequestError("Error: Request must be a JSON object!")
+    request_id = request.get('id')
+    if 'expr' in request:
+        op, args = 'expr', [request['expr']]
+    else:
+        op, args = request.get('op'), request.get('args', [])
+    if not isinstance(args, list):
+        raise RequestError("Error: 'args' must be a list!")
+    if op == 'expr':
+        if len(args) != 1 or not isinstance(args[0], str):
+            raise RequestError("Error: 'expr' takes one expression string!")
+        return request_id, op, tuple(args)
+    spec = BATCH_OPERATIONS.get(op) if isinstance(op, str) else None
+    if spec is None:
+        raise RequestError(f"Error: Unknown operation {op!r}!")
+    _, min_args, max_args = spec
+    if not min_args <= len(args) <= max_args:
+        expected = min_args if min_args == max_args else f"{min_args}-{max_args}"
+        raise RequestError(f"Error: '{op}' takes {expected} number(s)!")
+    numbers = []
+    for arg in args:
+        if isinstance(arg, bool) or not isinstance(arg, (int, float, str)):
+            raise RequestError("Error: Invalid input! Please enter numeric values.")
+        if isinstance(arg, str):
+            try:
+                arg = float(arg)
+            except ValueError:
+                raise RequestError("Error: Invalid input! Please enter numeric values.") from None
+        numbers.append(arg)
+    return request_id, op, tuple(numbers)
+
+
+def request_cost(op, args):
+    """Estimated bits of the largest integer the request builds (see sandbox)"""
+    if op == 'expr':
+        return estimate_expression_cost(args[0])
+    if op == '!':
+        return estimate_factorial_cost(args[0])
+    if op == '^':
+        return estimate_power_cost(*args)
+    return 0.0
+
+
+def evaluate_request(op, args):
+    """Evaluate a parsed request in this process; returns (result, error)"""
+    try:
+        if op == 'expr':
+            result = instrumentation.call('expr', evaluate_expression, args[0])
+        else:
+            result = instrumentation.call(op, BATCH_OPERATIONS[op][0], *args)
+    except OverflowError:
+        return None, "Error: Result too large!"
+    except Exception as e:
+        return None, f"Error: {str(e)}"
+    if isinstance(result, str):
+        return None, result
+    return result, None
+
+
+def _response(request_id, result, error):
+    if error is not None:
+        return {"id": request_id, "error": error}
+    return {"id": request_id, "result": json_value(result)}
+
+
+def _encode(reply):
+    """One reply line of strict JSON; a non-finite result becomes an error"""
+    try:
+        line = json.dumps(reply, allow_nan=False)
+    except ValueError:
+        # inf and nan have no JSON form (json.dumps would write Infinity/NaN)
+        request_id = reply.get("id")
+        if isinstance(request_id, float) and not math.isfinite(request_id):
+            request_id = None
+        line = json.dumps({"id": request_id, "error": "Error: Result is not a finite number!"})
+    return line.encode() + b"\n"
+
+
+def _reply_when_done(task, future, request_id):
+    if future.done():
+        return
+    if task.cancelled():
+        future.set_result({"id": request_id, "error": "Error: Server is shutting down!"})
+        return
+    try:
+        response = _response(request_id, *task.result())
+    except Exception as e:
+        response = {"id": request_id, "error": f"Error: {str(e)}"}
+    future.set_result(response)
+
+
+_SANDBOX_TASKS = {'expr': 'expression', '!': 'factorial', '^': 'power'}
+
+
+class CalculatorServer:
+    """asyncio server for the line-delimited JSON protocol described above.
+
+    Requests from all connections are collected for batch_window seconds
+    (or until max_batch are waiting) and evaluated in one pass on the event
+    loop; identical requests in a batch are evaluated once. With the default
+    window of 0 a batch is everything read in one event-loop iteration, which
+    adds no latency when the server is idle. Requests whose
+    estimated cost is above SANDBOX_COST_BITS are handed to a pool of
+    `workers` SandboxWorker processes instead, so a 100000! neither blocks
+    the loop nor survives its timeout.
+
+    Pass path to listen on a Unix socket instead of host:port. Use
+    `async with CalculatorServer(...) as server:` or start()/close().
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, workers=2,
+                 batch_window=0.0, max_batch=MAX_BATCH, timeout=DEFAULT_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.workers = workers
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.requests = 0
+        self.batches = 0
+        self.offloaded = 0
+        self._server = None
+        self._pending = []
+        self._flush_handle = None
+        self._idle_workers = None
+        self._all_workers = []
+        self._offload_tasks = set()
+
+    @property
+    def address(self):
+        """(host, port) or the socket path the server is listening on"""
+        if self._server is None:
+            return None
+        name = self._server.sockets[0].getsockname()
+        return name if self.path else name[:2]
+
+    def stats(self):
+        return {"requests": self.requests, "batches": self.batches, "offloaded": self.offloaded}
+
+    async def start(self):
+        self._idle_workers = asyncio.Queue()
+        for _ in range(max(1, self.workers)):
+            worker = SandboxWorker(timeout=self.timeout)
+            self._all_workers.append(worker)
+            self._idle_workers.put_nowait(worker)
+        if self.path:
+            self._server = await asyncio.start_unix_server(self._handle, self.path, limit=MAX_LINE)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                      limit=MAX_LINE)
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in list(self._offload_tasks):
+            task.cancel()
+        loop = asyncio.get_running_loop()
+        for worker in self._all_workers:
+            await loop.run_in_executor(None, worker.close)
+        self._all_workers = []
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    ### ----------- Connections -----------
+    async def _handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        replies = asyncio.Queue()
+        sender = asyncio.create_task(self._send_replies(replies, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    future = loop.create_future()
+                    future.set_result({"id": None, "error": "Error: Request line too long!"})
+                    await replies.put(future)
+                    break
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                future = loop.create_future()
+                self.submit(line, future)
+                await replies.put(future)
+        finally:
+            await replies.put(None)
+            await sender
+
+    async def _send_replies(self, replies, writer):
+        try:
+            while True:
+                future = await replies.get()
+                if future is None:
+                    break
+                writer.write(_encode(await future))
+                # Replies that are already done go out in one write
+                if replies.empty():
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    ### ----------- Micro-batching -----------
+    def submit(self, line, future):
+        """Queue one raw request line; future receives the response dict"""
+        self.requests += 1
+        self._pending.append((line, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self.batch_window > 0:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        results = {}
+        for line, future in batch:
+            request_id = None
+            try:
+                request = json.loads(line)
+                if isinstance(request, dict):
+                    request_id = request.get('id')
+                request_id, op, args = parse_request(request)
+            except ValueError:
+                future.set_result({"id": None, "error": "Error: Invalid JSON!"})
+                continue
+            except RequestError as e:
+                future.set_result({"id": request_id, "error": str(e)})
+                continue
+            # Whatever goes wrong with one request, the rest of the batch is
+            # still answered
+            try:
+                key = (op, args)
+                if key not in results:
+                    if request_cost(op, args) > SANDBOX_COST_BITS:
+                        results[key] = self._offload(op, args)
+                    else:
+                        results[key] = evaluate_request(op, args)
+                outcome = results[key]
+                if isinstance(outcome, asyncio.Future):
+                    outcome.add_done_callback(
+                        lambda done, future=future, request_id=request_id:
+                            _reply_when_done(done, future, request_id))
+                else:
+                    future.set_result(_response(request_id, *outcome))
+            except Exception as e:
+                if not future.done():
+                    future.set_result({"id": request_id, "error": f"Error: {str(e)}"})
+
+    def _offload(self, op, args):
+        self.offloaded += 1
+        task = asyncio.ensure_future(self._run_in_worker(op, args))
+        self._offload_tasks.add(task)
+        task.add_done_callback(self._offload_tasks.discard)
+        return task
+
+    async def _run_in_worker(self, op, args):
+        worker = await self._idle_workers.get()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                None, instrumentation.call, op, worker.run, _SANDBOX_TASKS[op], *args)
+        finally:
+            self._idle_workers.put_nowait(worker)
+        if isinstance(result, str):
+            return None, result
+        return result, None
+
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, workers=2, **options):
+    """Serve until interrupted; prints the address once listening"""
+    async def serve():
+        server = CalculatorServer(host, port, path, workers, **options)
+        await server.start()
+        address = server.address
+        where = address if path else f"{address[0]}:{address[1]}"
+        print(f"Calculator server listening on {where}", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
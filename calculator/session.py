@@ -0,0 +1,206 @@
+"""Calculator sessions: one user's memory register and history"""
+
+from .bignum import json_value
+from .history_store import DEFAULT_HISTORY_CAPACITY, HistoryStore
+
+
+class CalculatorSession:
+    """The state of one calculator user: the memory register, the history,
+    its optional on-disk journal and its search index, and named variables.
+
+    Sessions share nothing, so threads (or server connections) that each use
+    their own session never see each other's memory or history and never
+    wait on each other. A single session is not locked; give each thread its
+    own. Sessions are cheap to create: the history list grows on demand and
+    the journal and index are only set up when asked for.
+
+    The module-level functions in calculator.memory and calculator.history
+    act on default_session.
+    """
+
+    __slots__ = ('memory', 'history', 'journal', '_index', '_variables')
+
+    def __init__(self, history_capacity=DEFAULT_HISTORY_CAPACITY):
+        self.memory = 0
+        self.history = HistoryStore(history_capacity)
+        self.journal = None
+        self._index = None
+        self._variables = None
+
+    def __repr__(self):
+        return f"CalculatorSession(memory={self.memory!r}, history={len(self.history)} entries)"
+
+    ### ----------- Memory -----------
+    def memory_clear(self):
+        self.memory = 0
+        return "Memory cleared"
+
+    def memory_recall(self):
+        return self.memory
+
+    def memory_add(self, value):
+        self.memory += value
+        return f"Added {value} to memory. Current memory: {self.memory}"
+
+    def memory_subtract(self, value):
+        self.memory -= value
+        return f"Subtracted {value} from memory. Current memory: {self.memory}"
+
+    def memory_store(self, value):
+        self.memory = value
+        return f"Stored {value} in memory"
+
+    ### ----------- Variables -----------
+    def get_variables(self):
+        """The session's VariableGraph, created on first use"""
+        if self._variables is None:
+            from .variables import VariableGraph
+            self._variables = VariableGraph()
+        return self._variables
+
+    def set_variable(self, name, formula):
+        """Define or change a variable ('name = formula' in the REPL).
+
+        Returns its value and those of the variables recomputed as a message,
+        or an error string if the name or formula is rejected.
+        """
+        from .expression import ExpressionError
+        from .variables import format_updates
+
+        variables = self.get_variables()
+        try:
+            updated = variables.set(name, formula)
+        except ExpressionError as e:
+            return f"Error: {str(e)}"
+        if not isinstance(variables[name], str):
+            self.add_to_history(f"{name} = {formula}", variables[name])
+        return format_updates(variables, updated)
+
+    def show_variables(self):
+        if self._variables is None or not self._variables:
+            return "No variables defined."
+
+        print("\n📦 Variables:")
+        print("-" * 60)
+        for name, formula, value in self._variables.items():
+            if str(formula) == str(value):
+                print(f"{name} = {value}")
+            else:
+                print(f"{name} = {formula}  → {value}")
+        print("-" * 60)
+
+    ### ----------- History -----------
+    def add_to_history(self, operation, result):
+        entry = self.history.append(operation, result)
+        if self.journal is not None:
+            self.journal.append(entry)
+        return entry
+
+    def enable_history_journal(self, directory, load=True, **options):
+        """Persist history to an append-only JSON Lines journal in directory.
+
+        Existing journal entries are streamed back into the history first (only
+        the newest ones fit if the journal is larger than the history capacity).
+        Options are passed to HistoryJournal (flush_every, fsync, ...). The
+        journal is flushed and closed automatically at exit.
+        """
+        import atexit
+        from .journal import HistoryJournal
+
+        self.disable_history_journal()
+        options.setdefault('keep_entries', self.history.capacity)
+        journal = HistoryJournal(directory, **options)
+        if load:
+            journal.load_into(self.history)
+        self.journal = journal
+        atexit.register(journal.close)
+        return journal
+
+    def disable_history_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def get_history_index(self):
+        """The search index over this session's history, built on first use"""
+        if self._index is None:
+            from .history_index import HistoryIndex
+            self._index = HistoryIndex(self.history)
+        return self._index
+
+    def search_history(self, query, limit=None):
+        """Query the history, e.g. 'find sqrt', 'since 2026-10-01', 'result>1000'.
+
+        Returns a list of HistoryEntry, or an error string for a bad query.
+        """
+        from .history_index import query_history_index
+
+        try:
+            return query_history_index(self.get_history_index(), query, limit)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+    def show_history_search(self, query, limit=50):
+        matches = self.search_history(query, limit)
+        if isinstance(matches, str):
+            return matches
+        if not matches:
+            return "No matching history entries."
+
+        print(f"\n🔎 History matching '{query}':")
+        print("-" * 60)
+        for entry in matches:
+            print(f"[{entry.formatted_timestamp()}] {entry.operation} = {entry.result}")
+        print("-" * 60)
+
+    def set_history_capacity(self, capacity):
+        """Keep at most capacity entries; the oldest are evicted first"""
+        self.history.resize(capacity)
+        return f"History capacity set to {capacity}"
+
+    def show_history(self):
+        if not self.history:
+            return "No calculation history available."
+
+        print("\n📜 Calculation History:")
+        print("-" * 60)
+        for i, entry in enumerate(self.history, 1):
+            print(f"{i}. [{entry.formatted_timestamp()}] {entry.operation} = {entry.result}")
+        print("-" * 60)
+
+    def clear_history(self):
+        self.history.clear()
+        if self.journal is not None:
+            self.journal.clear()
+        return "History cleared!"
+
+    def export_history(self, filename="calculator_history.json"):
+        """Export history as a JSON array, or as JSON Lines if filename ends
+        in .jsonl (a straight copy of the journal when one is enabled)."""
+        if not self.history:
+            return "No history to export."
+
+        import json
+
+        try:
+            if filename.endswith(".jsonl"):
+                if self.journal is not None:
+                    self.journal.export(filename)
+                else:
+                    with open(filename, 'w') as f:
+                        for entry in self.history:
+                            f.write(json.dumps({
+                                "timestamp": entry.timestamp,
+                                "operation": entry.operation,
+                                "result": json_value(entry.result)
+                            }, default=str) + "\n")
+                return f"History exported to {filename}"
+            with open(filename, 'w') as f:
+                json.dump([entry.as_dict() for entry in self.history], f, indent=2, default=str)
+            return f"History exported to {filename}"
+        except Exception as e:
+            return f"Error exporting history: {str(e)}"
+
+
+# The session behind the module-level memory and history functions
+default_session = CalculatorSession()
@@ -0,0 +1,277 @@
+"""Opt-in instrumentation: call counts, error counts and latency histograms
+
+Operations are recorded under their REPL key ('+', 'sqrt', 'expr', 'tip',
+...) wherever they are dispatched (REPL, GUI, batch mode, the server), and
+evaluate_expression records the time spent in each of its phases. While
+instrumentation is off, the only cost is one attribute check per call.
+
+    with collect_stats() as stats:
+        evaluate_expression("2+3*4")
+    print(stats.report())
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+
+# Phases of evaluate_expression, in the order they run
+EXPRESSION_PHASES = ('cache', 'fast_path', 'parse', 'optimize', 'compile', 'eval')
+
+# Histogram resolution: each power of two is split into 2 ** SUB_BUCKET_BITS
+# buckets, so a bucket is at most 25% wide
+SUB_BUCKET_BITS = 2
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_EXACT = _SUB_BUCKETS * 2           # durations below this many ns get a bucket each
+
+
+def bucket_index(ns):
+    """Histogram bucket of a duration in nanoseconds"""
+    if ns < _EXACT:
+        return max(ns, 0)
+    bits = ns.bit_length()
+    return (bits - SUB_BUCKET_BITS) * _SUB_BUCKETS + ((ns >> (bits - SUB_BUCKET_BITS - 1)) & (_SUB_BUCKETS - 1))
+
+
+def bucket_bounds(index):
+    """(lowest, highest + 1) duration in ns that falls into a bucket"""
+    if index < _EXACT:
+        return index, index + 1
+    bits, sub = divmod(index, _SUB_BUCKETS)
+    bits += SUB_BUCKET_BITS
+    shift = bits - SUB_BUCKET_BITS - 1
+    return (_SUB_BUCKETS + sub) << shift, (_SUB_BUCKETS + sub + 1) << shift
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations in nanoseconds (sparse)"""
+
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.buckets = {}
+
+    def add(self, ns):
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        index = bucket_index(ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def percentile(self, fraction):
+        """Duration (ns) below which fraction of the samples fall, to bucket precision"""
+        if not self.count:
+            return 0
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                # Midpoint of the bucket, kept within the observed range
+                return min(max((low + high - 1) // 2, self.min), self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ns": self.total,
+            "mean_ns": self.total / self.count if self.count else 0,
+            "min_ns": self.min or 0,
+            "max_ns": self.max,
+            "p50_ns": self.percentile(0.5),
+            "p90_ns": self.percentile(0.9),
+            "p99_ns": self.percentile(0.99),
+            "buckets": [[*bucket_bounds(index), self.buckets[index]] for index in sorted(self.buckets)],
+        }
+
+
+class OperationStats:
+    """Calls, errors and latencies of one operation key"""
+
+    __slots__ = ('calls', 'errors', 'latency')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self):
+        return {"calls": self.calls, "errors": self.errors, "latency": self.latency.as_dict()}
+
+
+def _is_error(result):
+    return isinstance(result, str) and result.startswith("Error")
+
+
+class Instrumentation:
+    """Per-operation and per-phase statistics; off until enabled.
+
+    Counters are updated without a lock: with several threads recording at
+    once, a few increments may be lost, which is fine for a profile.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.operations = {}
+        self.phases = {}
+        self.started = time.time()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.operations = {}
+        self.phases = {}
+        self.started = time.time()
+
+    def record(self, key, ns, error=False):
+        stats = self.operations.get(key)
+        if stats is None:
+            stats = self.operations[key] = OperationStats()
+        stats.calls += 1
+        if error:
+            stats.errors += 1
+        stats.latency.add(ns)
+
+    def record_phase(self, phase, ns):
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = LatencyHistogram()
+        histogram.add(ns)
+
+    def call(self, key, function, *args):
+        """function(*args), recorded under key when enabled.
+
+        A result that is an error string, or an exception, counts as an error.
+        """
+        if not self.enabled:
+            return function(*args)
+        start = time.perf_counter_ns()
+        try:
+            result = function(*args)
+        except BaseException:
+            self.record(key, time.perf_counter_ns() - start, True)
+            raise
+        self.record(key, time.perf_counter_ns() - start, _is_error(result))
+        return result
+
+    @contextmanager
+    def timer(self, key):
+        """Record the duration of a with-block under key (if enabled)"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        error = True
+        try:
+            yield
+            error = False
+        finally:
+            self.record(key, time.perf_counter_ns() - start, error)
+
+    def snapshot(self):
+        """All statistics as a JSON-ready dict"""
+        return {
+            "enabled": self.enabled,
+            "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "operations": {key: stats.as_dict() for key, stats in sorted(self.operations.items())},
+            "expression_phases": {phase: self.phases[phase].as_dict()
+                                  for phase in EXPRESSION_PHASES if phase in self.phases},
+        }
+
+    def dump(self, filename):
+        """Write snapshot() to filename as JSON"""
+        import json
+
+        with open(filename, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def report(self):
+        """The statistics as a text table, slowest total first"""
+        lines = []
+        header = f"{'key':<10}{'calls':>9}{'errors':>8}{'mean':>11}{'p50':>11}{'p99':>11}{'max':>11}{'total':>11}"
+
+        def row(key, calls, errors, histogram):
+            return (f"{key:<10}{calls:>9,}{errors:>8,}{_format_ns(histogram.total / histogram.count):>11}"
+                    f"{_format_ns(histogram.percentile(0.5)):>11}{_format_ns(histogram.percentile(0.99)):>11}"
+                    f"{_format_ns(histogram.max):>11}{_format_ns(histogram.total):>11}")
+
+        operations = sorted(self.operations.items(), key=lambda item: -item[1].latency.total)
+        lines.append("Operations:" if operations else "Operations: none recorded")
+        if operations:
+            lines.append(header)
+            lines.extend(row(key, stats.calls, stats.errors, stats.latency) for key, stats in operations)
+        phases = [(phase, self.phases[phase]) for phase in EXPRESSION_PHASES if phase in self.phases]
+        if phases:
+            lines.append("")
+            lines.append("evaluate_expression phases:")
+            lines.append(header)
+            lines.extend(row(phase, histogram.count, 0, histogram) for phase, histogram in phases)
+        return "\n".join(lines)
+
+
+def _format_ns(ns):
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.3g} {unit}"
+    return f"{ns:.0f} ns"
+
+
+# Shared by everything that records statistics
+instrumentation = Instrumentation()
+
+
+### ----------- Module Functions -----------
+def enable_stats():
+    instrumentation.enable()
+    return "Statistics enabled"
+
+def disable_stats():
+    instrumentation.disable()
+    return "Statistics disabled"
+
+def reset_stats():
+    instrumentation.reset()
+    return "Statistics reset"
+
+def get_stats():
+    """Snapshot of the statistics as a JSON-ready dict"""
+    return instrumentation.snapshot()
+
+def dump_stats(filename="calculator_stats.json"):
+    try:
+        instrumentation.dump(filename)
+        return f"Statistics saved to {filename}"
+    except (OSError, ValueError) as e:
+        return f"Error saving statistics: {str(e)}"
+
+def show_stats(out=None):
+    out = sys.stdout if out is None else out
+    state = "on" if instrumentation.enabled else "off ('stats on' to start recording)"
+    out.write(f"\n📊 Statistics ({state}):\n{instrumentation.report()}\n")
+
+@contextmanager
+def collect_stats(reset=True):
+    """Record statistics inside a with-block; yields the Instrumentation.
+
+    Instrumentation is process-wide: the block sees every recorded call,
+    from any thread. The previous on/off state is restored afterwards.
+    """
+    was_enabled = instrumentation.enabled
+    if reset:
+        instrumentation.reset()
+    instrumentation.enable()
+    try:
+        yield instrumentation
+    finally:
+        instrumentation.enabled = was_enabled
@@ -0,0 +1,229 @@
+"""Quick calculation templates (percentage, tip, discount, interest, BMI)"""
+
+from bisect import bisect_right
+from collections import namedtuple
+
+from .expression import _require_numpy, compile_expression
+from .registry import register_operation
+
+# BMI category i covers BMI_BOUNDS[i-1] <= bmi < BMI_BOUNDS[i]
+BMI_BOUNDS = (18.5, 25, 30)
+BMI_CATEGORIES = ("Underweight", "Normal weight", "Overweight", "Obese")
+
+# ----------- Quick Calculation Templates -----------
+def calculate_percentage(value, percentage):
+    """Calculate percentage of a value"""
+    return (value * percentage) / 100
+
+def calculate_tip(bill_amount, tip_percent, split=1):
+    """Calculate tip amount and total per person"""
+    tip = calculate_percentage(bill_amount, tip_percent)
+    total = bill_amount + tip
+    per_person = total / split
+    return {
+        'tip': tip,
+        'total': total,
+        'per_person': per_person
+    }
+
+def calculate_discount(original_price, discount_percent):
+    """Calculate discounted price"""
+    discount_amount = calculate_percentage(original_price, discount_percent)
+    final_price = original_price - discount_amount
+    return {
+        'discount_amount': discount_amount,
+        'final_price': final_price,
+        'savings': discount_amount
+    }
+
+def calculate_compound_interest(principal, rate, time, compounds_per_year=1):
+    """Calculate compound interest"""
+    amount = principal * (1 + rate / (100 * compounds_per_year)) ** (compounds_per_year * time)
+    interest = amount - principal
+    return {
+        'final_amount': amount,
+        'interest_earned': interest,
+        'principal': principal
+    }
+
+def calculate_bmi(weight_kg, height_m):
+    """Calculate Body Mass Index"""
+    if height_m <= 0:
+        return "Error: Height must be positive!"
+    bmi = weight_kg / (height_m ** 2)
+    return {
+        'bmi': round(bmi, 2),
+        'category': BMI_CATEGORIES[bisect_right(BMI_BOUNDS, bmi)]
+    }
+
+# ----------- Registration -----------
+def _format_percentage(args, result):
+    value, percentage = args
+    return f"✅ {percentage}% of {value} = {result}"
+
+def _format_tip(args, result):
+    bill, tip_pct = args[:2]
+    split = args[2] if len(args) > 2 else 1
+    lines = ["\n💰 Tip Calculation:",
+             f"   Bill Amount: ${bill:.2f}",
+             f"   Tip ({tip_pct}%): ${result['tip']:.2f}",
+             f"   Total: ${result['total']:.2f}"]
+    if split > 1:
+        lines.append(f"   Per Person (÷{split}): ${result['per_person']:.2f}")
+    return "\n".join(lines)
+
+def _format_discount(args, result):
+    price, discount = args
+    return "\n".join(["\n🏷️ Discount Calculation:",
+                      f"   Original Price: ${price:.2f}",
+                      f"   Discount ({discount}%): -${result['discount_amount']:.2f}",
+                      f"   Final Price: ${result['final_price']:.2f}",
+                      f"   You Save: ${result['savings']:.2f}"])
+
+def _format_compound_interest(args, result):
+    rate, time = args[1:3]
+    compounds = args[3] if len(args) > 3 else 1
+    return "\n".join(["\n📈 Compound Interest Calculation:",
+                      f"   Principal: ${result['principal']:.2f}",
+                      f"   Rate: {rate}% per year",
+                      f"   Time: {time} years",
+                      f"   Compounds: {compounds} times/year",
+                      f"   Final Amount: ${result['final_amount']:.2f}",
+                      f"   Interest Earned: ${result['interest_earned']:.2f}"])
+
+def _format_bmi(args, result):
+    weight, height = args
+    return "\n".join(["\n⚕️ BMI Calculation:",
+                      f"   Weight: {weight} kg",
+                      f"   Height: {height} m",
+                      f"   BMI: {result['bmi']}",
+                      f"   Category: {result['category']}"])
+
+_QUICK = "Quick Calculations"
+
+register_operation('pct', calculate_percentage, 2, prompts=("Enter value: ", "Enter percentage: "),
+                   label=lambda value, percentage: f"{percentage}% of {value}",
+                   formatter=_format_percentage, description="Percentage", category=_QUICK)
+register_operation('tip', calculate_tip, (2, 3),
+                   prompts=("Enter bill amount: ", "Enter tip percentage (e.g., 15, 20): ",
+                            "Split between how many people? (press Enter for 1): "),
+                   parsers=(float, float, int), label="Tip: ${0} + {1}%", formatter=_format_tip,
+                   history_value=lambda result: result['total'], description="Tip Calculator",
+                   category=_QUICK)
+register_operation('disc', calculate_discount, 2,
+                   prompts=("Enter original price: ", "Enter discount percentage: "),
+                   label="Discount: ${0} - {1}%", formatter=_format_discount,
+                   history_value=lambda result: result['final_price'], description="Discount",
+                   category=_QUICK)
+register_operation('ci', calculate_compound_interest, (3, 4),
+                   prompts=("Enter principal amount: ", "Enter annual interest rate (%): ",
+                            "Enter time period (years): ", "Compounds per year (press Enter for 1): "),
+                   parsers=(float, float, float, int), label="CI: ${0} @ {1}% for {2}y",
+                   formatter=_format_compound_interest,
+                   history_value=lambda result: result['final_amount'], description="Compound Interest",
+                   category=_QUICK)
+register_operation('bmi', calculate_bmi, 2, prompts=("Enter weight (kg): ", "Enter height (meters): "),
+                   label="BMI: {0}kg / {1}m", formatter=_format_bmi,
+                   history_value=lambda result: result['bmi'], description="Body Mass Index",
+                   category=_QUICK)
+
+# Template formulas as compiled expressions. The hand-written functions above
+# remain the public API; benchmarks/bench_compiled_templates.py compares both.
+TEMPLATE_FORMULAS = {
+    'pct': compile_expression("value * percentage / 100", ["value", "percentage"]),
+    'tip': compile_expression("bill_amount * (1 + tip_percent / 100) / split",
+                              ["bill_amount", "tip_percent", "split"]),
+    'disc': compile_expression("original_price - original_price * discount_percent / 100",
+                               ["original_price", "discount_percent"]),
+    'ci': compile_expression(
+        "principal * (1 + rate / (100 * compounds_per_year))^(compounds_per_year * time)",
+        ["principal", "rate", "time", "compounds_per_year"]),
+    'bmi': compile_expression("weight_kg / height_m^2", ["weight_kg", "height_m"]),
+}
+
+
+# ----------- Vectorized Templates -----------
+# Array versions of the templates for whole columns (loan books, patient
+# lists). They take NumPy arrays or sequences, broadcast them against each
+# other and return a struct of arrays instead of one dict per row. Rows with a
+# domain error (non-positive height, zero split, overflow, NaN input) are
+# NaN in every value column and True in ``errors``; the rest are unaffected.
+# NumPy is imported on first use.
+TipColumns = namedtuple('TipColumns', ['tip', 'total', 'per_person', 'errors'])
+DiscountColumns = namedtuple('DiscountColumns', ['discount_amount', 'final_price', 'savings', 'errors'])
+CompoundInterestColumns = namedtuple('CompoundInterestColumns',
+                                     ['final_amount', 'interest_earned', 'principal', 'errors'])
+BMIColumns = namedtuple('BMIColumns', ['bmi', 'category_code', 'errors'])
+BMIColumns.__doc__ = """Result of bmi_many.
+
+bmi: float64 array (not rounded), NaN for error rows
+category_code: int8 index into BMI_CATEGORIES, -1 for error rows
+errors: boolean array
+"""
+
+
+def _columns(*columns):
+    np = _require_numpy()
+    return np.broadcast_arrays(*(np.asarray(column, dtype=np.float64) for column in columns))
+
+
+def _finish(columns, invalid):
+    """Mask rows that are invalid or not finite in any column (in place;
+    the columns must be freshly computed arrays)"""
+    np = _require_numpy()
+    columns = [np.asarray(column, dtype=np.float64) for column in columns]
+    errors = np.array(np.broadcast_to(invalid, columns[0].shape), dtype=bool)
+    for column in columns:
+        errors |= ~np.isfinite(column)
+    for column in columns:
+        column[errors] = np.nan
+    return columns, errors
+
+
+def percentage_many(values, percentages):
+    """calculate_percentage over columns; returns a float64 array"""
+    values, percentages = _columns(values, percentages)
+    return values * percentages / 100
+
+
+def tip_many(bill_amounts, tip_percents, split=1):
+    np = _require_numpy()
+    bills, percents, split = _columns(bill_amounts, tip_percents, split)
+    with np.errstate(all='ignore'):
+        tip = bills * percents / 100
+        total = bills + tip
+        per_person = total / split
+    columns, errors = _finish((tip, total, per_person), split <= 0)
+    return TipColumns(*columns, errors)
+
+
+def discount_many(original_prices, discount_percents):
+    np = _require_numpy()
+    prices, percents = _columns(original_prices, discount_percents)
+    with np.errstate(all='ignore'):
+        discount_amount = prices * percents / 100
+        final_price = prices - discount_amount
+    (discount_amount, final_price), errors = _finish((discount_amount, final_price), False)
+    return DiscountColumns(discount_amount, final_price, discount_amount.copy(), errors)
+
+
+def compound_interest_many(principals, rates, times, compounds_per_year=1):
+    np = _require_numpy()
+    principals, rates, times, compounds = _columns(principals, rates, times, compounds_per_year)
+    with np.errstate(all='ignore'):
+        amount = principals * (1 + rates / (100 * compounds)) ** (compounds * times)
+        interest = amount - principals
+    columns, errors = _finish((amount, interest, principals.copy()), compounds <= 0)
+    return CompoundInterestColumns(*columns, errors)
+
+
+def bmi_many(weights_kg, heights_m):
+    """BMI over columns; categories come from binning against BMI_BOUNDS"""
+    np = _require_numpy()
+    weights, heights = _columns(weights_kg, heights_m)
+    with np.errstate(all='ignore'):
+        bmi = weights / heights ** 2
+    (bmi,), errors = _finish((bmi,), ~(heights > 0))
+    codes = np.asarray(np.digitize(bmi, BMI_BOUNDS), dtype=np.int8)
+    codes[errors] = -1
+    return BMIColumns(bmi, codes, errors)
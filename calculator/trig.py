@@ -0,0 +1,223 @@
+"""Trigonometric functions of angles in degrees
+
+    sin_degrees(180)    # 0.0      (math.sin(math.radians(180)) is 1.2e-16)
+    cos_degrees(60)     # 0.5      (0.5000000000000001)
+    tan_degrees(90)     # ValueError: tan is undefined at odd multiples of 90 degrees
+    sin_degrees(1e22)   # -0.984807753012208 (1e22 mod 360 is 280 degrees)
+
+The angle is reduced modulo 360 (180 for tan) exactly: fmod is exact for
+floats and ints are reduced in integer arithmetic, so no precision is lost
+on large angles, and the reduced angle is folded onto [-90, 90] degrees
+(again exactly) before it is converted to radians. Multiples of 30 and 45
+degrees give the correctly rounded values, and the tangent reports its
+poles. The *_many functions do the same for NumPy arrays, with NaN at the
+poles of tan.
+
+The kernel is opt-in: by default sin, cos and tan in the calculator are the
+plain_* functions below, one libm call on the angle in radians, which is
+faster per call. core.set_exact_trig(True) switches them to the kernel.
+"""
+
+import math
+
+_RADIANS = math.pi / 180
+
+# sin of the multiples of 30 and 45 degrees in [-90, 90] that sin(x * _RADIANS)
+# misses by an ulp
+_EXACT_SIN = {
+    30.0: 0.5, 45.0: math.sqrt(0.5), 60.0: math.sqrt(3) / 2,
+    -30.0: -0.5, -45.0: -math.sqrt(0.5), -60.0: -math.sqrt(3) / 2,
+}
+_EXACT_TAN = {
+    30.0: math.sqrt(1 / 3), 45.0: 1.0, 60.0: math.sqrt(3),
+    -30.0: -math.sqrt(1 / 3), -45.0: -1.0, -60.0: -math.sqrt(3),
+}
+
+TAN_POLE_MESSAGE = "tan is undefined at odd multiples of 90 degrees"
+
+
+def _reduce(x, period):
+    """x modulo period in [-period/2, period/2], computed exactly"""
+    if isinstance(x, int):
+        x %= period
+    else:
+        x = math.fmod(x, period)
+    if x > period // 2:
+        return x - period
+    if x < -(period // 2):
+        return x + period
+    return x
+
+
+def sin_degrees(x):
+    """Sine of an angle in degrees"""
+    if not -180.0 <= x <= 180.0:
+        x = _reduce(x, 360)
+    # sin(x) = sin(180 - x) folds x onto [-90, 90]
+    if x > 90.0:
+        x = 180.0 - x
+    elif x < -90.0:
+        x = -180.0 - x
+    return _EXACT_SIN.get(x) or math.sin(x * _RADIANS)
+
+
+def cos_degrees(x):
+    """Cosine of an angle in degrees"""
+    if not -180.0 <= x <= 180.0:
+        x = _reduce(x, 360)
+    # cos(x) = sin(90 - |x|), with 90 - |x| in [-90, 90]
+    x = 90.0 - abs(x)
+    return _EXACT_SIN.get(x) or math.sin(x * _RADIANS)
+
+
+def tan_degrees(x):
+    """Tangent of an angle in degrees; raises ValueError at the poles"""
+    if not -90.0 <= x <= 90.0:
+        x = _reduce(x, 180)
+    if x == 90.0 or x == -90.0:
+        raise ValueError(TAN_POLE_MESSAGE)
+    return _EXACT_TAN.get(x) or math.tan(x * _RADIANS)
+
+
+### ----------- Plain Versions -----------
+# The defaults: math.sin(math.radians(x)), as the calculator always computed
+# it. About 70 ns per call faster than the kernel (half the time for vector
+# tan), but sin(180) is 1.2e-16, huge angles lose precision and tan has no
+# poles.
+def plain_sin(x):
+    return math.sin(math.radians(x))
+
+
+def plain_cos(x):
+    return math.cos(math.radians(x))
+
+
+def plain_tan(x):
+    return math.tan(math.radians(x))
+
+
+def plain_sin_many(x):
+    np = _require_numpy()
+    return np.sin(np.radians(x))
+
+
+def plain_cos_many(x):
+    np = _require_numpy()
+    return np.cos(np.radians(x))
+
+
+def plain_tan_many(x):
+    np = _require_numpy()
+    return np.tan(np.radians(x))
+
+
+### ----------- Vectorized -----------
+# Same reduction and folding over whole arrays, as a few in-place passes
+# over at most three float buffers. Once folded onto [-90, 90] degrees,
+# np.sin runs about twice as fast as on the unreduced radians, which pays
+# for the reduction. The values are computed from the magnitude of the
+# folded angle and signed afterwards, so the special angles are found with
+# three comparisons and patched from a table indexed by magnitude / 15.
+
+# Above this, period * rint(x / period) may not be exact; np.fmod is
+_EXACT_REDUCTION_LIMIT = 2.0 ** 52
+
+_SPECIAL_SIN_ANGLES = (30.0, 45.0, 60.0)
+_SPECIAL_TAN_ANGLES = (30.0, 45.0, 60.0, 90.0)
+
+_vector_tables = None
+
+
+def _tables(np):
+    """sin and tan at 0, 15, ..., 90 degrees (NaN for tan 90), from the scalar functions"""
+    global _vector_tables
+    if _vector_tables is None:
+        angles = [15.0 * k for k in range(7)]
+        _vector_tables = (
+            np.array([sin_degrees(angle) for angle in angles]),
+            np.array([math.nan if angle == 90 else tan_degrees(angle) for angle in angles]),
+        )
+    return _vector_tables
+
+
+def _reduce_many(np, x, period):
+    """(x modulo period in [-period/2, period/2], shape of x), computed exactly.
+
+    The result is a new float64 array of at least one dimension.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    shape = x.shape
+    x = x.reshape(-1) if x.ndim == 0 else x
+    if x.size and not (-_EXACT_REDUCTION_LIMIT < x.min() and x.max() < _EXACT_REDUCTION_LIMIT):
+        with np.errstate(invalid='ignore'):
+            x = np.fmod(x, period)
+    # x - period * k is exact: k * period is, and the two are within a factor of 2
+    reduced = np.multiply(x, 1 / period)
+    np.rint(reduced, out=reduced)
+    reduced *= -period
+    reduced += x
+    return reduced, shape
+
+
+def _special_angles(np, magnitudes, angles):
+    """Boolean mask of magnitudes equal to one of angles, or None if there are none"""
+    special = np.equal(magnitudes, angles[0])
+    hit = np.empty_like(special)
+    for angle in angles[1:]:
+        special |= np.equal(magnitudes, angle, out=hit)
+    return special if special.any() else None
+
+
+def _finish(np, values, magnitudes, signs, special, table):
+    """Give values the signs of signs and patch the special angles from table"""
+    np.copysign(values, signs, out=values)
+    if special is not None:
+        steps = np.multiply(magnitudes[special], 1 / 15).astype(np.intp)
+        values[special] = np.copysign(table[steps], signs[special])
+    return values
+
+
+def _require_numpy():
+    # Imported here: expression imports core, which imports this module
+    from .expression import _require_numpy
+    return _require_numpy()
+
+
+def sin_degrees_many(x):
+    """sin_degrees over an array (or anything np.asarray accepts)"""
+    np = _require_numpy()
+    angles, shape = _reduce_many(np, x, 360.0)
+    # |folded angle| = min(|x|, 180 - |x|), with the sign of x
+    magnitudes = np.abs(angles)
+    values = np.subtract(180.0, magnitudes)
+    np.minimum(magnitudes, values, out=magnitudes)
+    special = _special_angles(np, magnitudes, _SPECIAL_SIN_ANGLES)
+    np.multiply(magnitudes, _RADIANS, out=values)
+    np.sin(values, out=values)
+    return _finish(np, values, magnitudes, angles, special, _tables(np)[0]).reshape(shape)
+
+
+def cos_degrees_many(x):
+    """cos_degrees over an array (or anything np.asarray accepts)"""
+    np = _require_numpy()
+    angles, shape = _reduce_many(np, x, 360.0)
+    np.abs(angles, out=angles)
+    np.subtract(90.0, angles, out=angles)
+    magnitudes = np.abs(angles)
+    special = _special_angles(np, magnitudes, _SPECIAL_SIN_ANGLES)
+    values = magnitudes.copy() if special is not None else magnitudes
+    values *= _RADIANS
+    np.sin(values, out=values)
+    return _finish(np, values, magnitudes, angles, special, _tables(np)[0]).reshape(shape)
+
+
+def tan_degrees_many(x):
+    """tan_degrees over an array, NaN at the poles"""
+    np = _require_numpy()
+    angles, shape = _reduce_many(np, x, 180.0)
+    magnitudes = np.abs(angles)
+    special = _special_angles(np, magnitudes, _SPECIAL_TAN_ANGLES)
+    values = magnitudes.copy() if special is not None else magnitudes
+    values *= _RADIANS
+    np.tan(values, out=values)
+    return _finish(np, values, magnitudes, angles, special, _tables(np)[1]).reshape(shape)
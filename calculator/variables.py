@@ -0,0 +1,295 @@
+"""Named variables: formulas over other variables, recomputed incrementally
+
+    graph = VariableGraph()
+    graph.set('rate', 5.5)
+    graph.set('monthly', 'rate/12/100')
+    graph.set('pay', 'principal*monthly/(1-(1+monthly)^-n)')
+    graph.set('principal', 200000)
+    graph.set('n', 360)
+    graph['pay']            # 1135.58...
+    graph.set('rate', 6)    # ['rate', 'monthly', 'pay'] recomputed
+
+Every variable is a cell holding its formula, compiled once with
+compile_expression, and its cached value. For every name the graph keeps
+the cells whose formulas read it, so setting a variable marks just the
+cells downstream of it dirty and recomputes those in topological order;
+all other cells keep their cached values. Formulas may refer to names
+that are not defined yet (their value is an error until they are), but
+not, directly or indirectly, to themselves.
+
+In the REPL, ``name = formula`` defines a variable of the session and
+``vars`` lists them.
+"""
+
+import re
+
+from .bignum import big_result
+from .expression import (
+    CONSTANTS, ExpressionError, check_variable_names, compile_expression, tokenize_expression
+)
+
+# "name = formula" (but not "a == b")
+ASSIGNMENT_PATTERN = re.compile(r'([A-Za-z_]\w*)\s*=(?!=)\s*(.+)$')
+
+# How many recomputed variables an assignment message lists
+MAX_LISTED_UPDATES = 5
+
+
+def _free_names(formula):
+    """Names a formula reads, in order of first use (constants and calls excluded)"""
+    tokens = tokenize_expression(formula)
+    names = []
+    for index, (kind, value) in enumerate(tokens):
+        if (kind == 'name' and value not in CONSTANTS and value not in names
+                and tokens[index + 1:index + 2] != [('op', '(')]):
+            names.append(value)
+    return names
+
+
+def _call(function, args):
+    """function(*args) as a value, or an error string like evaluate_expression's"""
+    try:
+        value = function(*args)
+    except ZeroDivisionError:
+        return "Error: Division by zero in expression!"
+    except MemoryError:
+        return "Error: Calculation exceeded the memory limit!"
+    except Exception as e:
+        return f"Error: {str(e)}"
+    if isinstance(value, (int, float)):
+        return big_result(value)
+    return "Error: Invalid result type!"
+
+
+class _Cell:
+    """One variable: formula text (or a number), compiled function, inputs, cached value"""
+
+    __slots__ = ('formula', 'function', 'inputs', 'value')
+
+    def __init__(self, formula):
+        self.formula = formula
+        if isinstance(formula, str):
+            self.inputs = tuple(_free_names(formula))
+            self.function = compile_expression(formula, self.inputs)
+            self.value = None
+        else:
+            self.inputs = ()
+            self.function = None
+            self.value = big_result(formula)
+
+
+class VariableGraph:
+    """Named variables whose formulas may read each other, like spreadsheet cells.
+
+    Values are numbers, or an error string when the formula fails (division
+    by zero, an undefined input, ...); an error in an input becomes the value
+    of the cells that read it. A graph is not locked; use one per thread.
+    """
+
+    def __init__(self):
+        self._cells = {}
+        self._dependents = {}   # name -> names of the cells whose formulas read it
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __contains__(self, name):
+        return name in self._cells
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def __getitem__(self, name):
+        return self._cells[name].value
+
+    def get(self, name, default=None):
+        cell = self._cells.get(name)
+        return default if cell is None else cell.value
+
+    def formula(self, name):
+        """The formula name was set to (text or a number)"""
+        return self._cells[name].formula
+
+    def inputs(self, name):
+        """Names the formula of name reads"""
+        return self._cells[name].inputs
+
+    def dependents(self, name):
+        """Names of the variables whose formulas read name directly"""
+        return set(self._dependents.get(name, ()))
+
+    def items(self):
+        """(name, formula, value) of every variable, in order of definition"""
+        return [(name, cell.formula, cell.value) for name, cell in self._cells.items()]
+
+    def set(self, name, formula):
+        """Define or redefine name as a number or formula text.
+
+        Returns the names whose values were recomputed, name first, in the
+        order they were computed. Raises ExpressionError for an invalid name
+        or formula, or a circular reference; the graph is then unchanged.
+        """
+        self._define(name, formula)
+        return self._recompute(name)
+
+    def update(self, values):
+        """set() several variables, recomputing each dirty cell once.
+
+        values maps names to numbers or formulas. Returns the recomputed
+        names in the order they were computed. If one of them is rejected,
+        the ones before it are still set.
+        """
+        defined = []
+        try:
+            for name, formula in values.items():
+                self._define(name, formula)
+                defined.append(name)
+        finally:
+            updated = self._recompute(*defined)
+        return updated
+
+    def delete(self, name):
+        """Remove name; the variables reading it become errors.
+
+        Returns the names recomputed. Raises KeyError if name is not defined.
+        """
+        if name not in self._cells:
+            raise KeyError(name)
+        self._unlink(name)
+        del self._cells[name]
+        return self._recompute(name)
+
+    def clear(self):
+        self._cells.clear()
+        self._dependents.clear()
+
+    def evaluate(self, expression):
+        """Value of an expression over the variables, or an error string"""
+        try:
+            names = _free_names(expression)
+            function = compile_expression(expression, names)
+        except ExpressionError as e:
+            return f"Error: {e}"
+        return self._evaluate(function, names)
+
+    # ---- graph ----
+    def _define(self, name, formula):
+        """Install name's new cell and its edges, without recomputing"""
+        check_variable_names([name])
+        cell = _Cell(formula)
+        cycle = self._find_cycle(name, cell.inputs)
+        if cycle:
+            raise ExpressionError(f"Circular reference: {' -> '.join(cycle)}")
+        self._unlink(name)
+        for source in cell.inputs:
+            self._dependents.setdefault(source, set()).add(name)
+        self._cells[name] = cell
+
+    def _unlink(self, name):
+        """Drop the edges from the inputs of name's current formula"""
+        cell = self._cells.get(name)
+        if cell is None:
+            return
+        for source in cell.inputs:
+            readers = self._dependents[source]
+            readers.discard(name)
+            if not readers:
+                del self._dependents[source]
+
+    def _find_cycle(self, name, inputs):
+        """The cycle name -> ... -> name that reading inputs would close, or None"""
+        if name in inputs:
+            return [name, name]
+        # Anything downstream of name that name would read closes a cycle
+        targets = set(inputs)
+        parents = {name: None}
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            for reader in self._dependents.get(current, ()):
+                if reader in parents:
+                    continue
+                parents[reader] = current
+                if reader in targets:
+                    path = [name, reader]
+                    while parents[path[-1]] is not None:
+                        path.append(parents[path[-1]])
+                    return path
+                stack.append(reader)
+        return None
+
+    def _recompute(self, *names):
+        """Recompute the cells downstream of names in topological order"""
+        dirty = set(names)
+        stack = list(names)
+        while stack:
+            for reader in self._dependents.get(stack.pop(), ()):
+                if reader not in dirty:
+                    dirty.add(reader)
+                    stack.append(reader)
+        # Kahn's algorithm over the dirty cells: a cell is ready once none of
+        # its inputs is waiting to be recomputed
+        cells = self._cells
+        waiting = {name: 0 for name in dirty if name in cells}
+        for name in waiting:
+            for source in cells[name].inputs:
+                if source in waiting:
+                    waiting[name] += 1
+        ready = [name for name, count in waiting.items() if not count]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            cell = cells[name]
+            if cell.function is not None:
+                cell.value = self._evaluate(cell.function, cell.inputs)
+            for reader in self._dependents.get(name, ()):
+                waiting[reader] -= 1
+                if not waiting[reader]:
+                    ready.append(reader)
+        return order
+
+    def _evaluate(self, function, inputs):
+        args = []
+        for source in inputs:
+            cell = self._cells.get(source)
+            if cell is None:
+                return f"Error: name '{source}' is not defined"
+            if isinstance(cell.value, str):
+                return cell.value
+            args.append(cell.value)
+        return _call(function, args)
+
+
+### ----------- Session Variables -----------
+def parse_assignment(line):
+    """(name, formula) for a 'name = formula' line, or None"""
+    match = ASSIGNMENT_PATTERN.match(line.strip())
+    return match.groups() if match else None
+
+
+def format_updates(graph, updated):
+    """'rate = 6 (updated: monthly = 0.005, pay = 1199.1)' for the names set() returned"""
+    name, others = updated[0], updated[1:]
+    message = f"{name} = {graph[name]}"
+    if others:
+        listed = ", ".join(f"{other} = {graph[other]}" for other in others[:MAX_LISTED_UPDATES])
+        if len(others) > MAX_LISTED_UPDATES:
+            listed += f" and {len(others) - MAX_LISTED_UPDATES} more"
+        message += f" (updated: {listed})"
+    return message
+
+
+def _default_session():
+    from .session import default_session
+    return default_session
+
+
+def set_variable(name, formula):
+    return _default_session().set_variable(name, formula)
+
+def show_variables():
+    return _default_session().show_variables()
+
+def get_variables():
+    return _default_session().get_variables()
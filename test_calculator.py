@@ -4,16 +4,53 @@ Run with: python -m pytest test_calculator.py
 Or: python -m unittest test_calculator.py
 """
 
+import asyncio
+import csv
+import io
+import json
+import os
+import subprocess
+import socket
+import sys
+import tempfile
+import threading
+import time
 import unittest
 import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from calculator import (
     add, subtract, multiply, divide, power, modulus,
     square_root, sine, cosine, tangent, logarithm, natural_log,
-    factorial, absolute_value,
+    factorial, absolute_value, set_exact_trig,
     memory_clear, memory_recall, memory_add, memory_subtract, memory_store,
-    evaluate_expression,
+    evaluate_expression, expression_cache_info, clear_expression_cache,
+    set_expression_cache_size, tokenize_expression, parse_expression,
+    ExpressionError, evaluate_many, compile_expression, TEMPLATE_FORMULAS,
+    tree_to_source, optimize_tree, explain_expression,
+    evaluate_line, iter_batch_results, write_batch_results, iter_parallel_results,
+    CalculatorSession, default_session,
+    HistoryStore, add_to_history, clear_history, export_history, calculation_history,
+    HistoryJournal, enable_history_journal, disable_history_journal,
+    HistoryIndex, search_history, HistoryViewModel,
+    SandboxWorker, evaluate_sandboxed, BackgroundEvaluator, sandboxed_factorial, sandboxed_power,
+    estimate_expression_cost, estimate_factorial_cost, SANDBOX_COST_BITS,
+    iter_compound_schedule, iter_amortization_schedule, amortization_payment,
+    write_schedule, iter_schedule_matrix,
+    CalculatorServer, RequestError, parse_request,
+    run_benchmarks, compare_results, run_bench_suite,
+    register_operation, unregister_operation, get_operation, list_operations,
+    LatencyHistogram, collect_stats, get_stats, dump_stats, instrumentation,
+    tip_many, discount_many, compound_interest_many, bmi_many, BMI_CATEGORIES,
+    BigNumber, BigNumberCache, factorial_cache, power_cache, approximate_factorial,
     calculate_percentage, calculate_tip, calculate_discount,
-    calculate_compound_interest, calculate_bmi
+    calculate_compound_interest, calculate_bmi,
+    integrate, derivative, differentiate, VariableGraph,
+    sin_degrees, cos_degrees, tan_degrees, sin_degrees_many, cos_degrees_many, tan_degrees_many
 )
 
 
@@ -118,6 +155,67 @@ class TestScientificFunctions(unittest.TestCase):
         self.assertAlmostEqual(absolute_value(-3.14), 3.14, places=7)
 
 
+class TestDegreeTrig(unittest.TestCase):
+    """Test the degree-based trig kernel"""
+
+    def test_exact_special_angles(self):
+        self.assertEqual(sin_degrees(180), 0.0)
+        self.assertEqual(sin_degrees(30), 0.5)
+        self.assertEqual(sin_degrees(-150), -0.5)
+        self.assertEqual(cos_degrees(60), 0.5)
+        self.assertEqual(cos_degrees(90), 0.0)
+        self.assertEqual(cos_degrees(135), -math.sqrt(0.5))
+        self.assertEqual(tan_degrees(45), 1.0)
+        self.assertEqual(tan_degrees(-120), math.sqrt(3))
+
+    def test_large_arguments_are_reduced_exactly(self):
+        self.assertEqual(sin_degrees(1e22), sin_degrees(280))
+        self.assertEqual(sin_degrees(360 * 10**400 + 30), 0.5)
+        self.assertEqual(cos_degrees(360 * 123456789 + 60), 0.5)
+        self.assertEqual(tan_degrees(180 * 10**20 + 45), 1.0)
+
+    def test_tangent_poles(self):
+        for angle in (90, -90, 270, 90.0 + 180 * 10**6):
+            with self.assertRaises(ValueError):
+                tan_degrees(angle)
+
+    @unittest.skipIf(numpy is None, "NumPy not installed")
+    def test_vector_matches_scalar(self):
+        angles = numpy.concatenate([numpy.arange(-720.0, 721.0, 15.0),
+                                    numpy.random.default_rng(0).uniform(-1e6, 1e6, 500)])
+        for many, scalar in ((sin_degrees_many, sin_degrees), (cos_degrees_many, cos_degrees)):
+            self.assertEqual(many(angles).tolist(), [scalar(a) for a in angles])
+        values = tan_degrees_many(angles)
+        for angle, value in zip(angles, values):
+            if angle % 180 == 90:
+                self.assertTrue(math.isnan(value))
+            else:
+                self.assertAlmostEqual(value, tan_degrees(angle), delta=1e-15 * abs(value))
+        self.assertEqual(sin_degrees_many(30.0).shape, ())
+
+    def test_exact_trig_is_opt_in(self):
+        order = [operation.name for operation in list_operations()]
+        self.assertEqual(sine(180), math.sin(math.radians(180)))
+        self.assertEqual(evaluate_expression("cos(60)"), math.cos(math.radians(60)))
+        set_exact_trig(True)
+        try:
+            self.assertEqual(sine(180), 0.0)
+            self.assertEqual(evaluate_expression("sin(30) + cos(60)"), 1.0)
+            self.assertEqual(evaluate_expression("cos(60)"), 0.5)
+            self.assertIn("Error", tangent(90))
+            self.assertIn("Error", evaluate_expression("tan(90)"))
+            with self.assertRaises(ValueError):
+                compile_expression("1 / tan(x - 45)", ["x"])(135)
+            if numpy is not None:
+                self.assertEqual(evaluate_many("tan(a)", a=[45, 90]).errors.tolist(), [False, True])
+            # Switching keeps the operations' places in the menu
+            self.assertEqual([operation.name for operation in list_operations()], order)
+        finally:
+            set_exact_trig(False)
+        self.assertEqual(evaluate_expression("cos(60)"), math.cos(math.radians(60)))
+        self.assertEqual(sine(180), math.sin(math.radians(180)))
+
+
 class TestMemoryFunctions(unittest.TestCase):
     """Test memory operations"""
     
@@ -228,6 +326,1415 @@ class TestExpressionEvaluator(unittest.TestCase):
         self.assertTrue(isinstance(result, str) and "Error" in result or isinstance(result, (int, float)))
 
 
+class TestHistoryStore(unittest.TestCase):
+    """Test the bounded ring-buffer history"""
+
+    def test_evicts_oldest(self):
+        store = HistoryStore(capacity=3)
+        for i in range(5):
+            store.append(f"op{i}", i, timestamp=1000.0 + i)
+        self.assertEqual(len(store), 3)
+        self.assertEqual([entry.result for entry in store], [2, 3, 4])
+        self.assertEqual(store[0].operation, "op2")
+        self.assertEqual(store[-1].result, 4)
+        self.assertEqual(store.first_sequence, 2)
+        self.assertEqual([entry.result for entry in store.page(1, 5)], [3, 4])
+
+    def test_resize_and_clear(self):
+        store = HistoryStore(capacity=5)
+        for i in range(5):
+            store.append("op", i)
+        store.resize(2)
+        self.assertEqual([entry.result for entry in store], [3, 4])
+        store.append("op", 5)
+        self.assertEqual([entry.result for entry in store], [4, 5])
+        store.clear()
+        self.assertFalse(store)
+        with self.assertRaises(ValueError):
+            HistoryStore(capacity=0)
+
+    def test_compact_entries(self):
+        store = HistoryStore()
+        first = store.append("sq" + "rt(16)", 4.0)
+        second = store.append("sqrt" + "(16)", 4.0)
+        self.assertIs(first.operation, second.operation)
+        self.assertIsInstance(first.timestamp, float)
+        self.assertFalse(hasattr(first, '__dict__'))
+        self.assertEqual(first['operation'], "sqrt(16)")
+        self.assertRegex(first['timestamp'], r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+
+    def test_module_functions(self):
+        clear_history()
+        add_to_history("2 + 3", 5)
+        self.assertEqual(calculation_history[-1].result, 5)
+        path = os.path.join(tempfile.mkdtemp(), "history.json")
+        self.assertIn("exported", export_history(path))
+        with open(path) as f:
+            exported = json.load(f)
+        self.assertEqual(exported[0]['operation'], "2 + 3")
+        self.assertIn('timestamp', exported[0])
+        self.assertIn("cleared", clear_history())
+        self.assertEqual(len(calculation_history), 0)
+
+
+class TestCalculatorSession(unittest.TestCase):
+    """Test per-user sessions and the default session behind the module functions"""
+
+    def test_sessions_are_independent(self):
+        first, second = CalculatorSession(), CalculatorSession(history_capacity=2)
+        first.memory_store(10)
+        second.memory_add(3)
+        second.memory_subtract(1)
+        first.add_to_history("2 + 3", 5)
+        for i in range(3):
+            second.add_to_history(f"{i} * 2", i * 2)
+        self.assertEqual((first.memory_recall(), second.memory_recall()), (10, 2))
+        self.assertEqual([entry.result for entry in first.history], [5])
+        self.assertEqual([entry.result for entry in second.history], [2, 4])
+        self.assertEqual(len(second.search_history("find *")), 2)
+        self.assertIn("cleared", first.clear_history())
+        self.assertEqual(len(first.history), 0)
+        self.assertEqual(len(second.history), 2)
+        with self.assertRaises(AttributeError):
+            first.extra = 1  # __slots__
+
+    def test_module_functions_use_default_session(self):
+        memory_store(7)
+        add_to_history("7 * 1", 7)
+        self.assertEqual(default_session.memory, 7)
+        self.assertIs(calculation_history, default_session.history)
+        self.assertEqual(default_session.history[-1].operation, "7 * 1")
+        session = CalculatorSession()
+        session.memory_store(1)
+        self.assertEqual(memory_recall(), 7)
+        memory_clear()
+        clear_history()
+
+    def test_threaded_sessions_do_not_interfere(self):
+        threads, operations = 8, 3000
+
+        def work(session, number, errors):
+            try:
+                for k in range(operations):
+                    # Distinct expressions, so threads also churn the shared expression cache
+                    expression = f"{number}*{k}+{k}^2"
+                    result = evaluate_expression(expression)
+                    session.memory_add(number)
+                    session.add_to_history(expression, result)
+            except Exception as e:
+                errors.append(e)
+
+        def run(count):
+            sessions, errors = [CalculatorSession() for _ in range(count)], []
+            workers = [threading.Thread(target=work, args=(session, number, errors))
+                       for number, session in enumerate(sessions)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            self.assertEqual(errors, [])
+            return sessions, time.perf_counter() - start
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        try:
+            _, single = run(1)
+            sessions, elapsed = run(threads)
+        finally:
+            sys.setswitchinterval(switch_interval)
+            clear_expression_cache()
+        for number, session in enumerate(sessions):
+            self.assertEqual(session.memory, number * operations)
+            self.assertEqual(len(session.history), operations)
+            self.assertTrue(all(entry.operation.startswith(f"{number}*") for entry in session.history))
+            self.assertEqual(session.history[-1].result, number * (operations - 1) + (operations - 1) ** 2)
+        # Independent sessions never wait on each other: total throughput holds
+        # up as threads are added (within what the interpreter lock allows)
+        self.assertLess(elapsed, 2 * threads * single)
+
+
+class TestVariableGraph(unittest.TestCase):
+    """Test named variables and their incremental recomputation"""
+
+    def test_only_downstream_cells_are_recomputed(self):
+        graph = VariableGraph()
+        graph.update({'rate': 5.5, 'principal': 200000, 'n': 360, 'fee': 25,
+                      'monthly': 'rate/12/100', 'fee_total': 'fee*n',
+                      'pay': 'principal*monthly/(1-(1+monthly)^-n)'})
+        self.assertAlmostEqual(graph['pay'], 1135.578002694, places=6)
+        self.assertEqual(graph.set('rate', 6), ['rate', 'monthly', 'pay'])
+        self.assertAlmostEqual(graph['pay'], 1199.101050306, places=6)
+        self.assertEqual(graph.set('fee', 30), ['fee', 'fee_total'])
+        # Diamond: d is computed once, after both b and c
+        graph.update({'a': 1, 'b': 'a+1', 'c': 'a*10', 'd': 'b+c'})
+        order = graph.set('a', 2)
+        self.assertEqual((order[0], order[-1], sorted(order)), ('a', 'd', ['a', 'b', 'c', 'd']))
+        self.assertEqual(graph['d'], 23)
+
+    def test_cycles_are_rejected(self):
+        graph = VariableGraph()
+        graph.update({'x': 1, 'y': 'x+1', 'z': 'y*2'})
+        with self.assertRaises(ExpressionError) as caught:
+            graph.set('x', 'z-1')
+        self.assertIn("x -> z -> y -> x", str(caught.exception))
+        with self.assertRaises(ExpressionError):
+            graph.set('w', 'w+1')
+        self.assertEqual((graph.formula('x'), graph['z']), (1, 4))
+        self.assertEqual(graph.set('x', 2), ['x', 'y', 'z'])
+
+    def test_errors_propagate_and_clear(self):
+        graph = VariableGraph()
+        graph.set('total', 'price*qty')
+        self.assertIn("'price' is not defined", graph['total'])
+        graph.update({'price': 4, 'qty': 0, 'each': 'total/qty'})
+        self.assertIn("Division by zero", graph['each'])
+        graph.set('qty', 2)
+        self.assertEqual((graph['total'], graph['each']), (8, 4.0))
+        self.assertEqual(graph.evaluate("total + each"), 12.0)
+        graph.delete('price')
+        self.assertIn("'price' is not defined", graph['each'])
+        with self.assertRaises(ExpressionError):
+            graph.set('sqrt', 1)
+
+    def test_repl_assignments(self):
+        from unittest import mock
+        from calculator.cli import calculator
+        session = CalculatorSession()
+        answers = iter(['rate = 5', 'double = rate*2', 'rate = 6', 'double', 'x = x+1', 'q'])
+        out = io.StringIO()
+        with mock.patch('calculator.session.default_session', session), \
+                mock.patch('builtins.input', lambda prompt="": next(answers)), \
+                mock.patch('sys.stdout', out):
+            calculator()
+        self.assertIn("✅ rate = 6 (updated: double = 12)", out.getvalue())
+        self.assertIn("double = 12\n", out.getvalue())
+        self.assertIn("❌ Error: Circular reference", out.getvalue())
+        self.assertEqual(session.get_variables()['double'], 12)
+        self.assertEqual(session.history[-1].operation, "rate = 6")
+
+
+class TestHistoryJournal(unittest.TestCase):
+    """Test the append-only JSON Lines history journal"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        disable_history_journal()
+        clear_history()
+
+    def test_reload_and_truncated_line(self):
+        journal = HistoryJournal(self.directory)
+        store = HistoryStore()
+        for i in range(3):
+            journal.append(store.append(f"{i} + 1", i + 1))
+        journal.close()
+        # Simulate a crash in the middle of writing a line
+        with open(journal.segment_paths[-1], 'a') as f:
+            f.write('{"timestamp": 1.0, "operat')
+
+        reloaded = HistoryStore()
+        self.assertEqual(HistoryJournal(self.directory).load_into(reloaded), 3)
+        self.assertEqual([entry.result for entry in reloaded], [1, 2, 3])
+        self.assertEqual(reloaded[0].timestamp, store[0].timestamp)
+
+    def test_reopen_repairs_torn_line(self):
+        journal = HistoryJournal(self.directory)
+        journal.append(HistoryStore().append("1 + 1", 2))
+        journal.close()
+        with open(journal.segment_paths[-1], 'a') as f:
+            f.write('{"timestamp": 1.0, "operat')
+        journal = HistoryJournal(self.directory)
+        journal.append(HistoryStore().append("2 + 2", 4))
+        journal.close()
+        self.assertEqual([result for _, _, result in journal.iter_entries()], [2, 4])
+        with open(journal.segment_paths[-1]) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        # Only a torn line: the segment starts over
+        with open(journal.segment_paths[-1], 'w') as f:
+            f.write('{"timest')
+        journal = HistoryJournal(self.directory)
+        journal.append(HistoryStore().append("3 + 3", 6))
+        journal.close()
+        self.assertEqual([result for _, _, result in journal.iter_entries()], [6])
+
+    def test_malformed_records_skipped(self):
+        journal = HistoryJournal(self.directory)
+        journal.close()
+        with open(journal.segment_paths[-1], 'w') as f:
+            f.write('{"operation": "1 + 1", "result": 2}\n[1, 2]\n"text"\n'
+                    '{"timestamp": 1.0, "operation": "2 + 2", "result": 4}\n')
+        self.assertEqual(list(HistoryJournal(self.directory).iter_entries()), [(1.0, "2 + 2", 4)])
+
+    def test_compact_with_keep_entries_and_no_closed_segments(self):
+        journal = HistoryJournal(self.directory, keep_entries=5)
+        journal.append(HistoryStore().append("1 + 1", 2))
+        journal.compact()
+        self.assertEqual([result for _, _, result in journal.iter_entries()], [2])
+        journal.close()
+
+    def test_rotation_and_compaction(self):
+        journal = HistoryJournal(self.directory, segment_size=200, max_segments=100, keep_entries=5)
+        for i in range(40):
+            journal.append(HistoryStore().append("op", i))
+        self.assertGreater(len(journal.segment_paths), 3)
+        journal.compact()
+        self.assertEqual(len(journal.segment_paths), 2)
+        # Newest five closed-segment entries plus the open segment survive
+        results = [result for _, _, result in journal.iter_entries()]
+        self.assertEqual(results, list(range(40 - len(results), 40)))
+        self.assertLess(len(results), 40)
+        journal.close()
+
+    def test_module_integration(self):
+        clear_history()
+        enable_history_journal(self.directory)
+        add_to_history("2 + 3", 5)
+        add_to_history("sqrt(16)", 4.0)
+        path = os.path.join(self.directory, "export.jsonl")
+        self.assertIn("exported", export_history(path))
+        with open(path) as f:
+            self.assertEqual([json.loads(line)['result'] for line in f], [5, 4.0])
+
+        disable_history_journal()
+        clear_history()
+        enable_history_journal(self.directory)
+        self.assertEqual([entry.operation for entry in calculation_history], ["2 + 3", "sqrt(16)"])
+        clear_history()
+        disable_history_journal()
+        enable_history_journal(self.directory)
+        self.assertEqual(len(calculation_history), 0)
+
+
+class TestHistoryIndex(unittest.TestCase):
+    """Test indexed history search"""
+
+    def setUp(self):
+        self.store = HistoryStore(capacity=6)
+        self.index = HistoryIndex(self.store)
+        operations = ["√16", "sqrt(16)+2", "2.0 + 3.0", "sin(30.0°)", "sqrt(2)*1000", "Tip: $120.0 + 18.0%"]
+        results = [4.0, 6.0, 5.0, 0.5, 1414.2, 141.6]
+        for i, (operation, result) in enumerate(zip(operations, results)):
+            self.store.append(operation, result, timestamp=1000.0 + i * 10)
+
+    def operations(self, entries):
+        return [entry.operation for entry in entries]
+
+    def test_find(self):
+        self.assertEqual(self.operations(self.index.find("sqrt")), ["sqrt(16)+2", "sqrt(2)*1000"])
+        self.assertEqual(self.operations(self.index.find("SQRT 16")), ["sqrt(16)+2"])
+        self.assertEqual(self.index.find("cos"), [])
+
+    def test_time_and_result_ranges(self):
+        self.assertEqual(self.operations(self.index.between(1020.0, 1040.0)), ["2.0 + 3.0", "sin(30.0°)"])
+        self.assertEqual(len(self.index.since(1025.0)), 3)
+        self.assertEqual([e.result for e in self.index.result_range(5.0, 200)], [5.0, 6.0, 141.6])
+        self.assertEqual([e.result for e in self.index.result_range(5.0, include_low=False)], [6.0, 141.6, 1414.2])
+
+    def test_maintained_on_eviction_and_clear(self):
+        self.store.append("sqrt(81)", 9.0, timestamp=2000.0)
+        self.store.append("cos(60)", 0.5, timestamp=2010.0)
+        # √16 and sqrt(16)+2 were evicted
+        self.assertEqual(self.operations(self.index.find("sqrt")), ["sqrt(2)*1000", "sqrt(81)"])
+        self.assertEqual(self.operations(self.index.find("16")), [])
+        self.assertEqual(self.operations(self.index.between(None, 1030.0)), ["2.0 + 3.0"])
+        self.store.resize(2)
+        self.assertEqual(self.operations(self.index.find("sqrt")), ["sqrt(81)"])
+        self.store.clear()
+        self.assertEqual(self.index.find("cos"), [])
+        self.store.append("cos(0)", 1.0)
+        self.assertEqual(self.operations(self.index.result_range(1, 1)), ["cos(0)"])
+
+    def test_query_strings(self):
+        clear_history()
+        add_to_history("sqrt(16)", 4.0)
+        add_to_history("2 + 3 * 1000", 3002)
+        self.assertEqual(self.operations(search_history("find sqrt")), ["sqrt(16)"])
+        self.assertEqual(self.operations(search_history("result>1000")), ["2 + 3 * 1000"])
+        self.assertEqual(len(search_history("since 2000-01-01")), 2)
+        self.assertIn("Error", search_history("since yesterday"))
+        self.assertIn("Error", search_history("frobnicate"))
+        clear_history()
+
+
+class TestHistoryViewModel(unittest.TestCase):
+    """Test the virtual-scrolling model behind the GUI history pane"""
+
+    def setUp(self):
+        self.store = HistoryStore(capacity=100)
+        for i in range(50):
+            self.store.append(f"{i} + 0", i, timestamp=1000.0 + i)
+        self.changes = []
+        self.model = HistoryViewModel(self.store, rows=10, on_change=lambda: self.changes.append(1))
+
+    def results(self):
+        return [entry.result for _, entry in self.model.visible_entries()]
+
+    def test_starts_at_tail_and_follows_appends(self):
+        self.assertEqual(self.results(), list(range(40, 50)))
+        self.store.append("50 + 0", 50)
+        self.assertEqual(self.results(), list(range(41, 51)))
+        self.assertEqual(self.changes, [1])
+        self.assertEqual(self.model.visible_rows()[-1][:4], "51. ")
+
+    def test_scrolled_view_stays_put(self):
+        self.model.scroll_to(5)
+        self.assertFalse(self.model.follow_tail)
+        self.store.append("50 + 0", 50)
+        self.assertEqual(self.results(), list(range(5, 15)))
+        self.assertEqual(self.changes, [])
+        self.model.yview('scroll', 1, 'pages')
+        self.assertEqual(self.results(), list(range(15, 25)))
+        self.model.yview('moveto', 1.0)
+        self.assertTrue(self.model.follow_tail)
+        self.assertEqual(self.model.fraction(), (41 / 51, 1.0))
+
+    def test_eviction_and_clear(self):
+        self.model.scroll_to(0)
+        for i in range(50, 110):
+            self.store.append(f"{i} + 0", i)
+        # The window keeps showing the oldest entries that are still stored
+        self.assertEqual(self.results(), list(range(10, 20)))
+        self.store.clear()
+        self.assertEqual(self.model.visible_rows(), [])
+        self.store.append("1 + 1", 2)
+        self.assertEqual(self.results(), [2])
+        self.model.close()
+
+
+class TestExpressionEngine(unittest.TestCase):
+    """Test the tokenizer, parser and node whitelist"""
+
+    def test_tokenizer(self):
+        self.assertEqual(
+            tokenize_expression("2.5e1 + sqrt(x)^2"),
+            [('number', 25.0), ('op', '+'), ('name', 'sqrt'), ('op', '('),
+             ('name', 'x'), ('op', ')'), ('op', '**'), ('number', 2)]
+        )
+        with self.assertRaises(ExpressionError):
+            tokenize_expression("2 $ 3")
+
+    def test_precedence(self):
+        self.assertEqual(parse_expression("-2^2"), ('neg', ('**', ('num', 2), ('num', 2))))
+        self.assertEqual(parse_expression("2^3^2"), ('**', ('num', 2), ('**', ('num', 3), ('num', 2))))
+        self.assertEqual(evaluate_expression("-2^2"), -4)
+        self.assertEqual(evaluate_expression("2^3^2"), 512)
+        self.assertEqual(evaluate_expression("2^-1"), 0.5)
+
+    def test_variables(self):
+        self.assertEqual(parse_expression("x*2", variables={'x'}), ('*', ('name', 'x'), ('num', 2)))
+        with self.assertRaises(ExpressionError):
+            parse_expression("x*2")
+
+    def test_rejects_code(self):
+        for expression in ("__import__('os')", "().__class__", "abs.__doc__", "sqrt", "(1,2)", "lambda: 1"):
+            result = evaluate_expression(expression)
+            self.assertTrue(isinstance(result, str) and result.startswith("Error"), expression)
+
+    def test_function_arity(self):
+        self.assertAlmostEqual(evaluate_expression("ln(8, 2)"), 3, places=7)
+        self.assertIn("Error", evaluate_expression("sqrt(1, 2)"))
+
+    def test_huge_power_refused(self):
+        self.assertIn("too large", evaluate_expression("9**9**9"))
+        self.assertIn("too large", evaluate_expression("9^9^9"))
+        self.assertEqual(evaluate_expression("2^100"), 2 ** 100)
+
+    def test_error_messages(self):
+        self.assertEqual(evaluate_expression("10/0"), "Error: Division by zero in expression!")
+        self.assertEqual(evaluate_expression("2*/3"), "Error: Invalid expression syntax!")
+        self.assertEqual(evaluate_expression("2 $ 3"), "Error: Expression contains invalid characters!")
+        self.assertEqual(evaluate_expression("(-8)^(1/3)"), "Error: Invalid result type!")
+
+
+class TestExpressionCache(unittest.TestCase):
+    """Test the compiled-expression LRU cache"""
+
+    def setUp(self):
+        set_expression_cache_size(4096)
+        clear_expression_cache()
+
+    def tearDown(self):
+        set_expression_cache_size(4096)
+        clear_expression_cache()
+
+    def test_hits_and_misses(self):
+        self.assertEqual(evaluate_expression("2+3*4"), 14)
+        self.assertEqual(evaluate_expression("2+3*4"), 14)
+        self.assertEqual(evaluate_expression("  2+3*4 "), 14)
+        info = expression_cache_info()
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['hits'], 2)
+        self.assertEqual(info['size'], 1)
+
+    def test_eviction(self):
+        set_expression_cache_size(2)
+        for expression in ("1+1", "2+2", "3+3"):
+            evaluate_expression(expression)
+        info = expression_cache_info()
+        self.assertEqual(info['size'], 2)
+        self.assertEqual(info['evictions'], 1)
+        # Least recently used entry was dropped
+        evaluate_expression("1+1")
+        self.assertEqual(expression_cache_info()['misses'], 4)
+
+    def test_errors_are_cached(self):
+        first = evaluate_expression("import os")
+        second = evaluate_expression("import os")
+        self.assertEqual(first, second)
+        self.assertIn("Error", first)
+        self.assertEqual(expression_cache_info()['hits'], 1)
+        # Runtime errors still surface on every call
+        self.assertIn("Error", evaluate_expression("10/0"))
+        self.assertIn("Error", evaluate_expression("10/0"))
+
+    def test_disabled_and_clear(self):
+        set_expression_cache_size(0)
+        evaluate_expression("1+1")
+        self.assertEqual(expression_cache_info()['size'], 0)
+        set_expression_cache_size(10)
+        evaluate_expression("1+1")
+        self.assertIn("cleared", clear_expression_cache())
+        self.assertEqual(expression_cache_info()['size'], 0)
+        self.assertEqual(expression_cache_info()['misses'], 0)
+
+
+class TestCompiledExpressions(unittest.TestCase):
+    """Test compile_expression callables"""
+
+    def test_compound_interest_formula(self):
+        formula = compile_expression("principal * (1 + r/n)^(n*t)", variables=["principal", "r", "n", "t"])
+        self.assertEqual(formula.variables, ("principal", "r", "n", "t"))
+        self.assertAlmostEqual(formula(1000, 0.05, 12, 10), 1647.00949769028, places=8)
+        self.assertEqual(formula(principal=1000, r=0.1, n=1, t=2), formula(1000, 0.1, 1, 2))
+
+    def test_functions_and_constants(self):
+        formula = compile_expression("sqrt(x) * pi + sin(x)", ["x"])
+        self.assertAlmostEqual(formula(4), 2 * math.pi + math.sin(math.radians(4)), places=12)
+        # Constants are inlined and functions bound as closure cells
+        self.assertEqual(formula.__code__.co_names, ())
+
+    def test_matches_templates(self):
+        expected = calculate_compound_interest(1000, 4, 1, 4)['final_amount']
+        self.assertEqual(TEMPLATE_FORMULAS['ci'](1000, 4, 1, 4), expected)
+        self.assertEqual(TEMPLATE_FORMULAS['tip'](100, 20, 4), calculate_tip(100, 20, 4)['per_person'])
+
+    def test_invalid(self):
+        with self.assertRaises(ExpressionError):
+            compile_expression("x + y", ["x"])
+        with self.assertRaises(ExpressionError):
+            compile_expression("x + 1", ["sqrt"])
+        with self.assertRaises(ExpressionError):
+            compile_expression("x + 1", ["x", "x"])
+        with self.assertRaises(ZeroDivisionError):
+            compile_expression("1 / x", ["x"])(0)
+
+
+class TestExpressionOptimizer(unittest.TestCase):
+    """Test constant folding, identities and shared subexpressions"""
+
+    CONSTANT = ["sqrt(2)*pi/180", "log(1000)", "(1+5/100)^12", "ln(2)/ln(1.07)", "-0.0+0",
+                "1/0", "sqrt(-1)", "7//2*1.5", "9^9^9", "2^5000/2^4999", "e^1-0", "tan(90)"]
+    FORMULAS = ["(a+b)^2 + 3*(a+b)", "a*1+b*1.0-0", "sqrt(a^2+b^2)/sqrt(a^2+b^2+1)",
+                "a//b*1 + a//b", "-a*-a + (-a)^1", "a - 0 + 0", "(a+0)*(a+0)", "abs(a-b)^1 - abs(a-b)"]
+    VALUES = [0.0, -0.0, 1.0, -2.5, 3, 1e308, float('nan')]
+
+    def source(self, expression, variables=("a", "b")):
+        return tree_to_source(optimize_tree(parse_expression(expression, variables=variables)))
+
+    def results(self):
+        import calculator.expression as engine
+        clear_expression_cache()
+        engine.vector_expression_cache.clear()
+        results = [repr(evaluate_expression(expression)) for expression in self.CONSTANT]
+        pairs = [(a, b) for a in self.VALUES for b in self.VALUES]
+        for formula in self.FORMULAS:
+            function = compile_expression(formula, ["a", "b"])
+            for a, b in pairs:
+                try:
+                    results.append(repr(function(a, b)))
+                except Exception as e:
+                    results.append(repr(e))
+            if numpy is not None:
+                batch = evaluate_many(formula, a=[a for a, _ in pairs], b=[b for _, b in pairs])
+                results += [batch.values.tobytes(), batch.errors.tobytes()]
+        return results
+
+    def test_results_are_bit_identical(self):
+        import calculator.expression as engine
+        optimized = self.results()
+        engine.OPTIMIZE_EXPRESSIONS = False
+        try:
+            plain = self.results()
+        finally:
+            engine.OPTIMIZE_EXPRESSIONS = True
+            clear_expression_cache()
+        self.assertEqual(optimized, plain)
+
+    def test_folding(self):
+        self.assertEqual(self.source("sqrt(2)*pi/180"), repr(math.sqrt(2) * math.pi / 180))
+        self.assertEqual(self.source("a * (2^10 - 24)"), "(a * 1000)")
+        # Failing or huge constant subtrees are left for evaluation time
+        self.assertEqual(self.source("a + 1/0"), "(a + (1 / 0))")
+        self.assertEqual(self.source("a + 2^10000"), "(a + _pow(2, 10000))")
+
+    def test_identities(self):
+        self.assertEqual(self.source("a*1 + 1*b - 0 + a^1"), "((a + b) + a)")
+        for kept in ["a + 0", "a / 1", "a * 1.0", "a - 0.0"]:
+            self.assertEqual(self.source(kept), tree_to_source(parse_expression(kept, variables=("a",))))
+
+    def test_shared_subexpressions(self):
+        self.assertEqual(self.source("sqrt(a^2+b^2) / (1 + sqrt(a^2+b^2))"),
+                         "((_t0 := sqrt((_pow(a, 2) + _pow(b, 2)))) / (1 + _t0))")
+        # Shared inside a shared subtree: evaluated once, with the outer one
+        self.assertEqual(self.source("(a*b+1)*(a*b+1) + (a*b+1)*(a*b+1)"),
+                         "((_t0 := ((_t1 := ((a * b) + 1)) * _t1)) + _t0)")
+        # A single cheap operation is recomputed rather than kept
+        self.assertEqual(self.source("(a+b)^2 + 3*(a+b)"), "(_pow((a + b), 2) + (3 * (a + b)))")
+        self.assertEqual(compile_expression("(a^2+1)^2 + 3*(a^2+1)", ["a"])(1), 10)
+        self.assertIn("optimized:  (_pow((_t0 := _pow(x, 3)), 2) + _t0)", explain_expression("(x^3)^2 + x^3"))
+
+    def test_impure_functions_are_not_folded_or_shared(self):
+        calls = []
+
+        def counter(x):
+            calls.append(x)
+            return len(calls)
+        register_operation('tick', counter, expression=True)
+        try:
+            self.assertEqual(self.source("tick(1) + tick(1)"), "(tick(1) + tick(1))")
+            self.assertEqual(evaluate_expression("tick(1) + tick(1)"), 3)
+        finally:
+            unregister_operation('tick')
+
+    def test_purity_follows_registration(self):
+        register_operation('cube', lambda x: x ** 3, expression=True, pure=True)
+        try:
+            self.assertIn("optimized:  28", explain_expression("cube(3)+1"))
+        finally:
+            unregister_operation('cube')
+        register_operation('cube', lambda x: x ** 3, expression=True)
+        try:
+            self.assertEqual(self.source("cube(3)+1"), "(cube(3) + 1)")
+        finally:
+            unregister_operation('cube')
+
+        original = get_operation('sqrt')
+        register_operation('sqrt', lambda x: x ** 0.5, expression=True, replace=True)
+        try:
+            self.assertNotIn("optimized:  3", explain_expression("sqrt(4)+1"))
+            self.assertEqual(self.source("sqrt(4)+1"), "(sqrt(4) + 1)")
+        finally:
+            register_operation('sqrt', original.function, label=original.label,
+                               description=original.description, category=original.category,
+                               expression=original.expression, pure=True, replace=True)
+        self.assertIn("optimized:  3.0", explain_expression("sqrt(4)+1"))
+
+
+class TestBigNumber(unittest.TestCase):
+    """Test lazy rendering and caching of big results"""
+
+    def test_rendering(self):
+        number = BigNumber(math.factorial(5000))
+        self.assertEqual(number, math.factorial(5000))
+        self.assertEqual(number.digit_count(), 16326)
+        self.assertEqual(str(number), "4.228577927e+16325 (16,326 digits)")
+        self.assertEqual(f"{number}", str(number))
+        self.assertTrue(number.truncated().startswith("422857792660..."))
+        self.assertTrue(number.truncated().endswith("000000000000 (16,326 digits)"))
+        self.assertEqual(str(BigNumber(12345)), "12345")
+        for exponent in (1500, 4000):
+            self.assertEqual(BigNumber(10 ** exponent).digit_count(), exponent + 1)
+            self.assertEqual(BigNumber(10 ** exponent - 1).digit_count(), exponent)
+        self.assertEqual(BigNumber(-(10 ** 1500)).scientific(3), "-1.00e+1500")
+
+    def test_big_results_are_wrapped_and_cached(self):
+        factorial_cache.clear()
+        result = factorial(3000)
+        self.assertIsInstance(result, BigNumber)
+        self.assertIs(factorial(3000), result)
+        self.assertEqual(factorial_cache.info()["hits"], 1)
+        self.assertNotIsInstance(factorial(20), BigNumber)
+        power_cache.clear()
+        self.assertIsInstance(power(3, 10000), BigNumber)
+        self.assertIs(power(3, 10000), power_cache.get((3, 10000)))
+        self.assertEqual(power_cache.info()["hits"], 2)
+        self.assertIsInstance(evaluate_expression("2^5000 + 1"), BigNumber)
+        self.assertEqual(evaluate_expression("2^5000 + 1"), 2 ** 5000 + 1)
+        self.assertEqual(power(2, 10), 1024)
+
+    def test_cache_is_bounded_by_bits(self):
+        cache = BigNumberCache(max_bits=20000)
+        cache.put(1, BigNumber(2 ** 9000))
+        cache.put(2, BigNumber(2 ** 9000))
+        cache.put(3, BigNumber(2 ** 9000))
+        self.assertIsNone(cache.get(1))
+        self.assertLessEqual(cache.info()["bits"], 20000)
+        cache.put(4, BigNumber(2 ** 30000))  # larger than the whole cache
+        self.assertIsNone(cache.get(4))
+
+    def test_history_and_export(self):
+        clear_history()
+        add_to_history("4000!", factorial(4000))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "history.json")
+            export_history(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)[0]["result"], "1.828801952e+12673 (12,674 digits)")
+        clear_history()
+
+    def test_approximate_factorial(self):
+        approx = approximate_factorial(1000000)
+        self.assertEqual(approx.exponent, 5565708)
+        self.assertEqual(str(approx), "≈ 8.2639317e+5565708")
+        self.assertAlmostEqual(float(approximate_factorial(20)), math.factorial(20), delta=1e12)
+        self.assertIn("Error", approximate_factorial(-1))
+        self.assertIn("Error", approximate_factorial(1e15))
+
+
+class TestSandbox(unittest.TestCase):
+    """Test cost estimates and the killable worker process"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.worker = SandboxWorker(timeout=5)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.worker.close()
+
+    def test_cost_estimates(self):
+        self.assertLess(estimate_expression_cost("2^10 + sqrt(16) * 3"), 64)
+        self.assertLess(estimate_expression_cost("2.5^1000000"), SANDBOX_COST_BITS)
+        self.assertGreater(estimate_expression_cost("9^9^9"), 1e9)
+        self.assertGreater(estimate_expression_cost("3^1000000 * 3^1000000"), SANDBOX_COST_BITS)
+        self.assertAlmostEqual(estimate_factorial_cost(1000), math.log2(math.factorial(1000)))
+        self.assertEqual(estimate_factorial_cost(-5), 0.0)
+
+    def test_huge_estimates_do_not_overflow(self):
+        self.assertEqual(estimate_expression_cost("2^(10^400)"), math.inf)
+        self.assertAlmostEqual(estimate_expression_cost("2^1024 * 3"), 1024 + math.log2(3))
+        self.assertEqual(estimate_factorial_cost(1e308), math.inf)
+        self.assertEqual(estimate_factorial_cost(10 ** 400), math.inf)
+        self.assertIn("Error", evaluate_sandboxed("2^(10^400)", timeout=5))
+
+    def test_cheap_results_unchanged(self):
+        for expression in ["2+3*4", "sqrt(16)+5", "2^100", "10/0", "2 $ 3", "9^9^9"]:
+            self.assertEqual(evaluate_sandboxed(expression), evaluate_expression(expression))
+        self.assertEqual(sandboxed_factorial(10), 3628800)
+        self.assertEqual(sandboxed_factorial(-1), factorial(-1))
+        self.assertEqual(sandboxed_power(2.0, 10.0), 1024.0)
+        self.assertIn("Error", sandboxed_power(1e10, 1e10))
+
+    def test_expensive_calculation_in_worker(self):
+        result = self.worker.run('expression', "3^1000000 * 3^1000000")
+        self.assertEqual(result, 3 ** 2000000)
+        self.assertEqual(self.worker.run('factorial', 20), math.factorial(20))
+        self.assertTrue(self.worker.running)
+
+    def test_runaway_is_cancelled_within_deadline(self):
+        self.worker.start()
+        for task, args in [('factorial', (10 ** 7,)),
+                           ('expression', ("7^3000000 * 7^3000000 * 7^3000000 * 7^3000000",))]:
+            start = time.perf_counter()
+            result = self.worker.run(task, *args, timeout=0.3)
+            elapsed = time.perf_counter() - start
+            self.assertIn("cancelled", result)
+            self.assertLess(elapsed, 0.3 + 0.5)
+            self.assertFalse(self.worker.running)
+        # The next call starts a fresh worker
+        self.assertEqual(self.worker.run('power', 2, 10), 1024)
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "address-space limit needs Linux")
+    def test_memory_limit(self):
+        worker = SandboxWorker(timeout=30, memory_limit=64 * 1024 * 1024)
+        try:
+            self.assertIn("memory limit", worker.run('power', 2, 10 ** 10))
+        finally:
+            worker.close()
+
+
+class TestBackgroundEvaluator(unittest.TestCase):
+    """Test the GUI's worker-thread evaluation"""
+
+    RUNAWAY = "7^3000000 * 7^3000000 * 7^3000000 * 7^3000000"
+
+    def setUp(self):
+        self.evaluator = BackgroundEvaluator(timeout=30)
+
+    def tearDown(self):
+        self.evaluator.close()
+
+    def wait_for_result(self, limit=10):
+        deadline = time.perf_counter() + limit
+        while time.perf_counter() < deadline:
+            result = self.evaluator.poll()
+            if result is not None:
+                return result
+            time.sleep(0.005)
+        self.fail("no result")
+
+    def test_result_arrives_through_poll(self):
+        request = self.evaluator.submit("2+3*4")
+        result = self.wait_for_result()
+        self.assertEqual((result.request, result.result, result.preview), (request, 14, False))
+        self.assertFalse(self.evaluator.pending)
+        self.assertIsNone(self.evaluator.poll())
+
+    def test_only_newest_request_is_reported(self):
+        for text in ["1", "1+", "1+2", "1+2*"]:
+            self.evaluator.submit(text, preview=True)
+        self.evaluator.submit("1+2*3", preview=True)
+        self.assertEqual(self.wait_for_result().expression, "1+2*3")
+        time.sleep(0.05)
+        self.assertIsNone(self.evaluator.poll())
+        # Expensive previews are not started while typing
+        self.evaluator.submit("3^1000000 * 3^1000000", preview=True)
+        self.assertIsNone(self.wait_for_result().result)
+
+    def test_cancel_and_supersede_kill_slow_calculations(self):
+        self.evaluator.submit(self.RUNAWAY)
+        time.sleep(0.2)
+        start = time.perf_counter()
+        self.evaluator.submit("1+1")
+        self.assertEqual(self.wait_for_result().result, 2)
+        self.assertLess(time.perf_counter() - start, 2)
+        self.evaluator.submit(self.RUNAWAY)
+        time.sleep(0.2)
+        self.evaluator.cancel()
+        self.assertFalse(self.evaluator.pending)
+        self.evaluator.submit("2*3")
+        self.assertEqual(self.wait_for_result().result, 6)
+
+
+    def test_superseded_request_never_reaches_the_sandbox(self):
+        from unittest import mock
+        entered, gate = threading.Event(), threading.Event()
+
+        def evaluate(expression, timeout=None, worker=None, cancelled=None):
+            if expression == self.RUNAWAY:
+                # Hold the request between the evaluator and the worker
+                entered.set()
+                gate.wait(5)
+            return evaluate_sandboxed(expression, timeout, worker, cancelled)
+        with mock.patch('calculator.background.evaluate_sandboxed', evaluate):
+            self.evaluator.submit(self.RUNAWAY)
+            self.assertTrue(entered.wait(5))
+            self.evaluator.submit("1+1")
+            gate.set()
+            self.assertEqual(self.wait_for_result(limit=2).result, 2)
+        # The worker process was never even started for the runaway
+        self.assertFalse(self.evaluator.worker.running)
+        self.assertIsNone(self.evaluator.worker._process)
+
+    def test_exception_is_reported_and_thread_survives(self):
+        from unittest import mock
+
+        def evaluate(expression, timeout=None, worker=None, cancelled=None):
+            if expression == "boom":
+                raise RuntimeError("worker exploded")
+            return evaluate_sandboxed(expression, timeout, worker, cancelled)
+        with mock.patch('calculator.background.evaluate_sandboxed', evaluate):
+            self.evaluator.submit("boom")
+            self.assertEqual(self.wait_for_result().result, "Error: worker exploded")
+            self.evaluator.submit("6*7")
+            self.assertEqual(self.wait_for_result().result, 42)
+
+@unittest.skipIf(numpy is None, "NumPy not installed")
+class TestBatchEvaluation(unittest.TestCase):
+    """Test vectorized evaluation over columns of variables"""
+
+    def test_matches_scalar_evaluator(self):
+        xs = [3, 0, -1.5, 10]
+        ys = [4, 0, 2, 0.25]
+        result = evaluate_many("sqrt(x^2 + y^2) * k", x=xs, y=ys, k=2)
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            expected = evaluate_expression(f"sqrt(({x})^2 + ({y})^2) * 2")
+            self.assertAlmostEqual(result.values[i], expected, places=12)
+        self.assertFalse(result.errors.any())
+
+    def test_domain_errors_are_masked(self):
+        result = evaluate_many("1/x + sqrt(x)", x=[1, 0, -4, 4])
+        self.assertEqual(result.errors.tolist(), [False, True, True, False])
+        self.assertTrue(numpy.isnan(result.values[1]))
+        self.assertEqual(result.values[3], 2.25)
+
+    def test_degree_trig(self):
+        result = evaluate_many("sin(a) + cos(a)", a=numpy.array([0.0, 30.0, 90.0]))
+        self.assertAlmostEqual(result.values[1], 0.5 + math.cos(math.radians(30)), places=12)
+        self.assertAlmostEqual(result.values[2], 1.0, places=12)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ExpressionError):
+            evaluate_many("x + z", x=[1, 2])
+        with self.assertRaises(ExpressionError):
+            evaluate_many("pi + 1", pi=[1, 2])
+
+
+@unittest.skipIf(numpy is None, "NumPy not installed")
+class TestVectorTemplates(unittest.TestCase):
+    """Test the array versions of the quick calculation templates"""
+
+    def test_match_scalar_templates(self):
+        weights = [45.0, 70.0, 80.0, 95.0, 72.25]
+        heights = [1.7, 1.75, 1.7, 1.6, 1.7]
+        result = bmi_many(weights, heights)
+        for i, (weight, height) in enumerate(zip(weights, heights)):
+            expected = calculate_bmi(weight, height)
+            self.assertEqual(round(result.bmi[i], 2), expected['bmi'])
+            self.assertEqual(BMI_CATEGORIES[result.category_code[i]], expected['category'])
+
+        ci = compound_interest_many([1000, 2500], [5, 3.5], [10, 30], 12)
+        for i, (principal, rate, years) in enumerate([(1000, 5, 10), (2500, 3.5, 30)]):
+            expected = calculate_compound_interest(principal, rate, years, 12)
+            self.assertEqual(ci.final_amount[i], expected['final_amount'])
+            self.assertEqual(ci.interest_earned[i], expected['interest_earned'])
+
+        tip = tip_many([100, 84.5], 15, [1, 4])
+        self.assertEqual(tip.per_person.tolist(), [calculate_tip(100, 15)['per_person'],
+                                                   calculate_tip(84.5, 15, 4)['per_person']])
+        discount = discount_many(numpy.array([100.0, 40.0]), 25)
+        self.assertEqual(discount.final_price.tolist(), [75.0, 30.0])
+
+    def test_category_boundaries(self):
+        # 18.5, 25 and 30 exactly belong to the higher category, as in calculate_bmi
+        result = bmi_many([18.5, 24.99, 25, 30], 1)
+        self.assertEqual([BMI_CATEGORIES[c] for c in result.category_code],
+                         ["Normal weight", "Normal weight", "Overweight", "Obese"])
+
+    def test_domain_errors_are_masked(self):
+        result = bmi_many([70, 70, 70, float('nan')], [1.75, 0, -1, 1.8])
+        self.assertEqual(result.errors.tolist(), [False, True, True, True])
+        self.assertEqual(result.category_code.tolist()[1:], [-1, -1, -1])
+        self.assertTrue(numpy.isnan(result.bmi[1:]).all())
+        tip = tip_many([100, 100], 15, [2, 0])
+        self.assertEqual(tip.errors.tolist(), [False, True])
+        self.assertTrue(numpy.isnan(tip.total[1]))
+        ci = compound_interest_many(1000, 5, [10, 10], [12, 0])
+        self.assertEqual(ci.errors.tolist(), [False, True])
+
+    def test_inputs_are_not_modified(self):
+        principals = numpy.array([1000.0, 2000.0])
+        compound_interest_many(principals, 5, 10, [12, 0])
+        self.assertEqual(principals.tolist(), [1000.0, 2000.0])
+
+
+class TestCalculus(unittest.TestCase):
+    """Test numerical integration and derivatives of expressions"""
+
+    @unittest.skipIf(numpy is None, "NumPy not installed")
+    def test_integrate(self):
+        self.assertAlmostEqual(integrate("x^2", "x", 0, 1), 1 / 3, places=14)
+        self.assertAlmostEqual(integrate("1/(1+t^2)", "t", 0, 1), math.pi / 4, places=14)
+        self.assertAlmostEqual(integrate("sin(x)", "x", 0, 180), 360 / math.pi, places=10)
+        self.assertAlmostEqual(integrate("abs(x-0.3)", "x", 0, 1), 0.29, places=12)
+        self.assertAlmostEqual(integrate("x^2", "x", 1, 0), -1 / 3, places=14)
+        self.assertEqual(integrate("x", "x", 2, 2), 0.0)
+
+    @unittest.skipIf(numpy is None, "NumPy not installed")
+    def test_integrate_details(self):
+        result = integrate("sqrt(x)", "x", 0, 1, details=True)
+        self.assertTrue(result.converged)
+        self.assertAlmostEqual(result.value, 2 / 3, places=12)
+        # Every interval costs one 15-point rule
+        self.assertEqual(result.evaluations % 15, 0)
+        self.assertGreater(result.intervals, 1)
+        self.assertFalse(integrate("1/sqrt(x)", "x", 0, 1, max_evaluations=1000, details=True).converged)
+
+    @unittest.skipIf(numpy is None, "NumPy not installed")
+    def test_integrate_errors(self):
+        self.assertIn("undefined", integrate("1/x", "x", -1, 1))
+        self.assertIn("not converge", integrate("1/sqrt(x)", "x", 0, 1, max_evaluations=1000))
+        self.assertIn("Error", integrate("x +", "x", 0, 1))
+        self.assertIn("Error", integrate("y", "x", 0, 1))
+        self.assertIn("Error", integrate("x", "x", 0, float('inf')))
+
+    def test_differentiate(self):
+        self.assertEqual(differentiate("x^3 + sin(x)", "x"), "3 * x ^ 2 + cos(x) * (pi / 180)")
+        self.assertEqual(differentiate("-x^2", "x"), "-2 * x")
+        self.assertEqual(differentiate("e^(2*x)", "x"), "e ^ (2 * x) * 2")
+        self.assertEqual(differentiate("(x-1)/(x+1)", "x"), "(x + 1 - (x - 1)) / (x + 1) ^ 2")
+        with self.assertRaises(ExpressionError):
+            differentiate("x//2", "x")
+
+    def test_derivative(self):
+        self.assertEqual(derivative("x^3", "x", 2), 12)
+        self.assertAlmostEqual(derivative("sin(x)", "x", 60), 0.5 * math.pi / 180, places=15)
+        self.assertAlmostEqual(derivative("x^x", "x", 2), 4 * (math.log(2) + 1), places=13)
+        self.assertAlmostEqual(derivative("ln(x, 2)", "x", 4), 1 / (4 * math.log(2)), places=15)
+        self.assertIn("undefined", derivative("sqrt(x)", "x", 0))
+        self.assertIn("Error", derivative("x +", "x", 1))
+
+    def test_finite_difference_fallback(self):
+        self.assertAlmostEqual(derivative("x//1 + x^2", "x", 2.5), 5, places=8)
+        register_operation('cube', lambda x: x ** 3, expression=True)
+        try:
+            self.assertAlmostEqual(derivative("cube(x)", "x", 2), 12, places=8)
+        finally:
+            unregister_operation('cube')
+
+    def test_repl_operations(self):
+        self.assertEqual(get_operation('deriv').function("t^2", 3, "t"), 6)
+        self.assertIn("d/dx x^2 = 2 * x", get_operation('deriv').format_result(["x^2", 3], 6))
+        if numpy is not None:
+            self.assertAlmostEqual(get_operation('integ').function("x^2", 0, 3), 9, places=12)
+
+
+class TestSchedule(unittest.TestCase):
+    """Test compound-interest and amortization schedules"""
+
+    def test_matches_compound_interest(self):
+        for years, compounds in [(10, 12), (2.5, 1), (30, 365)]:
+            rows = list(iter_compound_schedule(1000, 5, years, compounds))
+            expected = calculate_compound_interest(1000, 5, years, compounds)
+            self.assertEqual(len(rows), math.ceil(years * compounds))
+            self.assertEqual(rows[-1].balance, expected['final_amount'])
+            self.assertAlmostEqual(rows[-1].cumulative_interest, expected['interest_earned'], places=9)
+            self.assertAlmostEqual(sum(row.interest for row in rows), expected['interest_earned'], places=6)
+
+    def test_contributions_and_zero_rate(self):
+        rows = list(iter_compound_schedule(0, 12, 1, 12, contribution=100))
+        self.assertAlmostEqual(rows[0].balance, 100)
+        self.assertAlmostEqual(rows[1].balance, 100 * 1.01 + 100)
+        self.assertEqual(rows[-1].contributions, 1200)
+        flat = list(iter_compound_schedule(500, 0, 1, 4, contribution=25))
+        self.assertEqual([row.balance for row in flat], [525, 550, 575, 600])
+        self.assertEqual(flat[-1].cumulative_interest, 0)
+
+    def test_partial_final_period(self):
+        for rate in (5, 0):
+            rows = list(iter_compound_schedule(1000, rate, 1.5, 1, contribution=100))
+            self.assertEqual(len(rows), 2)
+            self.assertAlmostEqual(rows[-1].contributions, 150)
+            for row in rows:
+                self.assertAlmostEqual(row.balance, 1000 + row.contributions + row.cumulative_interest)
+            self.assertAlmostEqual(sum(row.interest for row in rows), rows[-1].cumulative_interest)
+        self.assertEqual(rows[-1].balance, 1150)
+        if numpy is not None:
+            chunk, = iter_schedule_matrix([1000], [5], 1.5, 1, contributions=100)
+            rows = list(iter_compound_schedule(1000, 5, 1.5, 1, contribution=100))
+            self.assertAlmostEqual(chunk.cumulative_interest[0, -1], rows[-1].cumulative_interest)
+
+    def test_amortization_pays_off_loan(self):
+        payment = amortization_payment(200000, 6, 30)
+        self.assertAlmostEqual(payment, 1199.10, places=2)
+        rows = list(iter_amortization_schedule(200000, 6, 30))
+        self.assertEqual(len(rows), 360)
+        self.assertAlmostEqual(rows[-1].balance, 0, places=6)
+        self.assertAlmostEqual(rows[0].interest, 1000, places=9)
+
+    def test_streaming_formats(self):
+        rows = iter_compound_schedule(1000, 5, 1, 12)
+        out = io.StringIO()
+        self.assertEqual(write_schedule(rows, out, 'csv'), 12)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], "period,balance,interest,cumulative_interest,contributions")
+        self.assertEqual(len(lines), 13)
+        out = io.StringIO()
+        write_schedule(iter_compound_schedule(1000, 5, 1, 12), out, 'jsonl')
+        record = json.loads(out.getvalue().splitlines()[-1])
+        self.assertEqual(record['balance'], calculate_compound_interest(1000, 5, 1, 12)['final_amount'])
+
+    @unittest.skipIf(numpy is None, "NumPy not installed")
+    def test_matrix_matches_generator(self):
+        principals = [1000, 250000, 5000]
+        rates = [5, 6.5, 0]
+        chunks = list(iter_schedule_matrix(principals, rates, 30, 12, contributions=[0, -1500, 10],
+                                           chunk_size=2))
+        self.assertEqual([chunk.start for chunk in chunks], [0, 2])
+        balances = numpy.vstack([chunk.balances for chunk in chunks])
+        self.assertEqual(balances.shape, (3, 360))
+        for i, (principal, rate, contribution) in enumerate(zip(principals, rates, [0, -1500, 10])):
+            expected = [row.balance for row in iter_compound_schedule(principal, rate, 30, 12, contribution)]
+            numpy.testing.assert_allclose(balances[i], expected, rtol=1e-12, atol=1e-6)
+
+
+class TestBatchMode(unittest.TestCase):
+    """Test the non-interactive batch pipeline"""
+
+    def test_evaluate_line(self):
+        self.assertEqual(evaluate_line("+ 2 3"), (5.0, None))
+        self.assertEqual(evaluate_line("2+3"), (5, None))
+        self.assertEqual(evaluate_line("expr 2*3"), (6, None))
+        self.assertEqual(evaluate_line("tip 100 20 4")[0]['per_person'], 30)
+        self.assertAlmostEqual(evaluate_line("ci 1000 5 1 1")[0]['final_amount'], 1050, places=2)
+        result, error = evaluate_line("/ 1 0")
+        self.assertIsNone(result)
+        self.assertIn("Error", error)
+        self.assertIn("Error", evaluate_line("sqrt 16 3")[1])
+        self.assertIn("Error", evaluate_line("+ 2 x")[1])
+        # Expression syntax after an operation name is an expression
+        self.assertEqual(evaluate_line("sqrt (16)"), (4.0, None))
+        self.assertEqual(evaluate_line("sqrt (16) + 1"), (5.0, None))
+        self.assertEqual(evaluate_line("sqrt 16"), (4.0, None))
+
+    def test_simple_binary_fast_path(self):
+        self.assertEqual(evaluate_expression("7/2"), 3.5)
+        self.assertEqual(evaluate_expression("7 * 2"), 14)
+        self.assertEqual(evaluate_expression("1.5+2"), 3.5)
+        self.assertEqual(evaluate_expression("3/0"), "Error: Division by zero in expression!")
+        # Cached and counted like any other expression
+        clear_expression_cache()
+        for _ in range(3):
+            self.assertEqual(evaluate_expression("6 * 7"), 42)
+        info = expression_cache_info()
+        self.assertEqual((info['misses'], info['hits'], info['size']), (1, 2, 1))
+
+    def test_stream_continues_after_errors(self):
+        lines = ["+ 2 3\n", "\n", "# comment\n", "1/0\n", "sqrt(16)\n"]
+        results = list(iter_batch_results(lines))
+        self.assertEqual([r.line_number for r in results], [1, 4, 5])
+        self.assertIsNotNone(results[1].error)
+        self.assertEqual(results[2].result, 4.0)
+
+    def test_output_formats(self):
+        lines = ["+ 2 3", "1/0"]
+        out = io.StringIO()
+        self.assertEqual(write_batch_results(iter_batch_results(lines), out, 'jsonl'), (2, 1))
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(records[0]['result'], 5.0)
+        self.assertIsNone(records[1]['result'])
+
+        out = io.StringIO()
+        write_batch_results(iter_batch_results(lines), out, 'csv')
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        self.assertEqual(rows[0], ['line', 'input', 'result', 'error'])
+        self.assertEqual(rows[1][:3], ['1', '+ 2 3', '5.0'])
+
+        out = io.StringIO()
+        write_batch_results(iter_batch_results(lines), out, 'text')
+        self.assertEqual(out.getvalue().splitlines()[0], "+ 2 3 = 5.0")
+
+
+class TestParallelBatch(unittest.TestCase):
+    """Test the process-pool batch evaluator"""
+
+    LINES = [f"{i}*{i % 7}+1\n" if i % 5 else f"+ {i} 0.5\n" for i in range(1, 300)] + ["1/0\n", "\n"]
+
+    def test_ordered_matches_serial(self):
+        serial = list(iter_batch_results(self.LINES))
+        parallel = list(iter_parallel_results(self.LINES, workers=2, chunk_size=16))
+        self.assertEqual(parallel, serial)
+
+    def test_unordered_has_every_line(self):
+        serial = list(iter_batch_results(self.LINES))
+        parallel = list(iter_parallel_results(self.LINES, workers=2, chunk_size=16, ordered=False))
+        self.assertEqual(sorted(parallel), serial)
+
+
+class TestServer(unittest.TestCase):
+    """Test the line-delimited JSON evaluation server"""
+
+    async def exchange(self, server, requests, unix=False):
+        if unix:
+            reader, writer = await asyncio.open_unix_connection(server.address)
+        else:
+            reader, writer = await asyncio.open_connection(*server.address)
+        # Pipelined: every request is written before any reply is read
+        writer.write(b"".join(line if isinstance(line, bytes) else json.dumps(line).encode() + b"\n"
+                              for line in requests))
+        await writer.drain()
+        replies = [json.loads(await reader.readline()) for _ in requests]
+        writer.close()
+        await writer.wait_closed()
+        return replies
+
+    def serve(self, coroutine_function, **options):
+        async def run():
+            async with CalculatorServer(port=0, workers=1, **options) as server:
+                return await coroutine_function(server)
+        return asyncio.run(run())
+
+    def test_parse_request(self):
+        self.assertEqual(parse_request({"id": 1, "expr": "2+3"}), (1, 'expr', ("2+3",)))
+        self.assertEqual(parse_request({"op": "tip", "args": [80, "15"]}), (None, 'tip', (80, 15.0)))
+        for bad in [[1, 2], {"op": "nope"}, {"op": "+", "args": [1]}, {"op": "+", "args": [1, True]},
+                    {"op": "sqrt", "args": ["x"]}, {"expr": 5}]:
+            with self.assertRaises(RequestError):
+                parse_request(bad)
+
+    def test_pipelined_requests_answered_in_order(self):
+        requests = [{"id": i, "expr": f"{i}*{i}+1"} for i in range(50)] + [
+            {"id": "tip", "op": "tip", "args": [80, 15, 2]},
+            {"id": "div", "op": "/", "args": [1, 0]},
+            {"id": "pow", "op": "^", "args": [2, 100]},
+            b"{not json\n",
+        ]
+        replies, stats = self.serve(lambda server: self._with_stats(server, requests))
+        self.assertEqual([reply["id"] for reply in replies[:50]], list(range(50)))
+        self.assertEqual([reply["result"] for reply in replies[:50]], [i * i + 1 for i in range(50)])
+        self.assertEqual(replies[50]["result"], calculate_tip(80, 15, 2))
+        self.assertIn("Division by zero", replies[51]["error"])
+        self.assertEqual(replies[52]["result"], 2 ** 100)
+        self.assertEqual(replies[53], {"id": None, "error": "Error: Invalid JSON!"})
+        self.assertEqual(stats["requests"], 54)
+        self.assertLess(stats["batches"], stats["requests"])  # requests were micro-batched
+
+    async def _with_stats(self, server, requests):
+        replies = await self.exchange(server, requests)
+        return replies, server.stats()
+
+    def test_bad_request_does_not_break_the_batch(self):
+        from unittest import mock
+        requests = [{"id": 1, "expr": "2^(10^400)"}, {"id": 2, "expr": "2+3"},
+                    {"id": 3, "op": "sqrt", "args": [16]}]
+        replies = self.serve(lambda server: self.exchange(server, requests), timeout=5)
+        self.assertIn("error", replies[0])
+        self.assertEqual(replies[1:], [{"id": 2, "result": 5}, {"id": 3, "result": 4.0}])
+
+        # Even an exception escaping the evaluation becomes an error reply
+        with mock.patch('calculator.server.request_cost', side_effect=[RuntimeError("boom"), 0.0]):
+            replies = self.serve(lambda server: self.exchange(server, requests[:2]))
+        self.assertEqual(replies, [{"id": 1, "error": "Error: boom"}, {"id": 2, "result": 5}])
+
+    def test_non_finite_results_are_errors(self):
+        requests = [{"id": 1, "expr": "1e308*10"}, {"id": 2, "op": "*", "args": [1e308, 10]},
+                    {"id": 3, "expr": "1e308*10 - 1e308*10"}, {"id": 4, "expr": "1+1"}]
+        replies = self.serve(lambda server: self.exchange(server, requests))
+        for reply in replies[:3]:
+            self.assertEqual(reply["error"], "Error: Result is not a finite number!")
+        self.assertEqual([reply["id"] for reply in replies], [1, 2, 3, 4])
+        self.assertEqual(replies[3]["result"], 2)
+
+    def test_keep_alive_and_concurrent_connections(self):
+        async def clients(server):
+            reader, writer = await asyncio.open_connection(*server.address)
+            for i in range(5):
+                writer.write(json.dumps({"id": i, "op": "sqrt", "args": [i * i]}).encode() + b"\n")
+                self.assertEqual(json.loads(await reader.readline()), {"id": i, "result": float(i)})
+            writer.close()
+            await writer.wait_closed()
+            return await asyncio.gather(*(self.exchange(server, [{"id": n, "expr": f"{n}+1"}])
+                                          for n in range(10)))
+        for n, replies in enumerate(self.serve(clients)):
+            self.assertEqual(replies, [{"id": n, "result": n + 1}])
+
+    def test_expensive_request_offloaded_and_cancelled(self):
+        async def run(server):
+            start = time.perf_counter()
+            replies = await self.exchange(server, [{"id": 1, "op": "!", "args": [10 ** 7]},
+                                                   {"id": 2, "op": "!", "args": [10 ** 7 + 1]}])
+            return replies, time.perf_counter() - start, server.stats()
+        replies, elapsed, stats = self.serve(run, timeout=0.3)
+        self.assertIn("cancelled", replies[0]["error"])
+        self.assertIn("cancelled", replies[1]["error"])
+        self.assertEqual(stats["offloaded"], 2)
+        self.assertLess(elapsed, 5)
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Unix sockets not available")
+    def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "calc.sock")
+
+            async def run():
+                async with CalculatorServer(path=path, workers=1) as server:
+                    return await self.exchange(server, [{"id": 1, "op": "bmi", "args": [70, 1.75]}],
+                                               unix=True)
+            replies = asyncio.run(run())
+            self.assertEqual(replies[0]["result"]["category"], calculate_bmi(70, 1.75)["category"])
+            self.assertFalse(os.path.exists(path))
+
+
+class TestStats(unittest.TestCase):
+    """Test the opt-in instrumentation layer"""
+
+    def test_histogram_buckets_and_percentiles(self):
+        from calculator.stats import bucket_index, bucket_bounds
+        for ns in [0, 1, 7, 8, 9, 15, 16, 1000, 123456, 10 ** 9]:
+            low, high = bucket_bounds(bucket_index(ns))
+            self.assertTrue(low <= ns < high, ns)
+            self.assertLessEqual(high - low, max(1, low // 4))
+        histogram = LatencyHistogram()
+        for ns in range(1000, 101000, 100):    # uniform 1..101 us
+            histogram.add(ns)
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.percentile(0.5), 51000, delta=51000 * 0.25)
+        self.assertAlmostEqual(histogram.percentile(0.99), 100000, delta=100000 * 0.25)
+        self.assertEqual(histogram.as_dict()["max_ns"], 100900)
+
+    def test_collect_operations_and_phases(self):
+        self.assertFalse(instrumentation.enabled)
+        with collect_stats() as stats:
+            evaluate_line("+ 2 3")
+            evaluate_line("sqrt 16")
+            evaluate_line("2 $ 3")
+            clear_expression_cache()
+            evaluate_expression("sqrt(16)+2^3")
+            evaluate_expression("sqrt(16)+2^3")
+            stats.call('tip', calculate_tip, 80, 15)
+        self.assertFalse(instrumentation.enabled)
+        snapshot = stats.snapshot()
+        operations = snapshot["operations"]
+        self.assertEqual(operations["+"]["calls"], 1)
+        self.assertEqual(operations["expr"]["calls"], 1)
+        self.assertEqual(operations["expr"]["errors"], 1)
+        self.assertEqual(operations["tip"]["latency"]["count"], 1)
+        phases = snapshot["expression_phases"]
+        self.assertEqual(phases["cache"]["count"], 3)
+        self.assertEqual(phases["compile"]["count"], 1)
+        self.assertEqual(phases["eval"]["count"], 2)
+        self.assertIn("sqrt", stats.report())
+
+    def test_disabled_records_nothing(self):
+        with collect_stats():
+            pass
+        evaluate_line("+ 2 3")
+        evaluate_expression("1+1")
+        self.assertEqual(get_stats()["operations"], {})
+        self.assertEqual(get_stats()["expression_phases"], {})
+
+    def test_dump_json(self):
+        with collect_stats() as stats:
+            stats.call('abs', absolute_value, -3)
+        path = os.path.join(tempfile.mkdtemp(), "stats.json")
+        self.assertIn("saved", dump_stats(path))
+        with open(path) as f:
+            self.assertEqual(json.load(f)["operations"]["abs"]["calls"], 1)
+
+
+class TestBenchSuite(unittest.TestCase):
+    """Test the benchmark suite's results and baseline comparison"""
+
+    def test_results_are_json(self):
+        results = run_benchmarks(pattern="template.calculate_tip", repeat=1, min_time=0.001)
+        self.assertEqual(list(results["results"]), ["template.calculate_tip"])
+        result = results["results"]["template.calculate_tip"]
+        self.assertGreater(result["seconds_per_op"], 0)
+        self.assertEqual(json.loads(json.dumps(results)), results)
+
+    def test_expression_corpora_evaluate(self):
+        # A corpus entry that fails would time the error path instead
+        from calculator.bench import NESTED_EXPRESSIONS, SIMPLE_EXPRESSIONS
+        for expression in SIMPLE_EXPRESSIONS + NESTED_EXPRESSIONS:
+            result = evaluate_expression(expression)
+            self.assertFalse(isinstance(result, str) and result.startswith("Error"), expression)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"a": {"seconds_per_op": 1.0}, "b": {"seconds_per_op": 1.0},
+                                "gone": {"seconds_per_op": 1.0}}}
+        current = {"results": {"a": {"seconds_per_op": 1.05}, "b": {"seconds_per_op": 1.5},
+                               "new": {"seconds_per_op": 1.0}}}
+        rows = {row[0]: row for row in compare_results(current, baseline, threshold=10)}
+        self.assertEqual(set(rows), {"a", "b"})
+        self.assertFalse(rows["a"][4])
+        self.assertTrue(rows["b"][4])
+        self.assertAlmostEqual(rows["b"][3], 50.0)
+
+    def test_suite_fails_on_regression(self):
+        directory = tempfile.mkdtemp()
+        output, baseline = os.path.join(directory, "now.json"), os.path.join(directory, "base.json")
+        with open(baseline, "w") as f:
+            json.dump({"results": {"scalar.add": {"seconds_per_op": 1e-12}}}, f)
+        out = io.StringIO()
+        status = run_bench_suite(output, baseline, quick=True, pattern="scalar.add", out=out)
+        self.assertEqual(status, 1)
+        self.assertIn("REGRESSION", out.getvalue())
+        with open(output) as f:
+            saved = json.load(f)
+        self.assertEqual(run_bench_suite(None, output, threshold=1e6, quick=True,
+                                         pattern="scalar.add", out=io.StringIO()), 0)
+        self.assertIn("scalar.add", saved["results"])
+
+
+class TestOperationRegistry(unittest.TestCase):
+    """Test registry-driven dispatch, menu, expressions and batch mode"""
+
+    def tearDown(self):
+        if get_operation('hyp') is not None:
+            unregister_operation('hyp')
+
+    def test_builtin_operations(self):
+        from calculator import BATCH_OPERATIONS
+        categories = [operation.category for operation in list_operations()]
+        self.assertEqual(list(dict.fromkeys(categories)),
+                         ["Basic Operations", "Scientific Functions", "Expression Mode", "Quick Calculations",
+                          "Calculus"])
+        self.assertEqual(get_operation('log').history_label((100.0,)), "log_10(100.0)")
+        self.assertEqual(get_operation('tip').history_value({'total': 92.0}), 92.0)
+        self.assertIn('!~', BATCH_OPERATIONS)
+        self.assertNotIn('expr', BATCH_OPERATIONS)
+        self.assertEqual(BATCH_OPERATIONS['log'], (logarithm, 1, 2))
+
+    def test_registered_function_is_available_everywhere(self):
+        from calculator.cli import menu_lines
+        register_operation('hyp', math.hypot, 2, description="Hypotenuse", category="Geometry",
+                           expression=True)
+        self.assertEqual(evaluate_expression("hyp(3, 4) + 1"), 6.0)
+        self.assertEqual(evaluate_line("hyp 6 8"), (10.0, None))
+        self.assertIn("    hyp  : Hypotenuse", menu_lines(
+            (operation.name, operation.description) for operation in list_operations("Geometry")))
+        if numpy is not None:
+            self.assertEqual(list(evaluate_many("hyp(a, 4)", a=[3.0, 0.0]).values), [5.0, 4.0])
+        unregister_operation('hyp')
+        self.assertIn("not defined", evaluate_expression("hyp(3, 4) + 1"))
+        self.assertIsNone(evaluate_line("hyp 6 8")[0])
+
+    def test_invalid_registrations(self):
+        with self.assertRaises(ValueError):
+            register_operation('+', add, 2)
+        with self.assertRaises(ValueError):
+            register_operation('pi', math.sqrt, expression=True)
+        self.assertIsNone(get_operation('pi'))
+        self.assertEqual(evaluate_expression("pi"), math.pi)
+        with self.assertRaises(ValueError):
+            register_operation('hyp', math.hypot, 2, prompts=("Only one: ",))
+
+    def test_repl_dispatch(self):
+        from unittest import mock
+        from calculator.cli import calculator
+        clear_history()
+        answers = iter(['tip', '80', '15', '', 'sqrt', '-4', 'q'])
+        out = io.StringIO()
+        with mock.patch('builtins.input', lambda prompt="": next(answers)), \
+                mock.patch('sys.stdout', out):
+            calculator()
+        self.assertIn("Total: $92.00", out.getvalue())
+        self.assertIn("❌ Error: Cannot calculate square root", out.getvalue())
+        self.assertEqual(calculation_history[-1].result, 92.0)
+        self.assertEqual(calculation_history[-1].operation, "Tip: $80.0 + 15.0%")
+        clear_history()
+
+
+class TestPackageImports(unittest.TestCase):
+    """Test that the headless import path stays light"""
+
+    # Cumulative import time allowed for `from calculator import add` (microseconds)
+    IMPORT_BUDGET_US = 50_000
+    HEAVY_MODULES = ('tkinter', 'json', 'datetime', 'csv', 'numpy')
+
+    def run_python(self, *args):
+        root = os.path.dirname(os.path.abspath(__file__))
+        return subprocess.run([sys.executable, *args], cwd=root, capture_output=True, text=True, check=True)
+
+    def test_import_time_budget(self):
+        output = self.run_python("-X", "importtime", "-c", "from calculator import add").stderr
+        imported = {}
+        for line in output.splitlines()[1:]:
+            _, cumulative, name = line.split("|")
+            imported[name.strip()] = int(cumulative)
+        self.assertLess(imported['calculator'], self.IMPORT_BUDGET_US)
+        for module in self.HEAVY_MODULES:
+            self.assertNotIn(module, imported)
+
+    def test_headless_path_skips_gui(self):
+        code = (
+            "import sys\n"
+            "from calculator import evaluate_expression, calculate_tip, memory_store, evaluate_line\n"
+            "assert evaluate_expression('2+3') == 5\n"
+            "print(','.join(m for m in ('tkinter', 'json', 'datetime', 'csv') if m in sys.modules))\n"
+        )
+        self.assertEqual(self.run_python("-c", code).stdout.strip(), "")
+
+    def test_lazy_state_attributes(self):
+        import calculator
+        memory_store(7)
+        self.assertEqual(calculator.calculator_memory, 7)
+        memory_clear()
+        self.assertEqual(calculator.calculator_memory, 0)
+
+
 class TestQuickCalculations(unittest.TestCase):
     """Test quick calculation templates"""
     